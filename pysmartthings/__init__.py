@@ -13,13 +13,18 @@ from .app import (
     AppSettings,
     AppSettingsEntity,
 )
+from .bulk import CommandOutcome, CommandReport, DeviceCommand, RefreshReport
+from .cache import ResponseCache, ValidatorCache, Validators
 from .capability import (
     ATTRIBUTES,
     CAPABILITIES,
     CAPABILITIES_TO_ATTRIBUTES,
+    CAPABILITY_REGISTRY,
     Attribute,
     Capability,
+    CapabilityRegistry,
 )
+from .codec import JsonCodec, available_codecs, default_codec
 from .const import __title__, __version__  # noqa
 from .device import (
     DEVICE_TYPE_DTH,
@@ -27,24 +32,43 @@ from .device import (
     DEVICE_TYPE_OCF,
     DEVICE_TYPE_UNKNOWN,
     DEVICE_TYPE_VIPER,
+    AttributeChange,
     Command,
+    CommandBatch,
+    CommandRequest,
+    CommandResult,
     Device,
     DeviceEntity,
     DeviceStatus,
     DeviceStatusBase,
 )
 from .errors import APIErrorDetail, APIInvalidGrant, APIResponseError
+from .fleet import (
+    EnumColumn,
+    FleetStatusStore,
+    NumericColumn,
+    capability_filter,
+    filter_devices,
+)
 from .installedapp import (
     InstalledApp,
     InstalledAppEntity,
     InstalledAppStatus,
     InstalledAppType,
 )
+from .journal import JournalWriter, replay_journal
 from .location import Location, LocationEntity
-from .oauthtoken import OAuthToken
+from .metrics import RequestMetrics
+from .oauthtoken import OAuthToken, TokenManager
+from .pool import ClientPool, Tenant
+from .ratelimit import BucketState, EndpointFamily, RateLimiter, TokenBucket
+from .registry import DeviceRegistry, InventoryChanges
+from .retry import RetryPolicy, RetryStats
 from .room import Room, RoomEntity
 from .scene import Scene, SceneEntity
+from .session import create_connector, create_session
 from .smartthings import SmartThings
+from .snapshot import Snapshot, load_snapshot, save_snapshot
 from .subscription import SourceType, Subscription, SubscriptionEntity
 
 __all__ = [
@@ -60,19 +84,38 @@ __all__ = [
     "AppOAuthEntity",
     "AppSettings",
     "AppSettingsEntity",
+    # bulk
+    "CommandOutcome",
+    "CommandReport",
+    "DeviceCommand",
+    "RefreshReport",
+    # cache
+    "ResponseCache",
+    "ValidatorCache",
+    "Validators",
+    # codec
+    "JsonCodec",
+    "available_codecs",
+    "default_codec",
     # capability
     "ATTRIBUTES",
     "CAPABILITIES",
     "CAPABILITIES_TO_ATTRIBUTES",
+    "CAPABILITY_REGISTRY",
     "Attribute",
     "Capability",
+    "CapabilityRegistry",
     # device
     "DEVICE_TYPE_DTH",
     "DEVICE_TYPE_ENDPOINT_APP",
     "DEVICE_TYPE_OCF",
     "DEVICE_TYPE_UNKNOWN",
     "DEVICE_TYPE_VIPER",
+    "AttributeChange",
     "Command",
+    "CommandBatch",
+    "CommandRequest",
+    "CommandResult",
     "Device",
     "DeviceEntity",
     "DeviceStatus",
@@ -81,24 +124,57 @@ __all__ = [
     "APIErrorDetail",
     "APIInvalidGrant",
     "APIResponseError",
+    # fleet
+    "EnumColumn",
+    "FleetStatusStore",
+    "NumericColumn",
+    "capability_filter",
+    "filter_devices",
     # installed app
     "InstalledApp",
     "InstalledAppEntity",
     "InstalledAppStatus",
     "InstalledAppType",
+    # journal
+    "JournalWriter",
+    "replay_journal",
     # location
     "Location",
     "LocationEntity",
+    # metrics
+    "RequestMetrics",
     # room
     "Room",
     "RoomEntity",
     # oauthtoken
     "OAuthToken",
+    "TokenManager",
+    # pool
+    "ClientPool",
+    "Tenant",
+    # ratelimit
+    "BucketState",
+    "EndpointFamily",
+    "RateLimiter",
+    "TokenBucket",
+    # registry
+    "DeviceRegistry",
+    "InventoryChanges",
+    # retry
+    "RetryPolicy",
+    "RetryStats",
     # scene
     "Scene",
     "SceneEntity",
+    # session
+    "create_connector",
+    "create_session",
     # smartthings
     "SmartThings",
+    # snapshot
+    "Snapshot",
+    "load_snapshot",
+    "save_snapshot",
     # subscription
     "SourceType",
     "Subscription",
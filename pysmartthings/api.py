@@ -1,10 +1,19 @@
 """Utility for invoking the SmartThings Cloud API."""
 
-from typing import Optional, Sequence
+import asyncio
+from contextlib import nullcontext
+from functools import partial
+import time
+from typing import AsyncIterator, Awaitable, Callable, Mapping, Optional, Sequence
 
-from aiohttp import BasicAuth, ClientSession
+from aiohttp import BasicAuth, ClientSession, ContentTypeError
 
+from .cache import ResponseCache, ValidatorCache
+from .codec import CONTENT_TYPE_JSON, JSON_MIMETYPE, JsonCodec, default_codec
 from .errors import APIInvalidGrant, APIResponseError
+from .metrics import RequestMetrics
+from .ratelimit import HEADER_RETRY_AFTER, RateLimiter, classify, parse_retry_after
+from .retry import TRANSPORT_ERRORS, RetryPolicy
 
 API_OAUTH_TOKEN = "https://auth-global.api.smartthings.com/oauth/token"
 API_BASE = "https://api.smartthings.com/v1/"
@@ -28,6 +37,10 @@ API_SUBSCRIPTION = API_SUBSCRIPTIONS + "/{subscription_id}"
 API_SCENES = "scenes"
 API_SCENE_EXECUTE = "scenes/{scene_id}/execute"
 
+_MISSING = object()
+# Returned instead of the body when the validators given are still current
+NOT_MODIFIED = object()
+
 
 class Api:
     """
@@ -36,13 +49,56 @@ class Api:
     https://smartthings.developer.samsung.com/docs/api-ref/st-api.html
     """
 
-    __slots__ = ["_session", "_token", "_api_base"]
+    __slots__ = [
+        "_session",
+        "_token",
+        "_api_base",
+        "_rate_limiter",
+        "_retry_policy",
+        "_coalesce",
+        "_in_flight",
+        "_coalesced_requests",
+        "_cache",
+        "_validators",
+        "_codec",
+        "_slots",
+        "_metrics",
+    ]
+
+    def __init__(
+        self,
+        session: ClientSession,
+        token: str,
+        *,
+        api_base: str = API_BASE,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        coalesce: bool = False,
+        cache: Optional[ResponseCache] = None,
+        validators: Optional[ValidatorCache] = None,
+        codec: Optional[JsonCodec] = None,
+        concurrency: Optional[int] = None,
+        metrics: Optional[RequestMetrics] = None
+    ):
+        """
+        Create a new API with the given session and token.
 
-    def __init__(self, session: ClientSession, token: str, *, api_base: str = API_BASE):
-        """Create a new API with the given session and token."""
+        concurrency caps the requests in flight at once and metrics counts
+        every request sent.
+        """
         self._session = session
         self._token = token
         self._api_base = api_base
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        self._coalesce = coalesce
+        self._in_flight = {}
+        self._coalesced_requests = 0
+        self._cache = cache
+        self._validators = validators
+        self._codec = codec or default_codec()
+        self._slots = asyncio.Semaphore(concurrency) if concurrency else nullcontext()
+        self._metrics = metrics
 
     async def get_locations(self) -> dict:
         """
@@ -50,7 +106,7 @@ class Api:
 
         https://smartthings.developer.samsung.com/docs/api-ref/st-api.html#operation/listLocations
         """
-        return await self.get_items(API_LOCATIONS)
+        return await self._get_cached(API_LOCATIONS, API_LOCATIONS, self.get_items)
 
     async def get_location(self, location_id: str) -> dict:
         """
@@ -58,7 +114,9 @@ class Api:
 
         https://smartthings.developer.samsung.com/docs/api-ref/st-api.html#operation/getLocation
         """
-        return await self.get(API_LOCATION.format(location_id=location_id))
+        return await self._get_cached(
+            API_LOCATION, API_LOCATION.format(location_id=location_id)
+        )
 
     async def get_rooms(self, location_id: str) -> dict:
         """
@@ -66,7 +124,9 @@ class Api:
 
         This API call is undocumented.
         """
-        return await self.get_items(API_ROOMS.format(location_id=location_id))
+        return await self._get_cached(
+            API_ROOMS, API_ROOMS.format(location_id=location_id), self.get_items
+        )
 
     async def get_room(self, location_id: str, room_id: str) -> dict:
         """
@@ -74,7 +134,9 @@ class Api:
 
         This API call is undocumented.
         """
-        return await self.get(API_ROOM.format(location_id=location_id, room_id=room_id))
+        return await self._get_cached(
+            API_ROOM, API_ROOM.format(location_id=location_id, room_id=room_id)
+        )
 
     async def create_room(self, location_id: str, data: dict):
         """
@@ -82,7 +144,10 @@ class Api:
 
         This API call is undocumented.
         """
-        return await self.post(API_ROOMS.format(location_id=location_id), data)
+        try:
+            return await self.post(API_ROOMS.format(location_id=location_id), data)
+        finally:
+            self._invalidate(API_ROOMS.format(location_id=location_id))
 
     async def update_room(self, location_id: str, room_id: str, data: dict):
         """
@@ -90,9 +155,15 @@ class Api:
 
         This API call is undocumented.
         """
-        return await self.put(
-            API_ROOM.format(location_id=location_id, room_id=room_id), data
-        )
+        try:
+            return await self.put(
+                API_ROOM.format(location_id=location_id, room_id=room_id), data
+            )
+        finally:
+            self._invalidate(
+                API_ROOMS.format(location_id=location_id),
+                API_ROOM.format(location_id=location_id, room_id=room_id),
+            )
 
     async def delete_room(self, location_id: str, room_id: str):
         """
@@ -100,9 +171,15 @@ class Api:
 
         This API call is undocumented.
         """
-        return await self.delete(
-            API_ROOM.format(location_id=location_id, room_id=room_id)
-        )
+        try:
+            return await self.delete(
+                API_ROOM.format(location_id=location_id, room_id=room_id)
+            )
+        finally:
+            self._invalidate(
+                API_ROOMS.format(location_id=location_id),
+                API_ROOM.format(location_id=location_id, room_id=room_id),
+            )
 
     async def get_devices(self, params: Optional = None) -> dict:
         """
@@ -112,17 +189,41 @@ class Api:
         """
         return await self.get_items(API_DEVICES, params=params)
 
-    async def get_device(self, device_id: str) -> dict:
+    def iter_devices(
+        self, params: Optional = None, *, prefetch: bool = False
+    ) -> AsyncIterator[dict]:
+        """
+        Iterate over the device definitions one page at a time.
+
+        https://smartthings.developer.samsung.com/docs/api-ref/st-api.html#operation/getDevices
+        """
+        return self.iter_items(API_DEVICES, params=params, prefetch=prefetch)
+
+    async def get_device(
+        self, device_id: str, *, validated: Optional[tuple] = None
+    ) -> dict:
         """
         Get as specific device.
 
         https://smartthings.developer.samsung.com/docs/api-ref/st-api.html#operation/getDevice
         """
-        return await self.get(API_DEVICE.format(device_id=device_id))
+        return await self._get_cached(
+            API_DEVICE,
+            API_DEVICE.format(device_id=device_id),
+            partial(self.get, validated=validated),
+        )
+
+    async def get_device_status(
+        self, device_id: str, *, validated: Optional[tuple] = None
+    ) -> dict:
+        """
+        Get the status of a specific device.
 
-    async def get_device_status(self, device_id: str) -> dict:
-        """Get the status of a specific device."""
-        return await self.get(API_DEVICE_STATUS.format(device_id=device_id))
+        Returns NOT_MODIFIED when the status is unchanged since validated.
+        """
+        return await self.get(
+            API_DEVICE_STATUS.format(device_id=device_id), validated=validated
+        )
 
     async def post_device_command(
         self, device_id, component_id, capability, command, args
@@ -146,6 +247,15 @@ class Api:
 
         return await self.post(API_DEVICE_COMMAND.format(device_id=device_id), data)
 
+    async def post_device_commands(self, device_id, commands: Sequence[dict]) -> object:
+        """
+        Execute several commands on a device in a single request.
+
+        https://smartthings.developer.samsung.com/docs/api-ref/st-api.html#operation/executeDeviceCommands
+        """
+        data = {"commands": list(commands)}
+        return await self.post(API_DEVICE_COMMAND.format(device_id=device_id), data)
+
     async def get_apps(self, params: Optional = None) -> dict:
         """
         Get list of apps.
@@ -154,13 +264,23 @@ class Api:
         """
         return await self.get_items(API_APPS, params=params)
 
+    def iter_apps(
+        self, params: Optional = None, *, prefetch: bool = False
+    ) -> AsyncIterator[dict]:
+        """
+        Iterate over the apps one page at a time.
+
+        https://smartthings.developer.samsung.com/develop/api-ref/st-api.html#operation/listApps
+        """
+        return self.iter_items(API_APPS, params=params, prefetch=prefetch)
+
     async def get_app(self, app_id: str) -> dict:
         """
         Get the details of the specific app.
 
         https://smartthings.developer.samsung.com/develop/api-ref/st-api.html#operation/getApp
         """
-        return await self.get(API_APP.format(app_id=app_id))
+        return await self._get_cached(API_APP, API_APP.format(app_id=app_id))
 
     async def create_app(self, data: dict) -> dict:
         """
@@ -176,7 +296,10 @@ class Api:
 
         https://smartthings.developer.samsung.com/develop/api-ref/st-api.html#operation/updateApp
         """
-        return await self.put(API_APP.format(app_id=app_id), data)
+        try:
+            return await self.put(API_APP.format(app_id=app_id), data)
+        finally:
+            self._invalidate(API_APP.format(app_id=app_id))
 
     async def delete_app(self, app_id: str):
         """
@@ -184,7 +307,12 @@ class Api:
 
         https://smartthings.developer.samsung.com/develop/api-ref/st-api.html#operation/deleteApp
         """
-        return await self.delete(API_APP.format(app_id=app_id))
+        try:
+            return await self.delete(API_APP.format(app_id=app_id))
+        finally:
+            self._invalidate(
+                API_APP.format(app_id=app_id), API_APP_SETTINGS.format(app_id=app_id)
+            )
 
     async def get_app_settings(self, app_id: str) -> dict:
         """
@@ -192,7 +320,9 @@ class Api:
 
         https://smartthings.developer.samsung.com/docs/api-ref/st-api.html#operation/getAppSettings
         """
-        return await self.get(API_APP_SETTINGS.format(app_id=app_id))
+        return await self._get_cached(
+            API_APP_SETTINGS, API_APP_SETTINGS.format(app_id=app_id)
+        )
 
     async def update_app_settings(self, app_id: str, data: dict) -> dict:
         """
@@ -200,7 +330,10 @@ class Api:
 
         https://smartthings.developer.samsung.com/docs/api-ref/st-api.html#operation/updateAppSettings
         """
-        return await self.put(API_APP_SETTINGS.format(app_id=app_id), data)
+        try:
+            return await self.put(API_APP_SETTINGS.format(app_id=app_id), data)
+        finally:
+            self._invalidate(API_APP_SETTINGS.format(app_id=app_id))
 
     async def get_app_oauth(self, app_id: str) -> dict:
         """
@@ -234,6 +367,16 @@ class Api:
         """
         return await self.get_items(API_INSTALLEDAPPS, params=params)
 
+    def iter_installed_apps(
+        self, params: Optional = None, *, prefetch: bool = False
+    ) -> AsyncIterator[dict]:
+        """
+        Iterate over the installedapps one page at a time.
+
+        https://smartthings.developer.samsung.com/docs/api-ref/st-api.html#operation/listInstallations
+        """
+        return self.iter_items(API_INSTALLEDAPPS, params=params, prefetch=prefetch)
+
     async def get_installed_app(self, installed_app_id: str) -> dict:
         """
         Get the details of the specific installedapp.
@@ -318,6 +461,16 @@ class Api:
         """
         return await self.get_items(API_SCENES, params=params)
 
+    def iter_scenes(
+        self, params: Optional = None, *, prefetch: bool = False
+    ) -> AsyncIterator[dict]:
+        """
+        Iterate over the scenes one page at a time.
+
+        https://smartthings.developer.samsung.com/develop/api-ref/st-api.html#operation/listScenes
+        """
+        return self.iter_items(API_SCENES, params=params, prefetch=prefetch)
+
     async def execute_scene(self, scene_id: str) -> bool:
         """
         Execute a scene.
@@ -346,49 +499,286 @@ class Api:
         """Set the token to use when making requests."""
         self._token = value
 
+    @property
+    def rate_limiter(self) -> Optional[RateLimiter]:
+        """Get the rate limiter applied to requests."""
+        return self._rate_limiter
+
+    @property
+    def retry_policy(self) -> Optional[RetryPolicy]:
+        """Get the policy used to retry failed requests."""
+        return self._retry_policy
+
     async def request(
-        self, method: str, url: str, params: dict = None, data: dict = None
+        self,
+        method: str,
+        url: str,
+        params: dict = None,
+        data: dict = None,
+        *,
+        validated: Optional[tuple] = None
     ):
-        """Perform a request against the specified parameters."""
-        async with self._session.request(
-            method,
-            url,
-            params=params,
-            json=data,
-            headers={"Authorization": "Bearer " + self._token},
-        ) as resp:
-            if resp.status == 200:
-                return await resp.json()
-            if resp.status in (400, 422, 429, 500):
-                data = None
+        """
+        Perform a request against the specified parameters.
+
+        validated is the version of a body the caller already holds, from
+        response_version. A 304 Not Modified for that version returns
+        NOT_MODIFIED rather than the stored body.
+        """
+        family = classify(method, url)
+        retryable = self._retry_policy and self._retry_policy.is_retryable(
+            method, family
+        )
+        key = None
+        if self._validators is not None and method == "get":
+            key = (url, Api._params_key(params))
+        body = None
+        if data is not None:
+            body = self._codec.dumps(data)
+        started = time.monotonic()
+        attempt = 0
+        requeues = 0
+        while True:
+            if self._rate_limiter:
+                await self._rate_limiter.acquire(family)
+            headers = {"Authorization": "Bearer " + self._token}
+            if body is not None:
+                headers["Content-Type"] = CONTENT_TYPE_JSON
+            if key:
+                headers.update(self._validators.headers(key))
+            async with self._slots:
+                sent = time.monotonic()
+                status = None
+                if self._metrics:
+                    self._metrics.started()
                 try:
-                    data = await resp.json()
-                except Exception:  # pylint: disable=broad-except
-                    pass
-                raise APIResponseError(
-                    resp.request_info,
-                    resp.history,
-                    status=resp.status,
-                    message=resp.reason,
-                    headers=resp.headers,
-                    data=data,
-                )
-            resp.raise_for_status()
+                    async with self._session.request(
+                        method, url, params=params, data=body, headers=headers
+                    ) as resp:
+                        status = resp.status
+                        if self._metrics:
+                            self._metrics.finished(time.monotonic() - sent, status)
+                        if (
+                            self._rate_limiter
+                            and self._rate_limiter.update(
+                                family, resp.status, resp.headers
+                            )
+                            and requeues < self._rate_limiter.max_requeues
+                        ):
+                            requeues += 1
+                            continue
+                        delay = None
+                        if retryable and resp.status in self._retry_policy.statuses:
+                            delay = self._retry_policy.next_delay(
+                                attempt,
+                                started,
+                                resp.status,
+                                parse_retry_after(resp.headers.get(HEADER_RETRY_AFTER)),
+                            )
+                        if delay is None:
+                            if key and resp.status == 304 and self._validators.get(key):
+                                stored = self._validators.reuse(key)
+                                if validated and validated == self._validators.version(
+                                    key
+                                ):
+                                    return NOT_MODIFIED
+                                return stored
+                            result = await Api._handle_response(resp, self._codec)
+                            if key:
+                                self._validators.store(key, resp.headers, result)
+                            return result
+                except TRANSPORT_ERRORS as error:
+                    if self._metrics:
+                        self._metrics.failed(type(error).__name__)
+                    if not retryable:
+                        raise
+                    delay = self._retry_policy.next_delay(
+                        attempt, started, type(error).__name__
+                    )
+                    if delay is None:
+                        raise
+                finally:
+                    # Also completes requests cancelled or failed before a response
+                    if self._metrics and status is None:
+                        self._metrics.finished(time.monotonic() - sent)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _read_json(resp, codec: JsonCodec):
+        # Decode the raw bytes, resp.json() would decode them to str first
+        body = await resp.read()
+        if not JSON_MIMETYPE.match(resp.content_type):
+            raise ContentTypeError(
+                resp.request_info,
+                resp.history,
+                status=resp.status,
+                message="Attempt to decode JSON with unexpected mimetype: "
+                + resp.content_type,
+                headers=resp.headers,
+            )
+        body = body.strip()
+        return codec.loads(body) if body else None
+
+    @staticmethod
+    async def _handle_response(resp, codec: JsonCodec):
+        if resp.status == 200:
+            return await Api._read_json(resp, codec)
+        if resp.status in (400, 422, 429, 500):
+            data = None
+            try:
+                data = await Api._read_json(resp, codec)
+            except Exception:  # pylint: disable=broad-except
+                pass
+            raise APIResponseError(
+                resp.request_info,
+                resp.history,
+                status=resp.status,
+                message=resp.reason,
+                headers=resp.headers,
+                data=data,
+            )
+        resp.raise_for_status()
+
+    @property
+    def cache(self) -> Optional[ResponseCache]:
+        """Get the cache of read-mostly resources."""
+        return self._cache
+
+    @property
+    def metrics(self) -> Optional[RequestMetrics]:
+        """Get the counters of the requests sent."""
+        return self._metrics
 
-    async def get(self, resource: str, *, params: dict = None):
-        """Get a resource."""
-        return await self.request("get", self._api_base + resource, params)
+    @property
+    def codec(self) -> JsonCodec:
+        """Get the codec used to encode requests and decode responses."""
+        return self._codec
+
+    @property
+    def validators(self) -> Optional[ValidatorCache]:
+        """Get the validators used to make conditional requests."""
+        return self._validators
+
+    def response_version(self, resource: str, *, params: dict = None):
+        """Get the version of the last body received for a GET of a resource."""
+        if self._validators is None:
+            return None
+        return self._validators.version(
+            (self._api_base + resource, Api._params_key(params))
+        )
+
+    async def _get_cached(
+        self, kind: str, resource: str, fetch: Optional[Callable] = None
+    ):
+        fetch = fetch or self.get
+        if self._cache is None:
+            return await fetch(resource)
+        data = self._cache.get(resource, _MISSING)
+        if data is _MISSING:
+            data = await fetch(resource)
+            if data is not NOT_MODIFIED:
+                self._cache.set(resource, data, kind)
+        return data
+
+    def _invalidate(self, *resources: str):
+        if self._cache is not None:
+            self._cache.invalidate(*resources)
+
+    @property
+    def coalesced_requests(self) -> int:
+        """Get the number of GETs that awaited an identical in-flight request."""
+        return self._coalesced_requests
+
+    async def get(
+        self, resource: str, *, params: dict = None, validated: Optional[tuple] = None
+    ):
+        """
+        Get a resource.
+
+        When coalescing is enabled, callers requesting the same resource and
+        params while a request is in flight share its result, which must not
+        be mutated.
+        """
+        url = self._api_base + resource
+        if not self._coalesce:
+            return await self.request("get", url, params, validated=validated)
+        return await self._single_flight(
+            ("get", url, Api._params_key(params), validated),
+            partial(self.request, "get", url, params, validated=validated),
+        )
 
     async def get_items(self, resource: str, *, params: dict = None):
         """Perform requests for a list of items that may have pages."""
+        if not self._coalesce:
+            return await self._collect_items(resource, params)
+        return await self._single_flight(
+            ("items", self._api_base + resource, Api._params_key(params)),
+            partial(self._collect_items, resource, params),
+        )
+
+    async def _collect_items(self, resource: str, params: Optional[dict]):
+        return [item async for item in self.iter_items(resource, params=params)]
+
+    async def _single_flight(self, key: tuple, factory: Callable[[], Awaitable]):
+        future = self._in_flight.get(key)
+        if future:
+            self._coalesced_requests += 1
+        else:
+            future = asyncio.ensure_future(factory())
+            self._in_flight[key] = future
+            future.add_done_callback(partial(self._request_done, key))
+        # Shield so a cancelled caller does not cancel the request for others
+        return await asyncio.shield(future)
+
+    def _request_done(self, key: tuple, future: asyncio.Future):
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if not future.cancelled():
+            # Mark the error as retrieved when every caller was cancelled
+            future.exception()
+
+    @staticmethod
+    def _params_key(params) -> tuple:
+        if not params:
+            return ()
+        if isinstance(params, Mapping):
+            params = params.items()
+        return tuple(params)
+
+    async def iter_items(
+        self, resource: str, *, params: dict = None, prefetch: bool = False
+    ) -> AsyncIterator[dict]:
+        """
+        Iterate over a list of items that may have pages.
+
+        Items are yielded as each page arrives and the next page is not
+        requested until the current one has been consumed, so only a single
+        page is held in memory at a time. When prefetch is set, the request
+        for the next page is issued as soon as its link is known so that it
+        overlaps with the processing of the current page.
+        """
         resp = await self.request("get", self._api_base + resource, params, None)
-        items = resp.get("items", [])
-        next_link = Api._get_next_link(resp)
-        while next_link:
-            resp = await self.request("get", next_link, params, None)
-            items.extend(resp.get("items", []))
+        while True:
             next_link = Api._get_next_link(resp)
-        return items
+            pending = None
+            if next_link and prefetch:
+                pending = asyncio.ensure_future(
+                    self.request("get", next_link, params, None)
+                )
+            try:
+                for item in resp.get("items", []):
+                    yield item
+            except BaseException:
+                if pending:
+                    pending.cancel()
+                raise
+            if pending:
+                resp = await pending
+            elif next_link:
+                resp = await self.request("get", next_link, params, None)
+            else:
+                return
 
     async def post(self, resource: str, data: Optional[Sequence]):
         """Perform a post request."""
@@ -414,11 +804,11 @@ class Api:
             data=payload,
         ) as resp:
             if resp.status == 200:
-                return await resp.json()
+                return await Api._read_json(resp, self._codec)
             if resp.status == 400:
                 data = {}
                 try:
-                    data = await resp.json()
+                    data = await Api._read_json(resp, self._codec)
                 except Exception:  # pylint: disable=broad-except
                     pass
                 raise APIInvalidGrant(data.get("error_description"))
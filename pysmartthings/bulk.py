@@ -0,0 +1,178 @@
+"""Define helpers for running many requests concurrently."""
+
+import asyncio
+from collections import namedtuple
+import math
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from aiohttp import ClientError
+
+from .api import API_DEVICE_STATUS, Api
+from .device import COMMAND_ACCEPTED_STATUSES, DeviceEntity, DeviceStatus
+
+DEFAULT_CONCURRENCY = 10
+REQUEST_ERRORS = (ClientError, asyncio.TimeoutError)
+
+DeviceCommand = namedtuple(
+    "DeviceCommand", "device_id component_id capability command args", defaults=(None,)
+)
+CommandOutcome = namedtuple(
+    "CommandOutcome",
+    "device_id component_id capability command args status error latency",
+)
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """Get the nearest-rank percentile of the values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+async def gather_bounded(
+    items: Iterable, func: Callable[..., Awaitable], concurrency: int
+) -> list:
+    """Call func for each item with at most concurrency calls in flight."""
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1.")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(item):
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(*(run(item) for item in items))
+
+
+class CommandReport:
+    """Define the outcome of a fan-out of device commands."""
+
+    def __init__(self, outcomes: List[CommandOutcome]):
+        """Create a new instance of the CommandReport class."""
+        self._outcomes = outcomes
+        self._by_device = {}
+        for outcome in outcomes:
+            self._by_device.setdefault(outcome.device_id, []).append(outcome)
+        latencies = [outcome.latency for outcome in outcomes]
+        self._p50 = percentile(latencies, 50)
+        self._p95 = percentile(latencies, 95)
+
+    @property
+    def outcomes(self) -> List[CommandOutcome]:
+        """Get the outcome of each command in the order submitted."""
+        return self._outcomes
+
+    @property
+    def by_device(self) -> Dict[str, List[CommandOutcome]]:
+        """Get the outcomes grouped by device id."""
+        return self._by_device
+
+    @property
+    def failed(self) -> List[CommandOutcome]:
+        """Get the commands that raised or were not accepted."""
+        return [
+            outcome
+            for outcome in self._outcomes
+            if outcome.status not in COMMAND_ACCEPTED_STATUSES
+        ]
+
+    @property
+    def p50(self) -> Optional[float]:
+        """Get the median command latency in seconds."""
+        return self._p50
+
+    @property
+    def p95(self) -> Optional[float]:
+        """Get the 95th percentile command latency in seconds."""
+        return self._p95
+
+
+async def execute_commands(
+    api: Api, commands: Iterable[Sequence], *, concurrency: int = DEFAULT_CONCURRENCY
+) -> CommandReport:
+    """Execute device commands concurrently and report each outcome."""
+
+    async def execute(entry: Sequence) -> CommandOutcome:
+        command = DeviceCommand(*entry)
+        status = None
+        error = None
+        started = time.monotonic()
+        try:
+            response = await api.post_device_command(*command)
+            status = response["results"][0]["status"]
+        except (KeyError, IndexError, TypeError):
+            pass
+        except REQUEST_ERRORS as err:
+            error = err
+        return CommandOutcome(*command, status, error, time.monotonic() - started)
+
+    outcomes = await gather_bounded(commands, execute, concurrency)
+    return CommandReport(outcomes)
+
+
+class RefreshReport:
+    """Define the outcome of refreshing the status of many devices."""
+
+    def __init__(self, refreshed: List[str], failed: Dict[str, Exception]):
+        """Create a new instance of the RefreshReport class."""
+        self._refreshed = refreshed
+        self._failed = failed
+
+    @property
+    def refreshed(self) -> List[str]:
+        """Get the ids of the devices that were refreshed."""
+        return self._refreshed
+
+    @property
+    def failed(self) -> Dict[str, Exception]:
+        """Get the error raised for each device that failed to refresh."""
+        return self._failed
+
+
+async def refresh_statuses(
+    api: Api,
+    devices: Iterable[Union[DeviceEntity, DeviceStatus]],
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY
+) -> RefreshReport:
+    """
+    Refresh the status of devices concurrently.
+
+    Each device id is requested once and applied to every status object that
+    shares it. Failures are collected rather than aborting the other refreshes.
+    """
+    statuses = {}
+    for device in devices:
+        status = device.status if isinstance(device, DeviceEntity) else device
+        shared = statuses.setdefault(status.device_id, [])
+        if status not in shared:
+            shared.append(status)
+
+    async def refresh(device_id: str):
+        shared = statuses[device_id]
+        # Only conditional when every status holds the same version
+        versions = {status.version for status in shared}
+        validated = versions.pop() if len(versions) == 1 else None
+        try:
+            data = await api.get_device_status(device_id, validated=validated)
+            version = api.response_version(
+                API_DEVICE_STATUS.format(device_id=device_id)
+            )
+            for status in shared:
+                status.apply_refresh(data, version)
+        # A body that cannot be applied fails its device, not the others
+        except Exception as error:  # pylint: disable=broad-except
+            return device_id, error
+        return device_id, None
+
+    refreshed = []
+    failed = {}
+    for device_id, error in await gather_bounded(statuses, refresh, concurrency):
+        if error:
+            failed[device_id] = error
+        else:
+            refreshed.append(device_id)
+    return RefreshReport(refreshed, failed)
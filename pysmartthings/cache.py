@@ -0,0 +1,166 @@
+"""Define the response cache for read-mostly resources."""
+
+from collections import OrderedDict, namedtuple
+from copy import deepcopy
+import time
+from typing import Any, Dict, Hashable, Mapping, Optional, Tuple
+
+DEFAULT_TTL = 300.0
+DEFAULT_MAX_ENTRIES = 1024
+
+HEADER_ETAG = "ETag"
+HEADER_LAST_MODIFIED = "Last-Modified"
+HEADER_IF_NONE_MATCH = "If-None-Match"
+HEADER_IF_MODIFIED_SINCE = "If-Modified-Since"
+
+Validators = namedtuple("Validators", "etag last_modified data")
+
+
+class ResponseCache:
+    """
+    Define a TTL cache with least-recently-used eviction.
+
+    TTLs are looked up by the kind of resource, which is the resource template
+    in the api module (i.e. API_LOCATION), falling back to default_ttl.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttls: Optional[Mapping[str, float]] = None,
+        default_ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        """Create a new instance of the ResponseCache class."""
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1.")
+        self._ttls = dict(ttls or {})
+        self._default_ttl = default_ttl
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get an unexpired value and mark it as recently used."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any, kind: Optional[str] = None):
+        """Store a value, evicting the least recently used when full."""
+        ttl = self._ttls.get(kind, self._default_ttl)
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def invalidate(self, *keys: str):
+        """Remove the values stored for the keys."""
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove every value."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        """Get the number of stored values, including expired ones."""
+        return len(self._entries)
+
+    @property
+    def hits(self) -> int:
+        """Get the number of lookups answered from the cache."""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Get the number of lookups that were missing or expired."""
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        """Get the number of values evicted to stay within max_entries."""
+        return self._evictions
+
+
+class ValidatorCache:
+    """
+    Define the validators of the last response for each request.
+
+    The body is kept with its ETag/Last-Modified validators so that a
+    304 Not Modified response can be answered with the same content. It is
+    copied when stored and when reused, so callers may change what they get.
+    """
+
+    def __init__(self, *, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """Create a new instance of the ValidatorCache class."""
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1.")
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._not_modified = 0
+
+    def get(self, key: Hashable) -> Optional[Validators]:
+        """Get the validators stored for the request."""
+        return self._entries.get(key)
+
+    def headers(self, key: Hashable) -> Dict[str, str]:
+        """Get the conditional request headers for the request."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return {}
+        self._entries.move_to_end(key)
+        headers = {}
+        if entry.etag:
+            headers[HEADER_IF_NONE_MATCH] = entry.etag
+        if entry.last_modified:
+            headers[HEADER_IF_MODIFIED_SINCE] = entry.last_modified
+        return headers
+
+    def store(self, key: Hashable, headers: Mapping[str, str], data: Any):
+        """Store the body of a response that carries validators."""
+        etag = headers.get(HEADER_ETAG)
+        last_modified = headers.get(HEADER_LAST_MODIFIED)
+        if not etag and not last_modified:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = Validators(etag, last_modified, deepcopy(data))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def version(self, key: Hashable) -> Optional[Tuple[str, str]]:
+        """Get the ETag and Last-Modified of the body stored for the request."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry.etag, entry.last_modified
+
+    def reuse(self, key: Hashable) -> Any:
+        """Get the stored body for a request answered with 304 Not Modified."""
+        self._not_modified += 1
+        return deepcopy(self._entries[key].data)
+
+    def clear(self):
+        """Remove every entry."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        """Get the number of stored entries."""
+        return len(self._entries)
+
+    @property
+    def not_modified(self) -> int:
+        """Get the number of responses reused after 304 Not Modified."""
+        return self._not_modified
@@ -4,6 +4,8 @@ Defines SmartThings capabilities and attributes.
 https://smartthings.developer.samsung.com/docs/api-ref/capabilities.html
 """
 
+from typing import Iterable, List, Optional
+
 CAPABILITIES_TO_ATTRIBUTES = {
     "accelerationSensor": ["acceleration"],
     "activityLightingMode": ["lightingMode"],
@@ -156,6 +158,97 @@ ATTRIBUTES = {
     for attributes in CAPABILITIES_TO_ATTRIBUTES.values()
     for attrib in attributes
 }
+ATTRIBUTE_UNITS = {
+    "%",
+    "A",
+    "C",
+    "CAQI",
+    "F",
+    "Hz",
+    "K",
+    "V",
+    "W",
+    "Wh",
+    "cm",
+    "dB",
+    "dBm",
+    "g",
+    "kPa",
+    "kW",
+    "kWh",
+    "kg",
+    "lbs",
+    "lux",
+    "m",
+    "mA",
+    "mV",
+    "mg/m^3",
+    "min",
+    "mm",
+    "ms",
+    "ppb",
+    "ppm",
+    "s",
+    "\u03bcg/m^3",
+}
+
+
+class CapabilityRegistry:
+    """
+    Define the bit assigned to each capability in capability masks.
+
+    Known capabilities are registered in the order of CAPABILITIES, so their
+    bits are stable for a given version. Other capabilities, such as custom
+    ones, are assigned the next free bit when registered by a device. Queries
+    use get and mask, which never assign bits.
+    """
+
+    def __init__(self, capabilities: Iterable[str] = ()):
+        """Create a new instance of the CapabilityRegistry class."""
+        self._indexes = {}
+        self._names = []
+        for capability in capabilities:
+            self.index(capability)
+
+    def index(self, capability: str) -> int:
+        """Get the bit index of the capability, assigning one if needed."""
+        index = self._indexes.get(capability)
+        if index is None:
+            index = len(self._names)
+            self._indexes[capability] = index
+            self._names.append(capability)
+        return index
+
+    def get(self, capability: str) -> Optional[int]:
+        """Get the bit index of the capability, None if it is not registered."""
+        return self._indexes.get(capability)
+
+    def mask(self, capabilities: Iterable[str]) -> int:
+        """Get the mask with the bit of each registered capability set."""
+        mask = 0
+        for capability in capabilities:
+            index = self._indexes.get(capability)
+            if index is not None:
+                mask |= 1 << index
+        return mask
+
+    def register(self, capabilities: Iterable[str]) -> int:
+        """Get the mask of the capabilities, assigning bits as needed."""
+        mask = 0
+        for capability in capabilities:
+            mask |= 1 << self.index(capability)
+        return mask
+
+    def capabilities(self, mask: int) -> List[str]:
+        """Get the capabilities whose bits are set in the mask."""
+        return [name for index, name in enumerate(self._names) if mask >> index & 1]
+
+    def __len__(self) -> int:
+        """Get the number of registered capabilities."""
+        return len(self._names)
+
+
+CAPABILITY_REGISTRY = CapabilityRegistry(CAPABILITIES)
 
 
 class Capability:
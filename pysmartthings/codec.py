@@ -0,0 +1,73 @@
+"""Define the JSON codecs used to encode requests and decode responses."""
+
+import json
+import re
+from typing import Any, Callable, List, Optional, Union
+
+CONTENT_TYPE_JSON = "application/json"
+# The mimetypes accepted as JSON, as checked by aiohttp
+JSON_MIMETYPE = re.compile(r"^application/(?:[\w.+-]+?\+)?json")
+
+
+class JsonCodec:
+    """Define a pair of functions to encode and decode JSON."""
+
+    def __init__(
+        self,
+        name: str,
+        loads: Callable[[Union[str, bytes]], Any],
+        dumps: Callable[[Any], Union[str, bytes]],
+    ):
+        """Create a new instance of the JsonCodec class."""
+        self._name = name
+        self._loads = loads
+        self._dumps = dumps
+
+    def loads(self, value: Union[str, bytes]) -> Any:
+        """Decode a JSON document."""
+        return self._loads(value)
+
+    def dumps(self, value: Any) -> Union[str, bytes]:
+        """Encode a value as a JSON document."""
+        return self._dumps(value)
+
+    @property
+    def name(self) -> str:
+        """Get the name of the backend."""
+        return self._name
+
+    def __repr__(self) -> str:
+        """Get the representation of the codec."""
+        return f"JsonCodec({self._name!r})"
+
+
+STDLIB_CODEC = JsonCodec("json", json.loads, json.dumps)
+
+
+def orjson_codec() -> Optional[JsonCodec]:
+    """Get a codec backed by orjson when it is installed."""
+    try:
+        import orjson  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return JsonCodec("orjson", orjson.loads, orjson.dumps)
+
+
+def ujson_codec() -> Optional[JsonCodec]:
+    """Get a codec backed by ujson when it is installed."""
+    try:
+        import ujson  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return JsonCodec("ujson", ujson.loads, ujson.dumps)
+
+
+def available_codecs() -> List[JsonCodec]:
+    """Get the installed codecs, fastest first."""
+    codecs = [orjson_codec(), ujson_codec(), STDLIB_CODEC]
+    return [codec for codec in codecs if codec]
+
+
+def default_codec() -> JsonCodec:
+    """Get the fastest installed codec, falling back to the standard library."""
+    return available_codecs()[0]
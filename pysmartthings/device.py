@@ -1,11 +1,33 @@
 """Defines a SmartThings device."""
+import asyncio
 from collections import defaultdict, namedtuple
 import colorsys
+import logging
 import re
-from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
-
-from .api import Api
-from .capability import ATTRIBUTE_OFF_VALUES, ATTRIBUTE_ON_VALUES, Attribute, Capability
+import sys
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .api import API_DEVICE, API_DEVICE_STATUS, NOT_MODIFIED, Api
+from .capability import (
+    ATTRIBUTE_OFF_VALUES,
+    ATTRIBUTE_ON_VALUES,
+    ATTRIBUTE_UNITS,
+    ATTRIBUTES,
+    CAPABILITY_REGISTRY,
+    Attribute,
+    Capability,
+)
 from .entity import Entity
 
 DEVICE_TYPE_OCF = "OCF"
@@ -17,6 +39,76 @@ DEVICE_TYPE_VIPER = "VIPER"
 COLOR_HEX_MATCHER = re.compile("^#[A-Fa-f0-9]{6}$")
 Status = namedtuple("status", "value unit data")
 STATUS_NONE = Status(None, None, None)
+AttributeChange = namedtuple(
+    "AttributeChange", "component_id attribute old new capability", defaults=(None,)
+)
+CommandResult = namedtuple(
+    "CommandResult", "component_id capability command args status"
+)
+CommandRequest = namedtuple(
+    "CommandRequest", "component_id capability command args update"
+)
+COMMAND_ACCEPTED_STATUSES = ("ACCEPTED", "COMPLETED")
+
+_LOGGER = logging.getLogger(__name__)
+
+
+_ATTRIBUTE_NAMES = {name: name for name in ATTRIBUTES}
+_UNITS = {unit: unit for unit in ATTRIBUTE_UNITS}
+
+
+def intern_attribute(name: str) -> str:
+    """Get the shared instance of an attribute name."""
+    return _ATTRIBUTE_NAMES.get(name) or sys.intern(name)
+
+
+def intern_unit(unit: Optional[str]) -> Optional[str]:
+    """Get the shared instance of a known unit."""
+    if unit is None:
+        return None
+    return _UNITS.get(unit, unit)
+
+
+def _status_none() -> Status:
+    """Get the status of an attribute that has not been reported."""
+    return STATUS_NONE
+
+
+def _collapse_attributes(capabilities: dict) -> Dict[str, Tuple[str, dict]]:
+    """Get the capability and status last reported for each attribute."""
+    collapsed = {}
+    for capability, statuses in capabilities.items():
+        for attribute, status in statuses.items():
+            collapsed[intern_attribute(attribute)] = (capability, status)
+    return collapsed
+
+
+def _replace_attributes(
+    component_id: str, attributes: Dict[str, Status], capabilities: dict
+) -> List[AttributeChange]:
+    """Replace the attributes in place and return those that changed."""
+    changes = []
+    # An attribute reported by several capabilities takes the last value
+    collapsed = _collapse_attributes(capabilities)
+    for attribute, (capability, status) in collapsed.items():
+        value = status.get("value")
+        unit = intern_unit(status.get("unit"))
+        data = status.get("data")
+        old = attributes.get(attribute)
+        if old and old.value == value and old.unit == unit and old.data == data:
+            continue
+        new = Status(value, unit, data)
+        attributes[attribute] = new
+        old = old or STATUS_NONE
+        if new != old:
+            changes.append(
+                AttributeChange(component_id, attribute, old, new, capability)
+            )
+    for attribute in [name for name in attributes if name not in collapsed]:
+        old = attributes.pop(attribute)
+        if old != STATUS_NONE:
+            changes.append(AttributeChange(component_id, attribute, old, STATUS_NONE))
+    return changes
 
 
 def hs_to_hex(hue: float, saturation: float) -> str:
@@ -87,9 +179,104 @@ class Command:
     channel_down = "channelDown"
 
 
+class _CapabilityList(list):
+    """Define a list of capabilities whose index and mask follow its changes."""
+
+    __slots__ = ("_index", "_mask")
+
+    def __init__(self, capabilities: Iterable[str] = ()):
+        """Create a new instance of the _CapabilityList class."""
+        super().__init__(capabilities)
+        self._index = None
+        self._mask = None
+
+    def _changed(self):
+        self._index = None
+        self._mask = None
+
+    def capability_index(self) -> FrozenSet[str]:
+        """Get the set of the capabilities."""
+        if self._index is None:
+            self._index = frozenset(self)
+        return self._index
+
+    def capability_mask(self) -> int:
+        """Get the bits of CAPABILITY_REGISTRY held by the capabilities."""
+        if self._mask is None:
+            self._mask = CAPABILITY_REGISTRY.register(self)
+        return self._mask
+
+    def __setitem__(self, index, value):
+        """Set an item or slice of the list."""
+        super().__setitem__(index, value)
+        self._changed()
+
+    def __delitem__(self, index):
+        """Delete an item or slice of the list."""
+        super().__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, capabilities):
+        """Extend the list in place."""
+        result = super().__iadd__(capabilities)
+        self._changed()
+        return result
+
+    def __imul__(self, count):
+        """Repeat the list in place."""
+        result = super().__imul__(count)
+        self._changed()
+        return result
+
+    def append(self, capability: str):
+        """Append a capability."""
+        super().append(capability)
+        self._changed()
+
+    def extend(self, capabilities: Iterable[str]):
+        """Extend the list with the capabilities."""
+        super().extend(capabilities)
+        self._changed()
+
+    def insert(self, index: int, capability: str):
+        """Insert a capability before the index."""
+        super().insert(index, capability)
+        self._changed()
+
+    def remove(self, capability: str):
+        """Remove the first occurrence of a capability."""
+        super().remove(capability)
+        self._changed()
+
+    def pop(self, index: int = -1) -> str:
+        """Remove and return the capability at the index."""
+        capability = super().pop(index)
+        self._changed()
+        return capability
+
+    def clear(self):
+        """Remove all of the capabilities."""
+        super().clear()
+        self._changed()
+
+
 class Device:
     """Represents a SmartThings device."""
 
+    __slots__ = (
+        "_device_id",
+        "_name",
+        "_label",
+        "_location_id",
+        "_room_id",
+        "_type",
+        "_device_type_id",
+        "_device_type_name",
+        "_device_type_network",
+        "_components",
+        "_capabilities",
+    )
+
     def __init__(self):
         """Initialize a new device."""
         self._device_id = None
@@ -102,7 +289,8 @@ class Device:
         self._device_type_name = None
         self._device_type_network = None
         self._components = {}
-        self._capabilities = []
+        # Rebuilds its index and mask after any change to the list
+        self._capabilities = _CapabilityList()
 
     def apply_data(self, data: dict):
         """Apply the given data dictionary."""
@@ -123,7 +311,10 @@ class Device:
                 if component_id == "main":
                     self._capabilities.extend(capabilities)
                 else:
-                    self._components[component_id] = capabilities
+                    self._components[component_id] = _CapabilityList(capabilities)
+        self._capabilities.capability_mask()
+        for capabilities in self._components.values():
+            capabilities.capability_mask()
 
         if self._type == DEVICE_TYPE_DTH:
             dth = data.get("dth")
@@ -134,11 +325,38 @@ class Device:
 
     def get_capability(self, *capabilities) -> Optional[str]:
         """Return the first capability held by the device."""
+        index = self.capability_index()
         for capability in capabilities:
-            if capability in self._capabilities:
+            if capability in index:
                 return capability
         return None
 
+    def has_capabilities(
+        self, *capabilities: str, component_id: Optional[str] = None
+    ) -> bool:
+        """Determine if the device or a component holds all of the capabilities."""
+        return self.capability_index(component_id).issuperset(capabilities)
+
+    def capability_mask(self, component_id: Optional[str] = None) -> int:
+        """Get the bits of CAPABILITY_REGISTRY held by the device or a component."""
+        capabilities = self._get_capabilities(component_id)
+        if isinstance(capabilities, _CapabilityList):
+            return capabilities.capability_mask()
+        return CAPABILITY_REGISTRY.register(capabilities)
+
+    def capability_index(self, component_id: Optional[str] = None) -> FrozenSet[str]:
+        """Get the set of capabilities of the device or a component."""
+        capabilities = self._get_capabilities(component_id)
+        if isinstance(capabilities, _CapabilityList):
+            return capabilities.capability_index()
+        return frozenset(capabilities)
+
+    def _get_capabilities(self, component_id: Optional[str]) -> Sequence[str]:
+        if component_id is None or component_id == "main":
+            return self._capabilities
+        # Lists assigned into components directly are not cached
+        return self._components.get(component_id, ())
+
     @property
     def device_id(self) -> str:
         """Get the SmartThings device id."""
@@ -198,12 +416,16 @@ class Device:
 class DeviceStatusBase:
     """Define the base status of device components."""
 
+    __slots__ = ("_attributes", "_component_id", "_modified")
+
     def __init__(
         self, component_id: str, attributes: Optional[Mapping[str, Status]] = None
     ):
         """Initialize the status class."""
-        self._attributes = defaultdict(lambda: STATUS_NONE, attributes or {})
+        self._attributes = defaultdict(_status_none, attributes or {})
         self._component_id = component_id
+        # Set by local updates so a refresh does not skip an unchanged status
+        self._modified = False
 
     def is_on(self, attribute: str) -> bool:
         """Determine if a specific attribute contains an on/True value."""
@@ -215,6 +437,7 @@ class DeviceStatusBase:
         """Update the value of an attribute while maintaining unit and data."""
         status = self._attributes[attribute]
         self._attributes[attribute] = Status(value, status.unit, status.data)
+        self._modified = True
 
     @property
     def attributes(self) -> Dict[str, Status]:
@@ -744,15 +967,114 @@ class DeviceStatusBase:
 class DeviceStatus(DeviceStatusBase):
     """Define the device status."""
 
+    __slots__ = (
+        "_api",
+        "_device_id",
+        "_components",
+        "_version",
+        "_listeners",
+        "_tasks",
+    )
+
     def __init__(self, api: Api, device_id: str, data=None):
         """Create a new instance of the DeviceStatusEntity class."""
         super().__init__("main")
         self._api = api
         self._device_id = device_id
         self._components = {}
+        self._version = None
+        # Created on first use to keep statuses without listeners small
+        self._listeners = None
+        self._tasks = None
         if data:
             self.apply_data(data)
 
+    def add_listener(
+        self,
+        callback: Callable[["DeviceStatus", AttributeChange], Any],
+        *,
+        component_id: Optional[str] = None,
+        capability: Optional[str] = None,
+        attribute: Optional[str] = None,
+    ) -> Callable[[], None]:
+        """
+        Call back when a matching attribute changes.
+
+        The callback receives this status and the AttributeChange. Coroutine
+        functions are scheduled on the running loop. Filters left as None
+        match any value; removed attributes carry no capability. Returns a
+        function that removes the listener.
+        """
+        if attribute is not None:
+            attribute = intern_attribute(attribute)
+        entry = (component_id, capability, callback)
+        if self._listeners is None:
+            self._listeners = {}
+        self._listeners.setdefault(attribute, []).append(entry)
+
+        def remove():
+            entries = self._listeners.get(attribute)
+            if entries and entry in entries:
+                entries.remove(entry)
+                if not entries:
+                    del self._listeners[attribute]
+
+        return remove
+
+    def _dispatch(
+        self,
+        changes: List[AttributeChange],
+        reported: Optional[Dict[Tuple[str, str], Tuple[str, ...]]] = None,
+    ):
+        """
+        Call the listeners matching the changes.
+
+        reported holds every capability reporting an attribute of a component,
+        so a capability filter matches any of them, not only change.capability.
+        A listener that raises is logged without stopping the others.
+        """
+        for change in changes:
+            capabilities = (change.capability,)
+            if reported:
+                capabilities = reported.get(
+                    (change.component_id, change.attribute), capabilities
+                )
+            for key in (change.attribute, None):
+                for component_id, capability, callback in tuple(
+                    self._listeners.get(key, ())
+                ):
+                    if component_id not in (None, change.component_id):
+                        continue
+                    if capability is not None and capability not in capabilities:
+                        continue
+                    try:
+                        result = callback(self, change)
+                        if asyncio.iscoroutine(result):
+                            self._schedule(result)
+                    except Exception:  # pylint: disable=broad-except
+                        _LOGGER.exception(
+                            "Error in the listener of %s", change.attribute
+                        )
+
+    def _schedule(self, coroutine):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Applied outside of a loop, so there is nothing to run it on
+            coroutine.close()
+            _LOGGER.warning("Dropped a coroutine listener called outside of a loop")
+            return
+        if self._tasks is None:
+            self._tasks = set()
+        task = loop.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._listener_done)
+
+    def _listener_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            _LOGGER.error("Error in a coroutine listener", exc_info=task.exception())
+
     def apply_attribute_update(
         self,
         component_id: str,
@@ -761,33 +1083,61 @@ class DeviceStatus(DeviceStatusBase):
         value: Any,
         unit: Optional[str] = None,
         data: Optional[Dict] = None,
-    ):
-        """Apply an update to a specific attribute."""
+    ) -> Optional[AttributeChange]:
+        """Apply an update to a specific attribute and return the change, if any."""
         component = self
         if component_id != "main" and component_id in self._components:
             component = self._components[component_id]
 
         # preserve unit until fixed in the API
+        attribute = intern_attribute(attribute)
         old_status = component.attributes[attribute]
-        component.attributes[attribute] = Status(value, unit or old_status.unit, data)
-
-    def apply_data(self, data: dict):
-        """Apply the values from the given data structure."""
-        self._components.clear()
-        for component_id, component in data["components"].items():
-            attributes = {}
-            for capabilities in component.values():
-                for attribute, value in capabilities.items():
-                    attributes[attribute] = Status(
-                        value.get("value"), value.get("unit"), value.get("data")
-                    )
+        new_status = Status(value, intern_unit(unit) or old_status.unit, data)
+        if new_status == old_status:
+            return None
+        component.attributes[attribute] = new_status
+        component._modified = True  # pylint: disable=protected-access
+        change = AttributeChange(
+            component.component_id, attribute, old_status, new_status, capability
+        )
+        if self._listeners:
+            self._dispatch([change])
+        return change
+
+    def apply_data(self, data: dict) -> List[AttributeChange]:
+        """
+        Apply the values from the given data structure.
+
+        Components are updated in place and the attributes that changed,
+        appeared or were removed are returned.
+        """
+        self._version = None
+        changes = []
+        reported = {} if self._listeners else None
+        components = data["components"]
+        for component_id in [key for key in self._components if key not in components]:
+            removed = self._components.pop(component_id)
+            changes.extend(_replace_attributes(component_id, removed.attributes, {}))
+        for component_id, component in components.items():
             if component_id == "main":
-                self._attributes.clear()
-                self._attributes.update(attributes)
+                status = self
             else:
-                self._components[component_id] = DeviceStatusBase(
-                    component_id, attributes
-                )
+                status = self._components.get(component_id)
+                if status is None:
+                    status = self._components[component_id] = DeviceStatusBase(
+                        component_id
+                    )
+            changes.extend(
+                _replace_attributes(component_id, status.attributes, component)
+            )
+            if reported is not None:
+                for capability, statuses in component.items():
+                    for attribute in statuses:
+                        key = (component_id, intern_attribute(attribute))
+                        reported[key] = reported.get(key, ()) + (capability,)
+        if self._listeners:
+            self._dispatch(changes, reported)
+        return changes
 
     @property
     def components(self) -> Dict[str, DeviceStatusBase]:
@@ -804,50 +1154,74 @@ class DeviceStatus(DeviceStatusBase):
         """Set the device id."""
         self._device_id = value
 
+    @property
+    def version(self) -> Optional[tuple]:
+        """Get the version of the last refresh, None once updated locally."""
+        if self._modified or any(
+            component._modified  # pylint: disable=protected-access
+            for component in self._components.values()
+        ):
+            return None
+        return self._version
+
+    def apply_refresh(
+        self, data, version: Optional[tuple] = None
+    ) -> List[AttributeChange]:
+        """
+        Apply the data returned by a refresh and return the changes.
+
+        Nothing is applied when data is NOT_MODIFIED. version is that of the
+        data, from Api.response_version, and lets the next refresh skip an
+        unchanged status.
+        """
+        changes = []
+        if data and data is not NOT_MODIFIED:
+            changes = self.apply_data(data)
+        self._version = version
+        self._modified = False
+        for component in self._components.values():
+            component._modified = False  # pylint: disable=protected-access
+        return changes
+
     async def refresh(self):
         """Refresh the values of the entity."""
-        data = await self._api.get_device_status(self.device_id)
-        if data:
-            self.apply_data(data)
+        data = await self._api.get_device_status(
+            self._device_id, validated=self.version
+        )
+        self.apply_refresh(
+            data,
+            self._api.response_version(
+                API_DEVICE_STATUS.format(device_id=self._device_id)
+            ),
+        )
 
 
-class DeviceEntity(Entity, Device):
-    """Define a device entity."""
+class DeviceCommands:
+    """
+    Define the device command builders shared by DeviceEntity and CommandBatch.
 
-    def __init__(
-        self, api: Api, data: Optional[dict] = None, device_id: Optional[str] = None
-    ):
-        """Create a new instance of the DeviceEntity class."""
-        Entity.__init__(self, api)
-        Device.__init__(self)
-        if data:
-            self.apply_data(data)
-        if device_id:
-            self._device_id = device_id
-        self._status = DeviceStatus(api, self._device_id)
+    Each builder validates its arguments and returns a CommandRequest holding
+    the status update to apply when set_status is set. DeviceEntity sends the
+    request and CommandBatch queues it.
+    """
 
-    async def refresh(self):
-        """Refresh the device information using the API."""
-        data = await self._api.get_device(self._device_id)
-        if data:
-            self.apply_data(data)
-        self._status.device_id = self._device_id
+    __slots__ = ("_device",)
 
-    async def save(self):
-        """Save the changes made to the device."""
-        raise NotImplementedError
+    def __init__(self, device: Device):
+        """Create a new instance of the DeviceCommands class."""
+        self._device = device
 
-    async def command(self, component_id: str, capability, command, args=None) -> bool:
-        """Execute a command on the device."""
-        response = await self._api.post_device_command(
-            self._device_id, component_id, capability, command, args
-        )
-        try:
-            return response["results"][0]["status"] in ("ACCEPTED", "COMPLETED")
-        except (KeyError, IndexError):
-            return False
+    def _request(
+        self,
+        component_id: str,
+        capability: str,
+        command: str,
+        args: Optional[list] = None,
+        update: Optional[Callable[[DeviceStatus], None]] = None,
+    ) -> CommandRequest:
+        return CommandRequest(component_id, capability, command, args, update)
 
-    async def set_color(
+    def set_color(
         self,
         hue: Optional[float] = None,
         saturation: Optional[float] = None,
@@ -855,8 +1229,8 @@ class DeviceEntity(Entity, Device):
         set_status: bool = False,
         *,
         component_id: str = "main",
-    ) -> bool:
-        """Call the set color command."""
+    ) -> CommandRequest:
+        """Build the set color command."""
         color_map = {}
         if color_hex:
             if not COLOR_HEX_MATCHER.match(color_hex):
@@ -872,236 +1246,299 @@ class DeviceEntity(Entity, Device):
             color_map["hue"] = hue
             color_map["saturation"] = saturation
 
-        result = await self.command(
-            component_id, Capability.color_control, Command.set_color, [color_map]
-        )
-        if result and set_status:
+        def update(status: DeviceStatus):
             if color_hex:
-                self.status.color = color_hex
-                self.status.hue, self.status.saturation = hex_to_hs(color_hex)
+                status.color = color_hex
+                status.hue, status.saturation = hex_to_hs(color_hex)
             else:
-                self.status.color = hs_to_hex(hue, saturation)
-                self.status.hue = hue
-                self.status.saturation = saturation
-        return result
+                status.color = hs_to_hex(hue, saturation)
+                status.hue = hue
+                status.saturation = saturation
 
-    async def set_color_temperature(
+        return self._request(
+            component_id,
+            Capability.color_control,
+            Command.set_color,
+            [color_map],
+            update if set_status else None,
+        )
+
+    def set_color_temperature(
         self, temperature: int, set_status: bool = False, *, component_id: str = "main"
-    ) -> bool:
-        """Call the color temperature device command."""
+    ) -> CommandRequest:
+        """Build the color temperature device command."""
         if not 1 <= temperature <= 30000:
             raise ValueError("temperature must be scaled between 1-30000.")
 
-        result = await self.command(
+        def update(status: DeviceStatus):
+            status.color_temperature = temperature
+
+        return self._request(
             component_id,
             Capability.color_temperature,
             Command.set_color_temperature,
             [temperature],
+            update if set_status else None,
         )
-        if result and set_status:
-            self.status.color_temperature = temperature
-        return result
 
-    async def set_fan_speed(
+    def set_fan_speed(
         self, speed: int, set_status: bool = False, *, component_id: str = "main"
-    ) -> bool:
-        """Call the set fan speed device command."""
+    ) -> CommandRequest:
+        """Build the set fan speed device command."""
         if speed < 0:
             raise ValueError("value must be >= 0.")
 
-        result = await self.command(
-            component_id, Capability.fan_speed, Command.set_fan_speed, [speed]
+        def update(status: DeviceStatus):
+            status.fan_speed = speed
+            status.switch = speed > 0
+
+        return self._request(
+            component_id,
+            Capability.fan_speed,
+            Command.set_fan_speed,
+            [speed],
+            update if set_status else None,
         )
-        if result and set_status:
-            self.status.fan_speed = speed
-            self.status.switch = speed > 0
-        return result
 
-    async def set_hue(
+    def set_hue(
         self, hue: int, set_status: bool = False, *, component_id: str = "main"
-    ) -> bool:
-        """Call the set hue device command."""
+    ) -> CommandRequest:
+        """Build the set hue device command."""
         if not 0 <= hue <= 100:
             raise ValueError("hue must be scaled between 0-100.")
 
-        result = await self.command(
-            component_id, Capability.color_control, Command.set_hue, [hue]
+        def update(status: DeviceStatus):
+            status.hue = hue
+
+        return self._request(
+            component_id,
+            Capability.color_control,
+            Command.set_hue,
+            [hue],
+            update if set_status else None,
         )
-        if result and set_status:
-            self.status.hue = hue
-        return result
 
-    async def set_level(
+    def set_level(
         self,
         level: int,
         duration: int = 0,
         set_status: bool = False,
         *,
         component_id: str = "main",
-    ) -> bool:
-        """Call the set level device command."""
+    ) -> CommandRequest:
+        """Build the set level device command."""
         if not 0 <= level <= 100:
             raise ValueError("level must be scaled between 0-100.")
         if duration < 0:
             raise ValueError("duration must be >= 0.")
 
-        result = await self.command(
-            component_id, Capability.switch_level, Command.set_level, [level, duration]
+        def update(status: DeviceStatus):
+            status.level = level
+            status.switch = level > 0
+
+        return self._request(
+            component_id,
+            Capability.switch_level,
+            Command.set_level,
+            [level, duration],
+            update if set_status else None,
         )
-        if result and set_status:
-            self.status.level = level
-            self.status.switch = level > 0
-        return result
 
-    async def set_saturation(
+    def set_saturation(
         self, saturation: int, set_status: bool = False, *, component_id: str = "main"
-    ) -> bool:
-        """Call the set saturation device command."""
+    ) -> CommandRequest:
+        """Build the set saturation device command."""
         if not 0 <= saturation <= 100:
             raise ValueError("saturation must be scaled between 0-100.")
 
-        result = await self.command(
-            component_id, Capability.color_control, Command.set_saturation, [saturation]
+        def update(status: DeviceStatus):
+            status.saturation = saturation
+
+        return self._request(
+            component_id,
+            Capability.color_control,
+            Command.set_saturation,
+            [saturation],
+            update if set_status else None,
         )
-        if result and set_status:
-            self.status.saturation = saturation
-        return result
 
-    async def set_thermostat_fan_mode(
+    def set_thermostat_fan_mode(
         self, mode: str, set_status: bool = False, *, component_id: str = "main"
-    ) -> bool:
-        """Call the setThermostatFanMode device command."""
-        capability = self.get_capability(
+    ) -> CommandRequest:
+        """Build the setThermostatFanMode device command."""
+        capability = self._device.get_capability(
             Capability.thermostat_fan_mode, Capability.thermostat
         )
-        result = await self.command(
-            component_id, capability, Command.set_thermostat_fan_mode, [mode]
+
+        def update(status: DeviceStatus):
+            status.thermostat_fan_mode = mode
+
+        return self._request(
+            component_id,
+            capability,
+            Command.set_thermostat_fan_mode,
+            [mode],
+            update if set_status else None,
         )
-        if result and set_status:
-            self.status.thermostat_fan_mode = mode
-        return result
 
-    async def set_thermostat_mode(
+    def set_thermostat_mode(
         self, mode: str, set_status: bool = False, *, component_id: str = "main"
-    ) -> bool:
-        """Call the setThermostatMode deivce command."""
-        capability = self.get_capability(
+    ) -> CommandRequest:
+        """Build the setThermostatMode deivce command."""
+        capability = self._device.get_capability(
             Capability.thermostat_mode, Capability.thermostat
         )
-        result = await self.command(
-            component_id, capability, Command.set_thermostat_mode, [mode]
+
+        def update(status: DeviceStatus):
+            status.thermostat_mode = mode
+
+        return self._request(
+            component_id,
+            capability,
+            Command.set_thermostat_mode,
+            [mode],
+            update if set_status else None,
         )
-        if result and set_status:
-            self.status.thermostat_mode = mode
-        return result
 
-    async def set_cooling_setpoint(
+    def set_cooling_setpoint(
         self, temperature: int, set_status: bool = False, *, component_id: str = "main"
-    ) -> bool:
-        """Call the setThermostatMode deivce command."""
-        capability = self.get_capability(
+    ) -> CommandRequest:
+        """Build the setThermostatMode deivce command."""
+        capability = self._device.get_capability(
             Capability.thermostat_cooling_setpoint, Capability.thermostat
         )
-        result = await self.command(
-            component_id, capability, Command.set_cooling_setpoint, [temperature]
+
+        def update(status: DeviceStatus):
+            status.cooling_setpoint = temperature
+
+        return self._request(
+            component_id,
+            capability,
+            Command.set_cooling_setpoint,
+            [temperature],
+            update if set_status else None,
         )
-        if result and set_status:
-            self.status.cooling_setpoint = temperature
-        return result
 
-    async def set_heating_setpoint(
+    def set_heating_setpoint(
         self, temperature: int, set_status: bool = False, *, component_id: str = "main"
-    ) -> bool:
-        """Call the setThermostatMode deivce command."""
-        capability = self.get_capability(
+    ) -> CommandRequest:
+        """Build the setThermostatMode deivce command."""
+        capability = self._device.get_capability(
             Capability.thermostat_heating_setpoint, Capability.thermostat
         )
-        result = await self.command(
-            component_id, capability, Command.set_heating_setpoint, [temperature]
+
+        def update(status: DeviceStatus):
+            status.heating_setpoint = temperature
+
+        return self._request(
+            component_id,
+            capability,
+            Command.set_heating_setpoint,
+            [temperature],
+            update if set_status else None,
         )
-        if result and set_status:
-            self.status.heating_setpoint = temperature
-        return result
 
-    async def switch_off(
+    def switch_off(
         self, set_status: bool = False, *, component_id: str = "main"
-    ) -> bool:
-        """Call the switch off device command."""
-        result = await self.command(component_id, Capability.switch, Command.off)
-        if result and set_status:
-            self.status.switch = False
-        return result
+    ) -> CommandRequest:
+        """Build the switch off device command."""
 
-    async def switch_on(
-        self, set_status: bool = False, *, component_id: str = "main"
-    ) -> bool:
-        """Call the switch on device command."""
-        result = await self.command(component_id, Capability.switch, Command.on)
-        if result and set_status:
-            self.status.switch = True
-        return result
+        def update(status: DeviceStatus):
+            status.switch = False
 
-    async def lock(
-        self, set_status: bool = False, *, component_id: str = "main"
-    ) -> bool:
-        """Call the lock device command."""
-        result = await self.command(component_id, Capability.lock, Command.lock)
-        if result and set_status:
-            self.status.update_attribute_value(Attribute.lock, "locked")
-        return result
+        return self._request(
+            component_id,
+            Capability.switch,
+            Command.off,
+            update=update if set_status else None,
+        )
 
-    async def unlock(
+    def switch_on(
         self, set_status: bool = False, *, component_id: str = "main"
-    ) -> bool:
-        """Call the unlock device command."""
-        result = await self.command(component_id, Capability.lock, Command.unlock)
-        if result and set_status:
-            self.status.update_attribute_value(Attribute.lock, "unlocked")
-        return result
+    ) -> CommandRequest:
+        """Build the switch on device command."""
 
-    async def open(
+        def update(status: DeviceStatus):
+            status.switch = True
+
+        return self._request(
+            component_id,
+            Capability.switch,
+            Command.on,
+            update=update if set_status else None,
+        )
+
+    def lock(
         self, set_status: bool = False, *, component_id: str = "main"
-    ) -> bool:
-        """Call the open device command."""
-        capability = self.get_capability(
-            Capability.door_control,
-            Capability.window_shade,
-            Capability.garage_door_control,
+    ) -> CommandRequest:
+        """Build the lock device command."""
+
+        def update(status: DeviceStatus):
+            status.update_attribute_value(Attribute.lock, "locked")
+
+        return self._request(
+            component_id,
+            Capability.lock,
+            Command.lock,
+            update=update if set_status else None,
         )
-        result = await self.command(component_id, capability, Command.open)
-        if result and set_status:
-            attribute = (
-                Attribute.window_shade
-                if capability == Capability.window_shade
-                else Attribute.door
-            )
-            self.status.update_attribute_value(attribute, "opening")
-        return result
 
-    async def close(
+    def unlock(
         self, set_status: bool = False, *, component_id: str = "main"
-    ) -> bool:
-        """Call the close device command."""
-        capability = self.get_capability(
+    ) -> CommandRequest:
+        """Build the unlock device command."""
+
+        def update(status: DeviceStatus):
+            status.update_attribute_value(Attribute.lock, "unlocked")
+
+        return self._request(
+            component_id,
+            Capability.lock,
+            Command.unlock,
+            update=update if set_status else None,
+        )
+
+    def _door_command(
+        self, command: str, value: str, set_status: bool, component_id: str
+    ):
+        capability = self._device.get_capability(
             Capability.door_control,
             Capability.window_shade,
             Capability.garage_door_control,
         )
-        result = await self.command(component_id, capability, Command.close)
-        if result and set_status:
-            attribute = (
-                Attribute.window_shade
-                if capability == Capability.window_shade
-                else Attribute.door
-            )
-            self.status.update_attribute_value(attribute, "closing")
-        return result
+        attribute = (
+            Attribute.window_shade
+            if capability == Capability.window_shade
+            else Attribute.door
+        )
 
-    async def preset_position(self, *, component_id: str = "main") -> bool:
-        """Call the close device command."""
-        return await self.command(component_id, Capability.window_shade, Command.close)
+        def update(status: DeviceStatus):
+            status.update_attribute_value(attribute, value)
 
-    async def request_drlc_action(
+        return self._request(
+            component_id,
+            capability,
+            command,
+            update=update if set_status else None,
+        )
+
+    def open(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the open device command."""
+        return self._door_command(Command.open, "opening", set_status, component_id)
+
+    def close(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the close device command."""
+        return self._door_command(Command.close, "closing", set_status, component_id)
+
+    def preset_position(self, *, component_id: str = "main") -> CommandRequest:
+        """Build the close device command."""
+        return self._request(component_id, Capability.window_shade, Command.close)
+
+    def request_drlc_action(
         self,
         drlc_type: int,
         drlc_level: int,
@@ -1111,321 +1548,906 @@ class DeviceEntity(Entity, Device):
         *,
         set_status: bool = False,
         component_id: str = "main",
-    ):
-        """Call the drlc action command."""
+    ) -> CommandRequest:
+        """Build the drlc action command."""
         args = [drlc_type, drlc_level, start, duration]
         if reporting_period is not None:
             args.append(reporting_period)
-        result = await self.command(
-            component_id,
-            Capability.demand_response_load_control,
-            Command.request_drlc_action,
-            args,
-        )
-        if result and set_status:
+
+        def update(status: DeviceStatus):
             data = {
                 "duration": duration,
                 "drlcLevel": drlc_level,
                 "start": start,
                 "override": False,
             }
-            self.status.apply_attribute_update(
+            status.apply_attribute_update(
                 component_id,
                 Capability.demand_response_load_control,
                 Attribute.drlc_status,
                 data,
             )
-        return result
 
-    async def override_drlc_action(
+        return self._request(
+            component_id,
+            Capability.demand_response_load_control,
+            Command.request_drlc_action,
+            args,
+            update if set_status else None,
+        )
+
+    def override_drlc_action(
         self, value: bool, *, set_status: bool = False, component_id: str = "main"
-    ):
-        """Call the drlc override command."""
-        result = await self.command(
+    ) -> CommandRequest:
+        """Build the drlc override command."""
+
+        def update(status: DeviceStatus):
+            # Replaced rather than changed in place, so the update is tracked
+            data = dict(status.drlc_status or {})
+            data["override"] = value
+            status.apply_attribute_update(
+                component_id,
+                Capability.demand_response_load_control,
+                Attribute.drlc_status,
+                data,
+            )
+
+        return self._request(
             component_id,
             Capability.demand_response_load_control,
             Command.override_drlc_action,
             [value],
+            update if set_status else None,
         )
-        if result and set_status:
-            data = self.status.drlc_status
-            if not data:
-                data = {}
-                self.status.apply_attribute_update(
-                    component_id,
-                    Capability.demand_response_load_control,
-                    Attribute.drlc_status,
-                    data,
-                )
-            data["override"] = value
-        return result
 
-    async def execute(
+    def execute(
         self, command: str, args: Dict = None, *, component_id: str = "main"
-    ):
-        """Call the execute command."""
+    ) -> CommandRequest:
+        """Build the execute command."""
         command_args = [command]
         if args:
             command_args.append(args)
-        return await self.command(
+        return self._request(
             component_id, Capability.execute, Command.execute, command_args
         )
 
-    async def set_air_conditioner_mode(
-        self, mode: str, *, set_status: bool = False, component_id: str = "main"
+    def _set_value(
+        self,
+        component_id: str,
+        capability: str,
+        command: str,
+        attribute: str,
+        value: Any,
+        set_status: bool,
     ):
-        """Call the set air conditioner mode command."""
-        result = await self.command(
+        def update(status: DeviceStatus):
+            status.update_attribute_value(attribute, value)
+
+        return self._request(
+            component_id, capability, command, [value], update if set_status else None
+        )
+
+    def set_air_conditioner_mode(
+        self, mode: str, *, set_status: bool = False, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the set air conditioner mode command."""
+        return self._set_value(
             component_id,
             Capability.air_conditioner_mode,
             Command.set_air_conditioner_mode,
-            [mode],
+            Attribute.air_conditioner_mode,
+            mode,
+            set_status,
         )
-        if result and set_status:
-            self.status.update_attribute_value(Attribute.air_conditioner_mode, mode)
-        return result
 
-    async def set_fan_mode(
+    def set_fan_mode(
         self, mode: str, *, set_status: bool = False, component_id: str = "main"
-    ):
-        """Call the setFanMode command."""
-        result = await self.command(
+    ) -> CommandRequest:
+        """Build the setFanMode command."""
+        return self._set_value(
             component_id,
             Capability.air_conditioner_fan_mode,
             Command.set_fan_mode,
-            [mode],
+            Attribute.fan_mode,
+            mode,
+            set_status,
         )
-        if result and set_status:
-            self.status.update_attribute_value(Attribute.fan_mode, mode)
-        return result
 
-    async def set_fan_oscillation_mode(
+    def set_fan_oscillation_mode(
         self, mode: str, *, set_status: bool = False, component_id: str = "main"
-    ):
-        """Call the setFanOscillationMode command."""
-        result = await self.command(
+    ) -> CommandRequest:
+        """Build the setFanOscillationMode command."""
+        return self._set_value(
             component_id,
             Capability.fan_oscillation_mode,
             Command.set_fan_oscillation_mode,
-            [mode],
+            Attribute.fan_oscillation_mode,
+            mode,
+            set_status,
         )
-        if result and set_status:
-            self.status.update_attribute_value(Attribute.fan_oscillation_mode, mode)
-        return result
 
-    async def set_air_flow_direction(
+    def set_air_flow_direction(
         self, direction: str, *, set_status: bool = False, component_id: str = "main"
-    ):
-        """Call the setAirFlowDirection command."""
-        result = await self.command(
+    ) -> CommandRequest:
+        """Build the setAirFlowDirection command."""
+        return self._set_value(
             component_id,
             Capability.air_flow_direction,
             Command.set_air_flow_direction,
-            [direction],
+            Attribute.air_flow_direction,
+            direction,
+            set_status,
+        )
+
+    def mute(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the mute command."""
+
+        def update(status: DeviceStatus):
+            status.mute = True
+
+        return self._request(
+            component_id,
+            Capability.audio_mute,
+            Command.mute,
+            update=update if set_status else None,
+        )
+
+    def unmute(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the unmute command."""
+
+        def update(status: DeviceStatus):
+            status.mute = False
+
+        return self._request(
+            component_id,
+            Capability.audio_mute,
+            Command.unmute,
+            update=update if set_status else None,
+        )
+
+    def set_volume(
+        self, volume: int, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the setVolume command."""
+
+        def update(status: DeviceStatus):
+            status.volume = volume
+
+        return self._request(
+            component_id,
+            Capability.audio_volume,
+            Command.set_volume,
+            [volume],
+            update if set_status else None,
+        )
+
+    def volume_up(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the volumeUp command."""
+
+        def update(status: DeviceStatus):
+            status.volume = min(status.volume + 1, 100)
+
+        return self._request(
+            component_id,
+            Capability.audio_volume,
+            Command.volume_up,
+            update=update if set_status else None,
+        )
+
+    def volume_down(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the volumeDown command."""
+
+        def update(status: DeviceStatus):
+            status.volume = max(status.volume - 1, 0)
+
+        return self._request(
+            component_id,
+            Capability.audio_volume,
+            Command.volume_down,
+            update=update if set_status else None,
+        )
+
+    def _playback(self, command: str, value: str, set_status: bool, component_id: str):
+        def update(status: DeviceStatus):
+            status.playback_status = value
+
+        return self._request(
+            component_id,
+            Capability.media_playback,
+            command,
+            update=update if set_status else None,
+        )
+
+    def play(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the play command."""
+        return self._playback(Command.play, "play", set_status, component_id)
+
+    def pause(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the pause command."""
+        return self._playback(Command.pause, "pause", set_status, component_id)
+
+    def stop(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the stop command."""
+        return self._playback(Command.stop, "stop", set_status, component_id)
+
+    def fast_forward(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the fastForward command."""
+        return self._playback(
+            Command.fast_forward, "fast forward", set_status, component_id
+        )
+
+    def rewind(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the rewind command."""
+        return self._playback(Command.rewind, "rewind", set_status, component_id)
+
+    def set_input_source(
+        self, source: str, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the setInputSource command."""
+
+        def update(status: DeviceStatus):
+            status.input_source = source
+
+        return self._request(
+            component_id,
+            Capability.media_input_source,
+            Command.set_input_source,
+            [source],
+            update if set_status else None,
+        )
+
+    def set_playback_shuffle(
+        self, shuffle: bool, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the setPlaybackShuffle command."""
+        shuffle_value = bool_to_value(Attribute.playback_shuffle, shuffle)
+
+        def update(status: DeviceStatus):
+            status.playback_shuffle = shuffle
+
+        return self._request(
+            component_id,
+            Capability.media_playback_shuffle,
+            Command.set_playback_shuffle,
+            [shuffle_value],
+            update if set_status else None,
+        )
+
+    def set_repeat(
+        self, repeat: str, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the setPlaybackRepeatMode command."""
+
+        def update(status: DeviceStatus):
+            status.playback_repeat_mode = repeat
+
+        return self._request(
+            component_id,
+            Capability.media_playback_repeat,
+            Command.set_playback_repeat_mode,
+            [repeat],
+            update if set_status else None,
+        )
+
+    def set_tv_channel(
+        self, channel: str, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the setTvChannel command."""
+
+        def update(status: DeviceStatus):
+            status.tv_channel = channel
+
+        return self._request(
+            component_id,
+            Capability.tv_channel,
+            Command.set_tv_channel,
+            [channel],
+            update if set_status else None,
+        )
+
+    def channel_up(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the channelUp command."""
+        return self._request(component_id, Capability.tv_channel, Command.channel_up)
+
+    def channel_down(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> CommandRequest:
+        """Build the channelDown command."""
+        return self._request(component_id, Capability.tv_channel, Command.channel_down)
+
+    def set_window_shade_level(
+        self,
+        level: int,
+        set_status: bool = False,
+        *,
+        component_id: str = "main",
+    ) -> CommandRequest:
+        """Build the set shade level device command."""
+        if not 0 <= level <= 100:
+            raise ValueError("level must be scaled between 0-100.")
+
+        def update(status: DeviceStatus):
+            status.shade_level = level
+            status.switch = level > 0
+
+        return self._request(
+            component_id,
+            Capability.window_shade_level,
+            Command.set_shade_level,
+            [level],
+            update if set_status else None,
+        )
+
+
+class DeviceEntity(Entity, Device):
+    """Define a device entity."""
+
+    __slots__ = ("_api", "_status", "_version")
+
+    def __init__(
+        self, api: Api, data: Optional[dict] = None, device_id: Optional[str] = None
+    ):
+        """Create a new instance of the DeviceEntity class."""
+        Entity.__init__(self, api)
+        Device.__init__(self)
+        self._version = None
+        if data:
+            self.apply_data(data)
+        if device_id:
+            self._device_id = device_id
+        self._status = DeviceStatus(api, self._device_id)
+
+    def apply_data(self, data: dict):
+        """Apply the given data dictionary."""
+        super().apply_data(data)
+        self._version = None
+
+    async def refresh(self):
+        """Refresh the device information using the API."""
+        data = await self._api.get_device(self._device_id, validated=self._version)
+        if data is not NOT_MODIFIED:
+            if data:
+                self.apply_data(data)
+            self._version = self._api.response_version(
+                API_DEVICE.format(device_id=self._device_id)
+            )
+        self._status.device_id = self._device_id
+
+    async def save(self):
+        """Save the changes made to the device."""
+        raise NotImplementedError
+
+    async def command(self, component_id: str, capability, command, args=None) -> bool:
+        """Execute a command on the device."""
+        response = await self._api.post_device_command(
+            self._device_id, component_id, capability, command, args
+        )
+        try:
+            return response["results"][0]["status"] in COMMAND_ACCEPTED_STATUSES
+        except (KeyError, IndexError):
+            return False
+
+    def batch(self) -> "CommandBatch":
+        """Create a batch that sends several commands in a single request."""
+        return CommandBatch(self._api, self)
+
+    async def set_color(
+        self,
+        hue: Optional[float] = None,
+        saturation: Optional[float] = None,
+        color_hex: Optional[str] = None,
+        set_status: bool = False,
+        *,
+        component_id: str = "main",
+    ) -> bool:
+        """Call the set color command."""
+        return await self._send(
+            DeviceCommands(self).set_color(
+                hue, saturation, color_hex, set_status, component_id=component_id
+            )
+        )
+
+    async def set_color_temperature(
+        self, temperature: int, set_status: bool = False, *, component_id: str = "main"
+    ) -> bool:
+        """Call the color temperature device command."""
+        return await self._send(
+            DeviceCommands(self).set_color_temperature(
+                temperature, set_status, component_id=component_id
+            )
+        )
+
+    async def set_fan_speed(
+        self, speed: int, set_status: bool = False, *, component_id: str = "main"
+    ) -> bool:
+        """Call the set fan speed device command."""
+        return await self._send(
+            DeviceCommands(self).set_fan_speed(
+                speed, set_status, component_id=component_id
+            )
+        )
+
+    async def set_hue(
+        self, hue: int, set_status: bool = False, *, component_id: str = "main"
+    ) -> bool:
+        """Call the set hue device command."""
+        return await self._send(
+            DeviceCommands(self).set_hue(hue, set_status, component_id=component_id)
+        )
+
+    async def set_level(
+        self,
+        level: int,
+        duration: int = 0,
+        set_status: bool = False,
+        *,
+        component_id: str = "main",
+    ) -> bool:
+        """Call the set level device command."""
+        return await self._send(
+            DeviceCommands(self).set_level(
+                level, duration, set_status, component_id=component_id
+            )
+        )
+
+    async def set_saturation(
+        self, saturation: int, set_status: bool = False, *, component_id: str = "main"
+    ) -> bool:
+        """Call the set saturation device command."""
+        return await self._send(
+            DeviceCommands(self).set_saturation(
+                saturation, set_status, component_id=component_id
+            )
+        )
+
+    async def set_thermostat_fan_mode(
+        self, mode: str, set_status: bool = False, *, component_id: str = "main"
+    ) -> bool:
+        """Call the setThermostatFanMode device command."""
+        return await self._send(
+            DeviceCommands(self).set_thermostat_fan_mode(
+                mode, set_status, component_id=component_id
+            )
+        )
+
+    async def set_thermostat_mode(
+        self, mode: str, set_status: bool = False, *, component_id: str = "main"
+    ) -> bool:
+        """Call the setThermostatMode deivce command."""
+        return await self._send(
+            DeviceCommands(self).set_thermostat_mode(
+                mode, set_status, component_id=component_id
+            )
+        )
+
+    async def set_cooling_setpoint(
+        self, temperature: int, set_status: bool = False, *, component_id: str = "main"
+    ) -> bool:
+        """Call the setThermostatMode deivce command."""
+        return await self._send(
+            DeviceCommands(self).set_cooling_setpoint(
+                temperature, set_status, component_id=component_id
+            )
+        )
+
+    async def set_heating_setpoint(
+        self, temperature: int, set_status: bool = False, *, component_id: str = "main"
+    ) -> bool:
+        """Call the setThermostatMode deivce command."""
+        return await self._send(
+            DeviceCommands(self).set_heating_setpoint(
+                temperature, set_status, component_id=component_id
+            )
+        )
+
+    async def switch_off(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> bool:
+        """Call the switch off device command."""
+        return await self._send(
+            DeviceCommands(self).switch_off(set_status, component_id=component_id)
+        )
+
+    async def switch_on(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> bool:
+        """Call the switch on device command."""
+        return await self._send(
+            DeviceCommands(self).switch_on(set_status, component_id=component_id)
+        )
+
+    async def lock(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> bool:
+        """Call the lock device command."""
+        return await self._send(
+            DeviceCommands(self).lock(set_status, component_id=component_id)
+        )
+
+    async def unlock(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> bool:
+        """Call the unlock device command."""
+        return await self._send(
+            DeviceCommands(self).unlock(set_status, component_id=component_id)
+        )
+
+    async def open(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> bool:
+        """Call the open device command."""
+        return await self._send(
+            DeviceCommands(self).open(set_status, component_id=component_id)
+        )
+
+    async def close(
+        self, set_status: bool = False, *, component_id: str = "main"
+    ) -> bool:
+        """Call the close device command."""
+        return await self._send(
+            DeviceCommands(self).close(set_status, component_id=component_id)
+        )
+
+    async def preset_position(self, *, component_id: str = "main") -> bool:
+        """Call the close device command."""
+        return await self._send(
+            DeviceCommands(self).preset_position(component_id=component_id)
+        )
+
+    async def request_drlc_action(
+        self,
+        drlc_type: int,
+        drlc_level: int,
+        start: str,
+        duration: int,
+        reporting_period: int = None,
+        *,
+        set_status: bool = False,
+        component_id: str = "main",
+    ) -> bool:
+        """Call the drlc action command."""
+        return await self._send(
+            DeviceCommands(self).request_drlc_action(
+                drlc_type,
+                drlc_level,
+                start,
+                duration,
+                reporting_period,
+                set_status=set_status,
+                component_id=component_id,
+            )
+        )
+
+    async def override_drlc_action(
+        self, value: bool, *, set_status: bool = False, component_id: str = "main"
+    ) -> bool:
+        """Call the drlc override command."""
+        return await self._send(
+            DeviceCommands(self).override_drlc_action(
+                value, set_status=set_status, component_id=component_id
+            )
+        )
+
+    async def execute(
+        self, command: str, args: Dict = None, *, component_id: str = "main"
+    ) -> bool:
+        """Call the execute command."""
+        return await self._send(
+            DeviceCommands(self).execute(command, args, component_id=component_id)
+        )
+
+    async def set_air_conditioner_mode(
+        self, mode: str, *, set_status: bool = False, component_id: str = "main"
+    ) -> bool:
+        """Call the set air conditioner mode command."""
+        return await self._send(
+            DeviceCommands(self).set_air_conditioner_mode(
+                mode, set_status=set_status, component_id=component_id
+            )
+        )
+
+    async def set_fan_mode(
+        self, mode: str, *, set_status: bool = False, component_id: str = "main"
+    ) -> bool:
+        """Call the setFanMode command."""
+        return await self._send(
+            DeviceCommands(self).set_fan_mode(
+                mode, set_status=set_status, component_id=component_id
+            )
+        )
+
+    async def set_fan_oscillation_mode(
+        self, mode: str, *, set_status: bool = False, component_id: str = "main"
+    ) -> bool:
+        """Call the setFanOscillationMode command."""
+        return await self._send(
+            DeviceCommands(self).set_fan_oscillation_mode(
+                mode, set_status=set_status, component_id=component_id
+            )
+        )
+
+    async def set_air_flow_direction(
+        self, direction: str, *, set_status: bool = False, component_id: str = "main"
+    ) -> bool:
+        """Call the setAirFlowDirection command."""
+        return await self._send(
+            DeviceCommands(self).set_air_flow_direction(
+                direction, set_status=set_status, component_id=component_id
+            )
         )
-        if result and set_status:
-            self.status.update_attribute_value(Attribute.air_flow_direction, direction)
-        return result
 
     async def mute(
         self, set_status: bool = False, *, component_id: str = "main"
     ) -> bool:
         """Call the mute command."""
-        result = await self.command(component_id, Capability.audio_mute, Command.mute)
-        if result and set_status:
-            self.status.mute = True
-        return result
+        return await self._send(
+            DeviceCommands(self).mute(set_status, component_id=component_id)
+        )
 
     async def unmute(
         self, set_status: bool = False, *, component_id: str = "main"
     ) -> bool:
         """Call the unmute command."""
-        result = await self.command(component_id, Capability.audio_mute, Command.unmute)
-        if result and set_status:
-            self.status.mute = False
-        return result
+        return await self._send(
+            DeviceCommands(self).unmute(set_status, component_id=component_id)
+        )
 
     async def set_volume(
         self, volume: int, set_status: bool = False, *, component_id: str = "main"
     ) -> bool:
         """Call the setVolume command."""
-        result = await self.command(
-            component_id, Capability.audio_volume, Command.set_volume, [volume]
+        return await self._send(
+            DeviceCommands(self).set_volume(
+                volume, set_status, component_id=component_id
+            )
         )
-        if result and set_status:
-            self.status.volume = volume
-        return result
 
     async def volume_up(
         self, set_status: bool = False, *, component_id: str = "main"
     ) -> bool:
         """Call the volumeUp command."""
-        result = await self.command(
-            component_id, Capability.audio_volume, Command.volume_up
+        return await self._send(
+            DeviceCommands(self).volume_up(set_status, component_id=component_id)
         )
-        if result and set_status:
-            self.status.volume = min(self.status.volume + 1, 100)
-        return result
 
     async def volume_down(
         self, set_status: bool = False, *, component_id: str = "main"
     ) -> bool:
         """Call the volumeDown command."""
-        result = await self.command(
-            component_id, Capability.audio_volume, Command.volume_down
+        return await self._send(
+            DeviceCommands(self).volume_down(set_status, component_id=component_id)
         )
-        if result and set_status:
-            self.status.volume = max(self.status.volume - 1, 0)
-        return result
 
     async def play(
         self, set_status: bool = False, *, component_id: str = "main"
     ) -> bool:
         """Call the play command."""
-        result = await self.command(
-            component_id, Capability.media_playback, Command.play
+        return await self._send(
+            DeviceCommands(self).play(set_status, component_id=component_id)
         )
-        if result and set_status:
-            self.status.playback_status = "play"
-        return result
 
     async def pause(
         self, set_status: bool = False, *, component_id: str = "main"
     ) -> bool:
         """Call the pause command."""
-        result = await self.command(
-            component_id, Capability.media_playback, Command.pause
+        return await self._send(
+            DeviceCommands(self).pause(set_status, component_id=component_id)
         )
-        if result and set_status:
-            self.status.playback_status = "pause"
-        return result
 
     async def stop(
         self, set_status: bool = False, *, component_id: str = "main"
     ) -> bool:
         """Call the stop command."""
-        result = await self.command(
-            component_id, Capability.media_playback, Command.stop
+        return await self._send(
+            DeviceCommands(self).stop(set_status, component_id=component_id)
         )
-        if result and set_status:
-            self.status.playback_status = "stop"
-        return result
 
     async def fast_forward(
         self, set_status: bool = False, *, component_id: str = "main"
     ) -> bool:
         """Call the fastForward command."""
-        result = await self.command(
-            component_id, Capability.media_playback, Command.fast_forward
+        return await self._send(
+            DeviceCommands(self).fast_forward(set_status, component_id=component_id)
         )
-        if result and set_status:
-            self.status.playback_status = "fast forward"
-        return result
 
     async def rewind(
         self, set_status: bool = False, *, component_id: str = "main"
     ) -> bool:
         """Call the rewind command."""
-        result = await self.command(
-            component_id, Capability.media_playback, Command.rewind
+        return await self._send(
+            DeviceCommands(self).rewind(set_status, component_id=component_id)
         )
-        if result and set_status:
-            self.status.playback_status = "rewind"
-        return result
 
     async def set_input_source(
         self, source: str, set_status: bool = False, *, component_id: str = "main"
     ) -> bool:
         """Call the setInputSource command."""
-        result = await self.command(
-            component_id,
-            Capability.media_input_source,
-            Command.set_input_source,
-            [source],
+        return await self._send(
+            DeviceCommands(self).set_input_source(
+                source, set_status, component_id=component_id
+            )
         )
-        if result and set_status:
-            self.status.input_source = source
-        return result
 
     async def set_playback_shuffle(
         self, shuffle: bool, set_status: bool = False, *, component_id: str = "main"
     ) -> bool:
         """Call the setPlaybackShuffle command."""
-        shuffle_value = bool_to_value(Attribute.playback_shuffle, shuffle)
-        result = await self.command(
-            component_id,
-            Capability.media_playback_shuffle,
-            Command.set_playback_shuffle,
-            [shuffle_value],
+        return await self._send(
+            DeviceCommands(self).set_playback_shuffle(
+                shuffle, set_status, component_id=component_id
+            )
         )
-        if result and set_status:
-            self.status.playback_shuffle = shuffle
-        return result
 
     async def set_repeat(
         self, repeat: str, set_status: bool = False, *, component_id: str = "main"
     ) -> bool:
         """Call the setPlaybackRepeatMode command."""
-        result = await self.command(
-            component_id,
-            Capability.media_playback_repeat,
-            Command.set_playback_repeat_mode,
-            [repeat],
+        return await self._send(
+            DeviceCommands(self).set_repeat(
+                repeat, set_status, component_id=component_id
+            )
         )
-        if result and set_status:
-            self.status.playback_repeat_mode = repeat
-        return result
 
     async def set_tv_channel(
         self, channel: str, set_status: bool = False, *, component_id: str = "main"
     ) -> bool:
         """Call the setTvChannel command."""
-        result = await self.command(
-            component_id, Capability.tv_channel, Command.set_tv_channel, [channel]
+        return await self._send(
+            DeviceCommands(self).set_tv_channel(
+                channel, set_status, component_id=component_id
+            )
         )
-        if result and set_status:
-            self.status.tv_channel = channel
-        return result
 
     async def channel_up(
         self, set_status: bool = False, *, component_id: str = "main"
     ) -> bool:
         """Call the channelUp command."""
-        return await self.command(
-            component_id, Capability.tv_channel, Command.channel_up
+        return await self._send(
+            DeviceCommands(self).channel_up(set_status, component_id=component_id)
         )
 
     async def channel_down(
         self, set_status: bool = False, *, component_id: str = "main"
     ) -> bool:
         """Call the channelDown command."""
-        return await self.command(
-            component_id, Capability.tv_channel, Command.channel_down
+        return await self._send(
+            DeviceCommands(self).channel_down(set_status, component_id=component_id)
         )
 
     async def set_window_shade_level(
-        self,
-        level: int,
-        set_status: bool = False,
-        *,
-        component_id: str = "main",
+        self, level: int, set_status: bool = False, *, component_id: str = "main"
     ) -> bool:
         """Call the set shade level device command."""
-        if not 0 <= level <= 100:
-            raise ValueError("level must be scaled between 0-100.")
+        return await self._send(
+            DeviceCommands(self).set_window_shade_level(
+                level, set_status, component_id=component_id
+            )
+        )
 
+    async def _send(self, request: CommandRequest) -> bool:
         result = await self.command(
-            component_id,
-            Capability.window_shade_level,
-            Command.set_shade_level,
-            [level],
+            request.component_id, request.capability, request.command, request.args
         )
-        if result and set_status:
-            self.status.shade_level = level
-            self.status.switch = level > 0
+        if result and request.update:
+            request.update(self._status)
         return result
 
     @property
     def status(self):
         """Get the status entity of the device."""
         return self._status
+
+
+class CommandBatch(DeviceCommands):
+    """Define a batch of commands sent to a device in a single request."""
+
+    def __init__(self, api: Api, device: DeviceEntity):
+        """Create a new instance of the CommandBatch class."""
+        super().__init__(device)
+        self._api = api
+        self._commands = []
+        self._updates = []
+        self._results = []
+
+    async def __aenter__(self):
+        """Start collecting commands."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """Send the collected commands unless an error occurred."""
+        if exc_type is None and self._commands:
+            await self.send()
+
+    def command(
+        self,
+        component_id: str,
+        capability,
+        command,
+        args=None,
+        *,
+        update: Optional[Callable[[DeviceStatus], None]] = None,
+    ):
+        """Queue a command, with an optional status update applied on success."""
+        entry = {
+            "component": component_id,
+            "capability": capability,
+            "command": command,
+        }
+        if args:
+            entry["arguments"] = args
+        self._commands.append(entry)
+        self._updates.append(update)
+
+    async def send(self) -> bool:
+        """Send the queued commands and return True if all were accepted."""
+        commands, updates = self._commands, self._updates
+        self._commands, self._updates = [], []
+        if not commands:
+            return True
+        response = await self._api.post_device_commands(
+            self._device.device_id, commands
+        )
+        results = []
+        if isinstance(response, dict):
+            results = response.get("results") or []
+        self._results = []
+        for index, entry in enumerate(commands):
+            status = None
+            if index < len(results):
+                status = results[index].get("status")
+            self._results.append(
+                CommandResult(
+                    entry["component"],
+                    entry["capability"],
+                    entry["command"],
+                    entry.get("arguments"),
+                    status,
+                )
+            )
+            if updates[index] and status in COMMAND_ACCEPTED_STATUSES:
+                updates[index](self._device.status)
+        return all(
+            result.status in COMMAND_ACCEPTED_STATUSES for result in self._results
+        )
+
+    def _request(
+        self,
+        component_id: str,
+        capability: str,
+        command: str,
+        args: Optional[list] = None,
+        update: Optional[Callable[[DeviceStatus], None]] = None,
+    ) -> CommandRequest:
+        request = super()._request(component_id, capability, command, args, update)
+        self.command(component_id, capability, command, args, update=update)
+        return request
+
+    @property
+    def commands(self) -> List[dict]:
+        """Get the commands queued for the next request."""
+        return self._commands
+
+    @property
+    def results(self) -> List[CommandResult]:
+        """Get the result of each command sent by the last request."""
+        return self._results
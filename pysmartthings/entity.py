@@ -6,9 +6,12 @@ from .api import Api
 class Entity:
     """Define an entity from the SmartThings API."""
 
+    # Subclasses either declare _api in their slots or keep an instance dict
+    __slots__ = ()
+
     def __init__(self, api: Api):
         """Initialize a new instance of the entity."""
-        self._api = api
+        self._api = api  # pylint: disable=assigning-non-slot
 
     async def refresh(self):
         """Retrieve the latest values from the API."""
@@ -60,6 +60,7 @@ class APIResponseError(ClientResponseError):
             request_info, history, status=status, message=message, headers=headers
         )
         self._raw_error_response = data
+        data = data or {}
         self._request_id = data.get("requestId")
         self._error = APIErrorDetail(data.get("error", {}))
 
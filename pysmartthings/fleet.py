@@ -0,0 +1,487 @@
+"""Define a columnar store of the status of many devices."""
+
+from array import array
+import math
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Union
+
+from .capability import ATTRIBUTE_ON_VALUES, CAPABILITY_REGISTRY
+from .device import Device, DeviceEntity, DeviceStatus, intern_attribute
+
+MISSING_CODE = -1
+
+AGGREGATES: Dict[str, Callable[[Sequence[float]], float]] = {
+    "count": len,
+    "sum": math.fsum,
+    "min": min,
+    "max": max,
+    "mean": lambda values: math.fsum(values) / len(values),
+}
+# The aggregates of numpy arrays, used when numpy is installed
+NUMPY_AGGREGATES: Dict[str, Callable[[Any], float]] = {
+    "count": lambda values: int(values.size),
+    "sum": lambda values: float(values.sum()),
+    "min": lambda values: float(values.min()),
+    "max": lambda values: float(values.max()),
+    "mean": lambda values: float(values.mean()),
+}
+
+
+def numpy_module():
+    """Get numpy when it is installed, which vectorizes the queries."""
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return numpy
+
+
+NUMPY = numpy_module()
+
+
+def is_number(value: Any) -> bool:
+    """Determine if a value is stored as a number, which excludes booleans."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def capability_filter(
+    *,
+    all_of: Iterable[str] = (),
+    any_of: Iterable[str] = (),
+    none_of: Iterable[str] = (),
+) -> Callable[[int], bool]:
+    """
+    Create a test of capability masks against the capabilities given.
+
+    The query does not register capabilities, and those no device registered
+    are held by none: one in all_of matches nothing, one in none_of is
+    ignored and any_of matches through its registered capabilities only.
+    """
+    all_of = list(all_of)
+    any_of = list(any_of)
+    required = CAPABILITY_REGISTRY.mask(all_of)
+    optional = CAPABILITY_REGISTRY.mask(any_of)
+    excluded = CAPABILITY_REGISTRY.mask(none_of)
+    unmatched = (any_of and not optional) or any(
+        CAPABILITY_REGISTRY.get(capability) is None for capability in all_of
+    )
+
+    def matches(mask: int) -> bool:
+        return (
+            not unmatched
+            and mask & required == required
+            and not mask & excluded
+            and (not optional or bool(mask & optional))
+        )
+
+    return matches
+
+
+def filter_devices(
+    devices: Iterable[Device],
+    *,
+    all_of: Iterable[str] = (),
+    any_of: Iterable[str] = (),
+    none_of: Iterable[str] = (),
+    component_id: Optional[str] = None,
+) -> List[Device]:
+    """
+    Get the devices with all of, any of and none of the capabilities.
+
+    Each device is tested with integer operations on its capability mask.
+    """
+    matches = capability_filter(all_of=all_of, any_of=any_of, none_of=none_of)
+    return [
+        device for device in devices if matches(device.capability_mask(component_id))
+    ]
+
+
+class NumericColumn:
+    """
+    Define a column of numeric values, NaN where a device has none.
+
+    The store turns it into an EnumColumn when a value that is not a number
+    arrives, so that value is not lost.
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self, rows: int = 0):
+        """Create a new instance of the NumericColumn class."""
+        self._values = array("d", [math.nan]) * rows
+
+    def grow(self, rows: int):
+        """Extend the column with missing values up to rows."""
+        if rows > len(self._values):
+            self._values.extend(array("d", [math.nan]) * (rows - len(self._values)))
+
+    def set(self, row: int, value: Any):
+        """Set the value of a row, storing NaN for values that are not numbers."""
+        if is_number(value):
+            self._values[row] = value
+        else:
+            self._values[row] = math.nan
+
+    def get(self, row: int) -> Optional[float]:
+        """Get the value of a row."""
+        value = self._values[row]
+        return None if math.isnan(value) else value
+
+    def rows_between(
+        self, low: Optional[float] = None, high: Optional[float] = None
+    ) -> List[int]:
+        """Get the rows with a value within the inclusive bounds."""
+        low = -math.inf if low is None else low
+        high = math.inf if high is None else high
+        if NUMPY is not None:
+            values = NUMPY.frombuffer(self._values, dtype=NUMPY.float64)
+            return NUMPY.flatnonzero((values >= low) & (values <= high)).tolist()
+        return [row for row, value in enumerate(self._values) if low <= value <= high]
+
+    def numbers(self) -> array:
+        """Get the value of each row, NaN where it is missing."""
+        return self._values
+
+    @property
+    def values(self) -> array:
+        """Get the underlying array, usable with numpy.frombuffer."""
+        return self._values
+
+
+class EnumColumn:
+    """
+    Define a dictionary-encoded column of values such as enums.
+
+    Numbers are encoded like any other value, so a column mixing numbers and
+    strings keeps both and its numbers can still be filtered and aggregated.
+    """
+
+    __slots__ = ("_codes", "_labels", "_lookup")
+
+    def __init__(self, rows: int = 0):
+        """Create a new instance of the EnumColumn class."""
+        self._codes = array("i", [MISSING_CODE]) * rows
+        self._labels = []
+        self._lookup = {}
+
+    def grow(self, rows: int):
+        """Extend the column with missing values up to rows."""
+        if rows > len(self._codes):
+            self._codes.extend(array("i", [MISSING_CODE]) * (rows - len(self._codes)))
+
+    @classmethod
+    def from_numeric(cls, column: NumericColumn) -> "EnumColumn":
+        """Create a column holding the values of a numeric column."""
+        encoded = cls()
+        encoded.grow(len(column.values))
+        for row, value in enumerate(column.values):
+            if not math.isnan(value):
+                encoded.set(row, value)
+        return encoded
+
+    def encode(self, value: Any) -> int:
+        """Get the code of a value, adding it to the dictionary."""
+        if value is None:
+            return MISSING_CODE
+        code = self._lookup.get(value)
+        if code is None:
+            code = len(self._labels)
+            self._lookup[value] = code
+            self._labels.append(value)
+        return code
+
+    def set(self, row: int, value: Any):
+        """Set the value of a row."""
+        try:
+            self._codes[row] = self.encode(value)
+        except TypeError:
+            # Unhashable values such as lists are not encoded
+            self._codes[row] = MISSING_CODE
+
+    def get(self, row: int) -> Any:
+        """Get the value of a row."""
+        code = self._codes[row]
+        return None if code == MISSING_CODE else self._labels[code]
+
+    def rows_equal(self, *values: Any) -> List[int]:
+        """Get the rows holding any of the values."""
+        codes = {self._lookup[value] for value in values if value in self._lookup}
+        return self._rows_with(codes)
+
+    def rows_between(
+        self, low: Optional[float] = None, high: Optional[float] = None
+    ) -> List[int]:
+        """Get the rows with a number within the inclusive bounds."""
+        low = -math.inf if low is None else low
+        high = math.inf if high is None else high
+        codes = {
+            code
+            for code, label in enumerate(self._labels)
+            if is_number(label) and low <= label <= high
+        }
+        return self._rows_with(codes)
+
+    def _rows_with(self, codes: Set[int]) -> List[int]:
+        if not codes:
+            return []
+        if NUMPY is not None:
+            rows = NUMPY.frombuffer(self._codes, dtype=NUMPY.intc)
+            return NUMPY.flatnonzero(NUMPY.isin(rows, list(codes))).tolist()
+        return [row for row, code in enumerate(self._codes) if code in codes]
+
+    def numbers(self) -> array:
+        """Get the number of each row, NaN where it holds none."""
+        # The last entry is NaN so MISSING_CODE (-1) indexes it
+        numbers = array(
+            "d",
+            [label if is_number(label) else math.nan for label in self._labels]
+            + [math.nan],
+        )
+        if NUMPY is not None:
+            codes = NUMPY.frombuffer(self._codes, dtype=NUMPY.intc)
+            selected = NUMPY.frombuffer(numbers, dtype=NUMPY.float64)[codes]
+            return array("d", selected.tobytes())
+        return array("d", [numbers[code] for code in self._codes])
+
+    @property
+    def codes(self) -> array:
+        """Get the code of each row, MISSING_CODE where there is no value."""
+        return self._codes
+
+    @property
+    def labels(self) -> List[Any]:
+        """Get the value of each code."""
+        return self._labels
+
+
+Column = Union[NumericColumn, EnumColumn]
+
+
+class FleetStatusStore:
+    """
+    Define a columnar store of the status of many devices.
+
+    Each device is a row and each attribute of a component is a column.
+    Numeric attributes are kept in arrays and other values are dictionary
+    encoded. Attributes whose value is a dictionary, such as
+    powerConsumption, are flattened into one column per key named
+    "attribute.key".
+    """
+
+    def __init__(self):
+        """Create a new instance of the FleetStatusStore class."""
+        self._rows = {}
+        self._device_ids = []
+        self._locations = EnumColumn()
+        self._masks = []
+        self._columns = {}
+
+    def row(self, device_id: str) -> Optional[int]:
+        """Get the row index of the device."""
+        return self._rows.get(device_id)
+
+    def _ensure_row(self, device_id: str) -> int:
+        row = self._rows.get(device_id)
+        if row is None:
+            row = len(self._device_ids)
+            self._rows[device_id] = row
+            self._device_ids.append(device_id)
+            self._locations.grow(row + 1)
+            self._masks.append(0)
+        return row
+
+    def _column_for(self, key: tuple, value: Any) -> Column:
+        column = self._columns.get(key)
+        if column is None:
+            column = (NumericColumn if is_number(value) else EnumColumn)()
+            self._columns[key] = column
+        elif isinstance(column, NumericColumn) and not (
+            value is None or is_number(value)
+        ):
+            # Promoted so the value is kept along with the numbers
+            column = EnumColumn.from_numeric(column)
+            self._columns[key] = column
+        column.grow(len(self._device_ids))
+        return column
+
+    def _set(self, row: int, component_id: str, attribute: str, value: Any):
+        if isinstance(value, dict):
+            for field, field_value in value.items():
+                if not isinstance(field_value, (dict, list)):
+                    self._set(row, component_id, f"{attribute}.{field}", field_value)
+            return
+        if value is None and (component_id, attribute) not in self._columns:
+            return
+        self._column_for((component_id, attribute), value).set(row, value)
+
+    def ingest(
+        self,
+        device: Union[DeviceEntity, DeviceStatus],
+        location_id: Optional[str] = None,
+    ):
+        """Load the status of a device, replacing its previous values."""
+        mask = None
+        if isinstance(device, DeviceEntity):
+            location_id = location_id or device.location_id
+            mask = device.capability_mask()
+            status = device.status
+        else:
+            status = device
+        row = self._ensure_row(status.device_id)
+        if mask is not None:
+            self._masks[row] = mask
+        if location_id:
+            self._locations.set(row, location_id)
+        for column in self._columns.values():
+            column.grow(len(self._device_ids))
+            column.set(row, None)
+        components = {"main": status, **status.components}
+        for component_id, component in components.items():
+            for attribute, current in component.attributes.items():
+                self._set(row, component_id, attribute, current.value)
+
+    def ingest_many(self, devices: Iterable[Union[DeviceEntity, DeviceStatus]]):
+        """Load the status of many devices."""
+        for device in devices:
+            self.ingest(device)
+
+    def apply_attribute_update(
+        self,
+        device_id: str,
+        component_id: str,
+        capability: str,
+        attribute: str,
+        value: Any,
+        unit: Optional[str] = None,
+        data: Optional[Dict] = None,
+    ):
+        """Apply an update to a specific attribute of a device."""
+        row = self._ensure_row(device_id)
+        self._set(row, component_id, intern_attribute(attribute), value)
+
+    def column(self, attribute: str, component_id: str = "main") -> Optional[Column]:
+        """Get the column of an attribute, grown to cover every row."""
+        column = self._columns.get((component_id, attribute))
+        if column is not None:
+            column.grow(len(self._device_ids))
+        return column
+
+    def get(self, device_id: str, attribute: str, component_id: str = "main") -> Any:
+        """Get the value of an attribute of a device."""
+        row = self._rows.get(device_id)
+        column = self.column(attribute, component_id)
+        if row is None or column is None:
+            return None
+        return column.get(row)
+
+    def where_equal(
+        self, attribute: str, *values: Any, component_id: str = "main"
+    ) -> List[str]:
+        """Get the devices whose attribute holds any of the values."""
+        column = self.column(attribute, component_id)
+        if not isinstance(column, EnumColumn):
+            return []
+        return [self._device_ids[row] for row in column.rows_equal(*values)]
+
+    def where_between(
+        self,
+        attribute: str,
+        low: Optional[float] = None,
+        high: Optional[float] = None,
+        *,
+        component_id: str = "main",
+    ) -> List[str]:
+        """Get the devices whose numeric attribute is within the inclusive bounds."""
+        column = self.column(attribute, component_id)
+        if column is None:
+            return []
+        return [self._device_ids[row] for row in column.rows_between(low, high)]
+
+    def where_on(self, attribute: str, *, component_id: str = "main") -> List[str]:
+        """Get the devices whose attribute holds its on value, i.e. switch is on."""
+        return self.where_equal(
+            attribute, ATTRIBUTE_ON_VALUES[attribute], component_id=component_id
+        )
+
+    def where_capabilities(
+        self,
+        *,
+        all_of: Iterable[str] = (),
+        any_of: Iterable[str] = (),
+        none_of: Iterable[str] = (),
+    ) -> List[str]:
+        """Get the devices ingested as entities that match the capabilities."""
+        matches = capability_filter(all_of=all_of, any_of=any_of, none_of=none_of)
+        return [
+            device_id
+            for device_id, mask in zip(self._device_ids, self._masks)
+            if mask and matches(mask)
+        ]
+
+    def aggregate(
+        self,
+        attribute: str,
+        how: str = "mean",
+        *,
+        component_id: str = "main",
+        by_location: bool = False,
+    ) -> Union[Optional[float], Dict[str, Optional[float]]]:
+        """
+        Aggregate a numeric attribute across the devices that report it.
+
+        how is one of count, sum, min, max or mean. When by_location is set a
+        dictionary of the aggregate for each location id is returned. The
+        numbers of a column mixing numbers and other values are aggregated.
+        """
+        func = AGGREGATES[how]
+        column = self.column(attribute, component_id)
+        values = column.numbers() if column is not None else array("d")
+        if NUMPY is not None:
+            return self._aggregate_numpy(values, how, by_location)
+        if not by_location:
+            present = [value for value in values if not math.isnan(value)]
+            return func(present) if present or how == "count" else None
+        groups = {}
+        codes = self._locations.codes
+        for row, value in enumerate(values):
+            if not math.isnan(value) and codes[row] != MISSING_CODE:
+                groups.setdefault(codes[row], []).append(value)
+        return {
+            self._locations.labels[code]: func(group) for code, group in groups.items()
+        }
+
+    def _aggregate_numpy(
+        self, values: array, how: str, by_location: bool
+    ) -> Union[Optional[float], Dict[str, Optional[float]]]:
+        func = NUMPY_AGGREGATES[how]
+        values = NUMPY.frombuffer(values, dtype=NUMPY.float64)
+        present = ~NUMPY.isnan(values)
+        if not by_location:
+            if not present.any() and how != "count":
+                return None
+            return func(values[present])
+        codes = NUMPY.frombuffer(self._locations.codes, dtype=NUMPY.intc)
+        codes = codes[: len(values)]
+        present &= codes != MISSING_CODE
+        return {
+            self._locations.labels[code]: func(values[present & (codes == code)])
+            for code in NUMPY.unique(codes[present]).tolist()
+        }
+
+    def __len__(self) -> int:
+        """Get the number of devices in the store."""
+        return len(self._device_ids)
+
+    @property
+    def device_ids(self) -> List[str]:
+        """Get the device id of each row."""
+        return self._device_ids
+
+    @property
+    def attributes(self) -> List[tuple]:
+        """Get the (component_id, attribute) of each column."""
+        return list(self._columns)
+
+    @property
+    def locations(self) -> EnumColumn:
+        """Get the location id of each row."""
+        return self._locations
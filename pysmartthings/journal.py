@@ -0,0 +1,327 @@
+"""Define a memory-mapped, append-only journal of device status updates."""
+
+import glob
+import mmap
+import os
+import struct
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .api import Api
+from .codec import JsonCodec, default_codec
+from .device import (
+    AttributeChange,
+    DeviceEntity,
+    DeviceStatus,
+    DeviceStatusBase,
+    Status,
+    intern_attribute,
+    intern_unit,
+)
+from .location import Location
+from .room import Room
+from .snapshot import save_snapshot
+
+DEFAULT_SEGMENT_SIZE = 4 * 1024 * 1024
+SEGMENT_SUFFIX = ".journal"
+
+# kind, device index, component, capability and attribute name ids, length
+RECORD_HEADER = struct.Struct("<BIHHHI")
+KIND_END = 0
+KIND_DEVICE = 1
+KIND_NAME = 2
+KIND_UPDATE = 3
+NO_NAME = 0xFFFF
+# The names a segment can define, as the id NO_NAME is reserved
+MAX_NAMES = NO_NAME
+
+
+def segment_paths(directory: str) -> List[str]:
+    """Get the journal segments in a directory, oldest first."""
+    return sorted(glob.glob(os.path.join(directory, "*" + SEGMENT_SUFFIX)))
+
+
+def _segment_number(path: str) -> int:
+    return int(os.path.basename(path)[: -len(SEGMENT_SUFFIX)])
+
+
+def read_segment(path: str, codec: JsonCodec) -> Iterator[Tuple]:
+    """
+    Read the updates of a segment.
+
+    Yields (device_id, component_id, capability, attribute, value, unit,
+    data) tuples. Reading stops at the first unwritten record, which also
+    skips a record torn by a crash.
+    """
+    devices = {}
+    names = {NO_NAME: None}
+    with open(path, "rb") as segment_file:
+        size = os.fstat(segment_file.fileno()).st_size
+        if size < RECORD_HEADER.size:
+            return
+        with mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            offset = 0
+            while offset + RECORD_HEADER.size <= size:
+                (
+                    kind,
+                    device,
+                    component,
+                    capability,
+                    attribute,
+                    length,
+                ) = RECORD_HEADER.unpack_from(buffer, offset)
+                start = offset + RECORD_HEADER.size
+                offset = start + length
+                if kind == KIND_END or offset > size:
+                    return
+                payload = buffer[start:offset]
+                if kind == KIND_DEVICE:
+                    devices[device] = payload.decode()
+                elif kind == KIND_NAME:
+                    names[attribute] = payload.decode()
+                elif kind == KIND_UPDATE:
+                    value, unit, data = codec.loads(payload)
+                    yield (
+                        devices[device],
+                        names[component],
+                        names[capability],
+                        names[attribute],
+                        value,
+                        unit,
+                        data,
+                    )
+
+
+class JournalWriter:
+    """
+    Define a writer of status updates to memory-mapped segment files.
+
+    Each update is a fixed-layout header holding the device index and the
+    ids of the component, capability and attribute names, followed by the
+    encoded value, unit and data. Device ids and names are written once per
+    segment. Segments are preallocated and rotated once full or once they
+    define MAX_NAMES names; a record is only visible to readers once its kind
+    byte is written, so a crash never leaves a partial record behind.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        codec: Optional[JsonCodec] = None,
+    ):
+        """Create a new instance of the JournalWriter class."""
+        if segment_size < RECORD_HEADER.size * 2:
+            raise ValueError("segment_size is too small.")
+        self._directory = directory
+        self._segment_size = segment_size
+        self._codec = codec or default_codec()
+        self._file = None
+        self._buffer = None
+        self._path = None
+        self._offset = 0
+        self._devices = {}
+        self._names = {}
+        self._records = 0
+        os.makedirs(directory, exist_ok=True)
+        existing = segment_paths(directory)
+        self._number = _segment_number(existing[-1]) if existing else 0
+        self._open_segment()
+
+    def _open_segment(self):
+        self._number += 1
+        self._path = os.path.join(
+            self._directory, f"{self._number:08d}{SEGMENT_SUFFIX}"
+        )
+        self._file = open(self._path, "w+b")  # pylint: disable=consider-using-with
+        self._file.truncate(self._segment_size)
+        self._buffer = mmap.mmap(self._file.fileno(), self._segment_size)
+        self._offset = 0
+        self._devices = {}
+        self._names = {}
+
+    def _close_segment(self):
+        self._buffer.flush()
+        self._buffer.close()
+        self._file.close()
+
+    def rotate(self):
+        """Close the current segment and start a new one."""
+        self._close_segment()
+        self._open_segment()
+
+    def _write(
+        self,
+        kind: int,
+        payload: bytes,
+        device: int = 0,
+        component: int = NO_NAME,
+        capability: int = NO_NAME,
+        attribute: int = NO_NAME,
+    ):
+        end = self._offset + RECORD_HEADER.size + len(payload)
+        start = self._offset + RECORD_HEADER.size
+        self._buffer[start:end] = payload
+        header = RECORD_HEADER.pack(
+            kind, device, component, capability, attribute, len(payload)
+        )
+        # The kind byte is written last to publish the record
+        self._buffer[self._offset + 1 : start] = header[1:]
+        self._buffer[self._offset] = kind
+        self._offset = end
+
+    def _device_index(self, device_id: str) -> int:
+        index = self._devices.get(device_id)
+        if index is None:
+            index = len(self._devices)
+            self._devices[device_id] = index
+            self._write(KIND_DEVICE, device_id.encode(), device=index)
+        return index
+
+    def _name_id(self, name: Optional[str]) -> int:
+        if name is None:
+            return NO_NAME
+        name_id = self._names.get(name)
+        if name_id is None:
+            name_id = len(self._names)
+            self._names[name] = name_id
+            self._write(KIND_NAME, name.encode(), attribute=name_id)
+        return name_id
+
+    def append(
+        self,
+        device_id: str,
+        component_id: str,
+        capability: Optional[str],
+        attribute: str,
+        value: Any,
+        unit: Optional[str] = None,
+        data: Optional[Dict] = None,
+    ):
+        """Append an attribute update, rotating to a new segment when full."""
+        payload = self._codec.dumps([value, unit, data])
+        if isinstance(payload, str):
+            payload = payload.encode()
+        # Room for the record and the definitions it may need
+        names = (device_id, component_id, capability or "", attribute)
+        needed = RECORD_HEADER.size * 5 + len(payload) + sum(map(len, names)) * 4
+        if needed > self._segment_size:
+            raise ValueError("The update is larger than a segment.")
+        new_names = {component_id, capability, attribute}.difference(
+            self._names, (None,)
+        )
+        if (
+            self._offset + needed > self._segment_size
+            or len(self._names) + len(new_names) > MAX_NAMES
+        ):
+            self.rotate()
+        self._write(
+            KIND_UPDATE,
+            payload,
+            self._device_index(device_id),
+            self._name_id(component_id),
+            self._name_id(capability),
+            self._name_id(attribute),
+        )
+        self._records += 1
+
+    def record(self, status: DeviceStatus, change: AttributeChange):
+        """Append a change of a status, usable as a status listener."""
+        self.append(
+            status.device_id,
+            change.component_id,
+            change.capability,
+            change.attribute,
+            change.new.value,
+            change.new.unit,
+            change.new.data,
+        )
+
+    def attach(self, status: DeviceStatus) -> Callable[[], None]:
+        """Record every change of a status, returning a function to detach."""
+        return status.add_listener(self.record)
+
+    def flush(self):
+        """Write the current segment to disk."""
+        self._buffer.flush()
+
+    def compact(
+        self,
+        path: str,
+        *,
+        locations: Iterable[Location] = (),
+        rooms: Iterable[Room] = (),
+        devices: Iterable[DeviceEntity] = (),
+    ):
+        """
+        Save a snapshot of the current state and drop the segments it covers.
+
+        The devices must hold the latest state, i.e. the statuses the
+        journal is attached to.
+        """
+        save_snapshot(
+            path, locations=locations, rooms=rooms, devices=devices, codec=self._codec
+        )
+        self._close_segment()
+        for segment in segment_paths(self._directory):
+            os.remove(segment)
+        self._open_segment()
+        self._records = 0
+
+    def close(self):
+        """Flush and close the current segment."""
+        if not self._buffer.closed:
+            self._close_segment()
+
+    @property
+    def path(self) -> str:
+        """Get the path of the current segment."""
+        return self._path
+
+    @property
+    def records(self) -> int:
+        """Get the number of updates appended since the last compaction."""
+        return self._records
+
+
+def replay_journal(
+    directory: str,
+    statuses: Optional[Dict[str, DeviceStatus]] = None,
+    *,
+    api: Optional[Api] = None,
+    codec: Optional[JsonCodec] = None,
+) -> Dict[str, DeviceStatus]:
+    """
+    Rebuild the latest state from the journal segments of a directory.
+
+    Only the last update of each attribute is applied, directly and without
+    calling listeners; an update without a value, unit or data is a removed
+    attribute. Statuses missing from statuses are created for the api.
+    Returns the statuses by device id.
+    """
+    codec = codec or default_codec()
+    statuses = {} if statuses is None else statuses
+    latest = {}
+    for path in segment_paths(directory):
+        for record in read_segment(path, codec):
+            latest[record[:2] + record[3:4]] = record[4:]
+    for (device_id, component_id, attribute), (value, unit, data) in latest.items():
+        removed = value is None and unit is None and data is None
+        status = statuses.get(device_id)
+        if status is None:
+            status = statuses[device_id] = DeviceStatus(api, device_id)
+        component = status
+        if component_id != "main":
+            component = status.components.get(component_id)
+            if component is None:
+                if removed:
+                    continue
+                component = status.components[component_id] = DeviceStatusBase(
+                    component_id
+                )
+        attribute = intern_attribute(attribute)
+        if removed:
+            component.attributes.pop(attribute, None)
+        else:
+            component.attributes[attribute] = Status(value, intern_unit(unit), data)
+    return statuses
@@ -0,0 +1,72 @@
+"""Define counters of the requests made by a client."""
+
+from collections import Counter
+from typing import Optional
+
+
+class RequestMetrics:
+    """Define the counters of the requests sent by an Api."""
+
+    def __init__(self):
+        """Create a new instance of the RequestMetrics class."""
+        self._requests = 0
+        self._errors = 0
+        self._in_flight = 0
+        self._max_in_flight = 0
+        self._latency = 0.0
+        self._statuses = Counter()
+        self._error_types = Counter()
+
+    def started(self):
+        """Record that a request was sent."""
+        self._requests += 1
+        self._in_flight += 1
+        self._max_in_flight = max(self._max_in_flight, self._in_flight)
+
+    def finished(self, latency: float, status: Optional[int] = None):
+        """Record the response status of a request, or None for a failure."""
+        self._in_flight -= 1
+        self._latency += latency
+        if status is not None:
+            self._statuses[status] += 1
+
+    def failed(self, reason: str):
+        """Record a request that failed with a transport error."""
+        self._errors += 1
+        self._error_types[reason] += 1
+
+    @property
+    def requests(self) -> int:
+        """Get the number of requests sent, including retries."""
+        return self._requests
+
+    @property
+    def errors(self) -> int:
+        """Get the number of requests that failed with a transport error."""
+        return self._errors
+
+    @property
+    def in_flight(self) -> int:
+        """Get the number of requests awaiting a response."""
+        return self._in_flight
+
+    @property
+    def max_in_flight(self) -> int:
+        """Get the highest number of requests in flight at once."""
+        return self._max_in_flight
+
+    @property
+    def mean_latency(self) -> Optional[float]:
+        """Get the mean seconds taken by the completed requests."""
+        completed = self._requests - self._in_flight
+        return self._latency / completed if completed else None
+
+    @property
+    def statuses(self) -> Counter:
+        """Get the responses by status code."""
+        return self._statuses
+
+    @property
+    def error_types(self) -> Counter:
+        """Get the transport errors by name."""
+        return self._error_types
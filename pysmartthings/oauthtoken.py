@@ -1,9 +1,23 @@
 """Define the oauth module."""
 
+import asyncio
 from datetime import datetime, timedelta
-from typing import List, Optional
+import logging
+import time
+from typing import Any, Callable, List, Optional
+
+from aiohttp import ClientResponseError
 
 from .api import Api
+from .retry import TRANSPORT_ERRORS, RetryPolicy
+
+DEFAULT_REFRESH_MARGIN = 60.0
+# The largest share of the token lifetime the margin may take
+MAX_REFRESH_MARGIN_FRACTION = 0.5
+# The shortest wait of the background task after a failed refresh
+MIN_REFRESH_RETRY_DELAY = 1.0
+
+_LOGGER = logging.getLogger(__name__)
 
 
 class OAuthToken:
@@ -79,3 +93,152 @@ class OAuthToken:
     def is_expired(self):
         """Return True if the token has expired."""
         return datetime.now() > self._expiration_date
+
+
+class TokenManager:
+    """
+    Define a manager that keeps an OAuth token fresh.
+
+    The token is refreshed margin seconds before it expires, either when the
+    access token is requested or by a background task. The margin is capped
+    at MAX_REFRESH_MARGIN_FRACTION of the token lifetime. Concurrent
+    refreshes share a single request and the new access token is set on the
+    api. Transient failures are retried with the retry policy; the refresh
+    token is only replaced once a refresh succeeds. The background task logs
+    a failed refresh and tries again after a backoff when the failure is
+    transient; it stops on other errors, such as an invalid grant.
+    """
+
+    def __init__(
+        self,
+        api: Api,
+        token: OAuthToken,
+        client_id: str,
+        client_secret: str,
+        *,
+        margin: float = DEFAULT_REFRESH_MARGIN,
+        retry_policy: Optional[RetryPolicy] = None,
+        on_refresh: Optional[Callable[[OAuthToken], Any]] = None
+    ):
+        """Create a new instance of the TokenManager class."""
+        self._api = api
+        self._token = token
+        self._client_id = client_id
+        self._client_secret = client_secret
+        self._margin = timedelta(seconds=margin)
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._on_refresh = on_refresh
+        self._refreshing = None
+        self._task = None
+        self._refreshes = 0
+
+    @property
+    def needs_refresh(self) -> bool:
+        """Return True if the token expires within the margin."""
+        return (
+            self._token.access_token is None
+            or datetime.now() + self._refresh_margin() >= self._token.expiration_date
+        )
+
+    def _refresh_margin(self) -> timedelta:
+        # Bounded so a token living no longer than the margin is not refreshed
+        # back to back
+        lifetime = self._token.expires_in * MAX_REFRESH_MARGIN_FRACTION
+        return min(self._margin, timedelta(seconds=lifetime))
+
+    async def access_token(self) -> str:
+        """Get the access token, refreshing it first when it is due."""
+        if self.needs_refresh:
+            await self.refresh()
+        return self._token.access_token
+
+    async def refresh(self) -> OAuthToken:
+        """Refresh the token, joining a refresh that is already in flight."""
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._refresh())
+            self._refreshing.add_done_callback(self._refresh_done)
+        # Shield so a cancelled caller does not cancel the refresh for others
+        await asyncio.shield(self._refreshing)
+        return self._token
+
+    def _refresh_done(self, future: asyncio.Future):
+        self._refreshing = None
+        if not future.cancelled():
+            # Mark the error as retrieved when every caller was cancelled
+            future.exception()
+
+    async def _refresh(self):
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                await self._token.refresh(self._client_id, self._client_secret)
+                break
+            except ClientResponseError as error:
+                if error.status not in self._retry_policy.statuses:
+                    raise
+                delay = self._retry_policy.next_delay(attempt, started, error.status)
+                if delay is None:
+                    raise
+            except TRANSPORT_ERRORS as error:
+                delay = self._retry_policy.next_delay(
+                    attempt, started, type(error).__name__
+                )
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+        self._api.token = self._token.access_token
+        self._refreshes += 1
+        if self._on_refresh:
+            self._on_refresh(self._token)
+
+    def start(self):
+        """Start refreshing the token in the background ahead of expiry."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Stop refreshing the token in the background."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        failures = 0
+        while True:
+            due = self._token.expiration_date - self._refresh_margin() - datetime.now()
+            await asyncio.sleep(max(due.total_seconds(), 0))
+            try:
+                await self.refresh()
+            except Exception as error:  # pylint: disable=broad-except
+                if not self._is_transient(error):
+                    _LOGGER.exception("Stopped refreshing the OAuth token")
+                    return
+                _LOGGER.exception("Failed to refresh the OAuth token")
+                await asyncio.sleep(
+                    max(self._retry_policy.backoff(failures), MIN_REFRESH_RETRY_DELAY)
+                )
+                failures += 1
+            else:
+                failures = 0
+
+    def _is_transient(self, error: Exception) -> bool:
+        # An invalid grant is permanent: the refresh token was revoked or used
+        if isinstance(error, ClientResponseError):
+            return error.status in self._retry_policy.statuses
+        return isinstance(error, TRANSPORT_ERRORS)
+
+    @property
+    def token(self) -> OAuthToken:
+        """Get the managed token."""
+        return self._token
+
+    @property
+    def refreshes(self) -> int:
+        """Get the number of refreshes performed."""
+        return self._refreshes
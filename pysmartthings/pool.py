@@ -0,0 +1,119 @@
+"""Define a pool of clients for many tenants sharing one session."""
+
+from collections import namedtuple
+from typing import Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+from aiohttp import ClientSession
+
+from .cache import ValidatorCache
+from .codec import JsonCodec, default_codec
+from .metrics import RequestMetrics
+from .ratelimit import EndpointFamily, RateLimiter
+from .retry import RetryPolicy
+from .smartthings import SmartThings
+
+DEFAULT_TENANT_CONCURRENCY = 4
+
+Tenant = namedtuple("Tenant", "tenant_id client rate_limiter metrics")
+
+
+class ClientPool:
+    """
+    Define a pool of SmartThings clients, one per tenant.
+
+    Every client shares the session, and so its connector, and the codec.
+    Each tenant has its own token, rate limiter, cap on the requests in
+    flight and request metrics so a busy tenant cannot starve the others.
+    """
+
+    def __init__(
+        self,
+        session: ClientSession,
+        *,
+        rate_limits: Optional[Mapping[EndpointFamily, Tuple[float, int]]] = None,
+        concurrency: Optional[int] = DEFAULT_TENANT_CONCURRENCY,
+        retry_policy_factory: Optional[Callable[[], RetryPolicy]] = None,
+        coalesce: bool = False,
+        conditional: bool = False,
+        codec: Optional[JsonCodec] = None
+    ):
+        """
+        Create a new instance of the ClientPool class.
+
+        rate_limits configures the rate limiter created for each tenant and
+        retry_policy_factory is called once per tenant, i.e. RetryPolicy.
+        conditional gives each tenant a ValidatorCache.
+        """
+        self._session = session
+        self._rate_limits = rate_limits
+        self._concurrency = concurrency
+        self._retry_policy_factory = retry_policy_factory
+        self._coalesce = coalesce
+        self._conditional = conditional
+        self._codec = codec or default_codec()
+        self._tenants = {}
+
+    def add(self, tenant_id: str, token: str) -> SmartThings:
+        """Get the client of a tenant, creating it or replacing its token."""
+        tenant = self._tenants.get(tenant_id)
+        if tenant is not None:
+            tenant.client.token = token
+            return tenant.client
+        rate_limiter = RateLimiter(self._rate_limits)
+        metrics = RequestMetrics()
+        client = SmartThings(
+            self._session,
+            token,
+            rate_limiter=rate_limiter,
+            retry_policy=(
+                self._retry_policy_factory() if self._retry_policy_factory else None
+            ),
+            coalesce=self._coalesce,
+            validators=ValidatorCache() if self._conditional else None,
+            codec=self._codec,
+            concurrency=self._concurrency,
+            metrics=metrics,
+        )
+        self._tenants[tenant_id] = Tenant(tenant_id, client, rate_limiter, metrics)
+        return client
+
+    def get(self, tenant_id: str) -> Optional[SmartThings]:
+        """Get the client of a tenant."""
+        tenant = self._tenants.get(tenant_id)
+        return tenant.client if tenant else None
+
+    def __getitem__(self, tenant_id: str) -> SmartThings:
+        """Get the client of a tenant, raising KeyError when unknown."""
+        return self._tenants[tenant_id].client
+
+    def tenant(self, tenant_id: str) -> Optional[Tenant]:
+        """Get the client, rate limiter and metrics of a tenant."""
+        return self._tenants.get(tenant_id)
+
+    def remove(self, tenant_id: str) -> Optional[SmartThings]:
+        """Remove a tenant, returning its client when it was registered."""
+        tenant = self._tenants.pop(tenant_id, None)
+        return tenant.client if tenant else None
+
+    def metrics(self) -> Dict[str, RequestMetrics]:
+        """Get the request metrics of each tenant."""
+        return {
+            tenant_id: tenant.metrics for tenant_id, tenant in self._tenants.items()
+        }
+
+    def __contains__(self, tenant_id: str) -> bool:
+        """Determine if a tenant is registered."""
+        return tenant_id in self._tenants
+
+    def __iter__(self) -> Iterator[Tenant]:
+        """Iterate over the tenants."""
+        return iter(self._tenants.values())
+
+    def __len__(self) -> int:
+        """Get the number of tenants."""
+        return len(self._tenants)
+
+    @property
+    def session(self) -> ClientSession:
+        """Get the session shared by the clients."""
+        return self._session
@@ -0,0 +1,225 @@
+"""Define the client-side rate limiter."""
+
+import asyncio
+from collections import namedtuple
+from email.utils import parsedate_to_datetime
+from enum import Enum
+import re
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+HEADER_RETRY_AFTER = "Retry-After"
+HEADER_RATE_LIMIT = "X-RateLimit-Limit"
+HEADER_RATE_LIMIT_REMAINING = "X-RateLimit-Remaining"
+HEADER_RATE_LIMIT_RESET = "X-RateLimit-Reset"
+
+DEVICE_COMMAND_MATCHER = re.compile(r"/devices/[^/]+/commands/?$")
+DEVICE_STATUS_MATCHER = re.compile(r"/devices/[^/]+/status/?$")
+LISTING_MATCHER = re.compile(
+    r"/(locations|locations/[^/]+/rooms|devices|apps|installedapps"
+    r"|installedapps/[^/]+/subscriptions|scenes)/?$"
+)
+
+DEFAULT_RETRY_AFTER = 1.0
+DEFAULT_MAX_REQUEUES = 5
+
+BucketState = namedtuple(
+    "BucketState",
+    "rate capacity tokens paused_for limit remaining throttled_count",
+)
+
+
+class EndpointFamily(Enum):
+    """Define the groups of endpoints that are rate limited together."""
+
+    DEVICE_COMMANDS = "deviceCommands"
+    DEVICE_STATUS = "deviceStatus"
+    LISTINGS = "listings"
+    DEFAULT = "default"
+
+
+DEFAULT_LIMITS = {
+    EndpointFamily.DEVICE_COMMANDS: (10.0, 20),
+    EndpointFamily.DEVICE_STATUS: (20.0, 40),
+    EndpointFamily.LISTINGS: (5.0, 10),
+    EndpointFamily.DEFAULT: (10.0, 20),
+}
+
+
+def classify(method: str, url: str) -> EndpointFamily:
+    """Determine the endpoint family of a request."""
+    path = url.split("?", 1)[0]
+    method = method.lower()
+    if method == "post" and DEVICE_COMMAND_MATCHER.search(path):
+        return EndpointFamily.DEVICE_COMMANDS
+    if method == "get" and DEVICE_STATUS_MATCHER.search(path):
+        return EndpointFamily.DEVICE_STATUS
+    if method == "get" and LISTING_MATCHER.search(path):
+        return EndpointFamily.LISTINGS
+    return EndpointFamily.DEFAULT
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Convert a Retry-After header into a number of seconds."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Define a token bucket that adapts to the limits reported by the API."""
+
+    def __init__(self, rate: float, capacity: int, *, min_rate: float = 0.1):
+        """Create a new bucket that refills rate tokens per second."""
+        self._configured_rate = rate
+        self._rate = rate
+        self._min_rate = min(min_rate, rate)
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._limit = None
+        self._remaining = None
+        self._throttled_count = 0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+
+    async def acquire(self):
+        """Wait until a request may be sent and consume a token."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self._rate
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for the given number of seconds."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def throttled(self, retry_after: Optional[float]):
+        """Back off after the API rejected a request."""
+        self._throttled_count += 1
+        self._rate = max(self._min_rate, self._rate / 2)
+        self._tokens = 0.0
+        self.pause(DEFAULT_RETRY_AFTER if retry_after is None else retry_after)
+
+    def accepted(self):
+        """Recover the rate after the API accepted a request."""
+        self._rate = min(self._configured_rate, self._rate + self._configured_rate / 20)
+
+    def apply_headers(self, headers: Mapping[str, str]):
+        """Apply the rate limit headers returned by the API."""
+        limit = _parse_int(headers.get(HEADER_RATE_LIMIT))
+        remaining = _parse_int(headers.get(HEADER_RATE_LIMIT_REMAINING))
+        reset = _parse_int(headers.get(HEADER_RATE_LIMIT_RESET))
+        if limit is not None:
+            self._limit = limit
+        if remaining is not None:
+            self._remaining = remaining
+            self._tokens = min(self._tokens, remaining)
+            # SmartThings reports the time left in the window in milliseconds
+            if remaining == 0 and reset is not None:
+                self.pause(reset / 1000)
+
+    @property
+    def state(self) -> BucketState:
+        """Get a snapshot of the state of the bucket."""
+        now = time.monotonic()
+        self._refill(now)
+        return BucketState(
+            self._rate,
+            self._capacity,
+            self._tokens,
+            max(self._paused_until - now, 0.0),
+            self._limit,
+            self._remaining,
+            self._throttled_count,
+        )
+
+    @property
+    def is_throttled(self) -> bool:
+        """Return True if the bucket is paused or running below its rate."""
+        return (
+            self._paused_until > time.monotonic() or self._rate < self._configured_rate
+        )
+
+
+class RateLimiter:
+    """Define a client-side rate limiter with a bucket per endpoint family."""
+
+    def __init__(
+        self,
+        limits: Optional[Mapping[EndpointFamily, Tuple[float, int]]] = None,
+        *,
+        max_requeues: int = DEFAULT_MAX_REQUEUES
+    ):
+        """Create a new limiter with (rate, capacity) for each family."""
+        configured = dict(DEFAULT_LIMITS)
+        configured.update(limits or {})
+        self._buckets = {
+            family: TokenBucket(rate, capacity)
+            for family, (rate, capacity) in configured.items()
+        }
+        self._max_requeues = max_requeues
+
+    def bucket(self, family: EndpointFamily) -> TokenBucket:
+        """Get the bucket for an endpoint family."""
+        return self._buckets[family]
+
+    async def acquire(self, family: EndpointFamily):
+        """Wait until a request for the endpoint family may be sent."""
+        await self._buckets[family].acquire()
+
+    def update(self, family: EndpointFamily, status: int, headers: Mapping[str, str]):
+        """
+        Update the bucket from a response.
+
+        Returns True when the request was throttled and should be requeued.
+        """
+        bucket = self._buckets[family]
+        bucket.apply_headers(headers)
+        if status == 429:
+            bucket.throttled(parse_retry_after(headers.get(HEADER_RETRY_AFTER)))
+            return True
+        bucket.accepted()
+        return False
+
+    @property
+    def max_requeues(self) -> int:
+        """Get the number of times a throttled request is requeued."""
+        return self._max_requeues
+
+    @property
+    def state(self) -> Dict[EndpointFamily, BucketState]:
+        """Get the state of each bucket."""
+        return {family: bucket.state for family, bucket in self._buckets.items()}
+
+    @property
+    def is_throttled(self) -> bool:
+        """Return True if any endpoint family is being throttled."""
+        return any(bucket.is_throttled for bucket in self._buckets.values())
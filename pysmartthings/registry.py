@@ -0,0 +1,251 @@
+"""Define an in-memory registry of devices with secondary indexes."""
+
+from collections import namedtuple
+import hashlib
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+from .api import Api
+from .codec import JsonCodec
+from .device import DeviceEntity
+
+INDEX_LOCATION = "location"
+INDEX_ROOM = "room"
+INDEX_CAPABILITY = "capability"
+INDEX_TYPE = "type"
+INDEX_NETWORK = "network"
+INDEXES = (INDEX_LOCATION, INDEX_ROOM, INDEX_CAPABILITY, INDEX_TYPE, INDEX_NETWORK)
+
+InventoryChanges = namedtuple("InventoryChanges", "added removed changed")
+
+
+def listing_hash(data: dict, codec: JsonCodec) -> int:
+    """Get a 64-bit hash of the JSON of a listed device."""
+    encoded = codec.dumps(data)
+    if isinstance(encoded, str):
+        encoded = encoded.encode()
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "big")
+
+
+def _index_keys(device: DeviceEntity) -> Dict[str, List[str]]:
+    """Get the keys of each index a device belongs to."""
+    capabilities = set(device.capabilities)
+    for component in device.components.values():
+        capabilities.update(component)
+    keys = {
+        INDEX_LOCATION: [device.location_id],
+        INDEX_ROOM: [device.room_id],
+        INDEX_CAPABILITY: sorted(capabilities),
+        INDEX_TYPE: [device.type],
+        INDEX_NETWORK: [device.device_type_network],
+    }
+    return {name: [key for key in values if key] for name, values in keys.items()}
+
+
+class DeviceRegistry:
+    """
+    Define an in-memory registry of devices.
+
+    Devices are indexed by device id, location id, room id, capability
+    (of any component), type and device type network. The indexes are
+    updated as devices are added, refreshed or removed so queries are
+    answered without requests.
+    """
+
+    def __init__(
+        self,
+        devices: Iterable[DeviceEntity] = (),
+        *,
+        hashes: Optional[Mapping[str, int]] = None
+    ):
+        """
+        Create a new instance of the DeviceRegistry class.
+
+        hashes are the listing hashes of the devices, i.e. from a snapshot,
+        so the next sync only rebuilds the devices that changed since.
+        """
+        self._devices = {}
+        self._keys = {}
+        self._hashes = {}
+        self._indexes = {name: {} for name in INDEXES}
+        self.add_many(devices)
+        for device_id, digest in (hashes or {}).items():
+            if device_id in self._devices:
+                self._hashes[device_id] = digest
+
+    def add(self, device: DeviceEntity):
+        """Add a device, or re-index it when it is already registered."""
+        device_id = device.device_id
+        self._unindex(device_id)
+        self._devices[device_id] = device
+        keys = _index_keys(device)
+        self._keys[device_id] = keys
+        for name, values in keys.items():
+            index = self._indexes[name]
+            for key in values:
+                index.setdefault(key, {})[device_id] = device
+
+    def add_many(self, devices: Iterable[DeviceEntity]):
+        """Add or re-index many devices."""
+        for device in devices:
+            self.add(device)
+
+    def remove(self, device_id: str) -> Optional[DeviceEntity]:
+        """Remove a device, returning it when it was registered."""
+        self._unindex(device_id)
+        self._keys.pop(device_id, None)
+        self._hashes.pop(device_id, None)
+        return self._devices.pop(device_id, None)
+
+    def _unindex(self, device_id: str):
+        keys = self._keys.get(device_id)
+        if not keys:
+            return
+        for name, values in keys.items():
+            index = self._indexes[name]
+            for key in values:
+                bucket = index[key]
+                del bucket[device_id]
+                if not bucket:
+                    del index[key]
+
+    def apply_listing(
+        self,
+        api: Api,
+        items: Iterable[dict],
+        *,
+        location_ids: Optional[Sequence[str]] = None
+    ) -> InventoryChanges:
+        """
+        Apply a devices listing, only rebuilding the devices that changed.
+
+        Each item is compared with the hash of its JSON in the previous
+        listing: new devices are created, changed devices are updated in
+        place and registered devices of the listed locations (or of every
+        location when none are given) that are no longer listed are removed.
+        Returns the ids of the added, removed and changed devices.
+        """
+        added = []
+        changed = []
+        listed = set()
+        for item in items:
+            device_id = item["deviceId"]
+            listed.add(device_id)
+            digest = listing_hash(item, api.codec)
+            device = self._devices.get(device_id)
+            if device is None:
+                device = DeviceEntity(api, item)
+                added.append(device_id)
+            elif self._hashes.get(device_id) != digest:
+                device.apply_data(item)
+                changed.append(device_id)
+            else:
+                continue
+            self.add(device)
+            self._hashes[device_id] = digest
+        if location_ids:
+            scope = [
+                device_id
+                for location_id in location_ids
+                for device_id in self._indexes[INDEX_LOCATION].get(location_id, ())
+            ]
+        else:
+            scope = list(self._devices)
+        removed = [device_id for device_id in scope if device_id not in listed]
+        for device_id in removed:
+            self.remove(device_id)
+        return InventoryChanges(added, removed, changed)
+
+    async def sync(
+        self, smartthings, *, location_ids: Optional[Sequence[str]] = None
+    ) -> InventoryChanges:
+        """Apply the devices listed by a SmartThings client."""
+        return await smartthings.sync_devices(self, location_ids=location_ids)
+
+    async def refresh(self, device_id: str) -> DeviceEntity:
+        """Refresh a registered device and update its index entries."""
+        device = self._devices[device_id]
+        await device.refresh()
+        self.add(device)
+        return device
+
+    def get(self, device_id: str) -> Optional[DeviceEntity]:
+        """Get a device by its id."""
+        return self._devices.get(device_id)
+
+    def devices(
+        self,
+        *,
+        location_ids: Optional[Sequence[str]] = None,
+        capabilities: Optional[Sequence[str]] = None,
+        device_ids: Optional[Sequence[str]] = None,
+        room_ids: Optional[Sequence[str]] = None,
+        types: Optional[Sequence[str]] = None,
+        networks: Optional[Sequence[str]] = None
+    ) -> List[DeviceEntity]:
+        """
+        Get the registered devices matching the filters.
+
+        Like SmartThings.devices, empty filters are ignored and a device must
+        hold all of the capabilities and any one of the values of each other
+        filter.
+        """
+        candidates = []
+        if device_ids:
+            candidates.append(
+                {
+                    device_id: self._devices[device_id]
+                    for device_id in device_ids
+                    if device_id in self._devices
+                }
+            )
+        for name, keys in (
+            (INDEX_LOCATION, location_ids),
+            (INDEX_ROOM, room_ids),
+            (INDEX_TYPE, types),
+            (INDEX_NETWORK, networks),
+        ):
+            if keys:
+                candidates.append(self._union(name, keys))
+        for capability in capabilities or ():
+            candidates.append(self._indexes[INDEX_CAPABILITY].get(capability, {}))
+        if not candidates:
+            return list(self._devices.values())
+        candidates.sort(key=len)
+        smallest, others = candidates[0], candidates[1:]
+        return [
+            device
+            for device_id, device in smallest.items()
+            if all(device_id in other for other in others)
+        ]
+
+    def _union(self, name: str, keys: Iterable[str]) -> Dict[str, DeviceEntity]:
+        index = self._indexes[name]
+        buckets = [index[key] for key in keys if key in index]
+        if len(buckets) == 1:
+            return buckets[0]
+        union = {}
+        for bucket in buckets:
+            union.update(bucket)
+        return union
+
+    def keys(self, name: str) -> List[str]:
+        """Get the values held by an index, i.e. the known location ids."""
+        return list(self._indexes[name])
+
+    def __contains__(self, device_id: str) -> bool:
+        """Determine if a device is registered."""
+        return device_id in self._devices
+
+    def __len__(self) -> int:
+        """Get the number of registered devices."""
+        return len(self._devices)
+
+    @property
+    def device_ids(self) -> List[str]:
+        """Get the ids of the registered devices."""
+        return list(self._devices)
+
+    @property
+    def hashes(self) -> Dict[str, int]:
+        """Get the listing hash of each device added by a sync."""
+        return dict(self._hashes)
@@ -0,0 +1,121 @@
+"""Define the retry policy for failed requests."""
+
+import asyncio
+from collections import Counter
+import random
+import time
+from typing import Iterable, Optional, Union
+
+from aiohttp import ClientConnectionError, ClientPayloadError
+
+from .ratelimit import EndpointFamily
+
+DEFAULT_RETRY_STATUSES = (429, 500, 502, 503, 504)
+TRANSPORT_ERRORS = (ClientConnectionError, ClientPayloadError, asyncio.TimeoutError)
+
+
+class RetryStats:
+    """Define the counters recorded by a retry policy."""
+
+    def __init__(self):
+        """Create a new instance of the retry stats."""
+        self._retries = 0
+        self._exhausted = 0
+        self._reasons = Counter()
+
+    def record_retry(self, reason: Union[int, str]):
+        """Record that a request is being retried."""
+        self._retries += 1
+        self._reasons[reason] += 1
+
+    def record_exhausted(self):
+        """Record that a request failed after all attempts were used."""
+        self._exhausted += 1
+
+    @property
+    def retries(self) -> int:
+        """Get the number of retries performed."""
+        return self._retries
+
+    @property
+    def exhausted(self) -> int:
+        """Get the number of requests that ran out of attempts or time."""
+        return self._exhausted
+
+    @property
+    def reasons(self) -> Counter:
+        """Get the retries by status code or transport error name."""
+        return self._reasons
+
+
+class RetryPolicy:
+    """Define when and how long to wait before retrying a request."""
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        deadline: float = 30.0,
+        methods: Iterable[str] = ("get",),
+        statuses: Iterable[int] = DEFAULT_RETRY_STATUSES,
+        retry_device_commands: bool = False
+    ):
+        """
+        Create a new retry policy.
+
+        Only the given methods are retried, which excludes PUT and DELETE
+        unless they are added. Device command POSTs are only retried when
+        retry_device_commands is set.
+        """
+        self._max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._deadline = deadline
+        self._methods = frozenset(method.lower() for method in methods)
+        self._statuses = frozenset(statuses)
+        self._retry_device_commands = retry_device_commands
+        self._stats = RetryStats()
+
+    def is_retryable(self, method: str, family: EndpointFamily) -> bool:
+        """Determine if requests with the method and family may be retried."""
+        if family is EndpointFamily.DEVICE_COMMANDS:
+            return self._retry_device_commands
+        return method.lower() in self._methods
+
+    def backoff(self, attempt: int) -> float:
+        """Get a fully jittered exponential delay for the attempt."""
+        return random.uniform(0, min(self._max_delay, self._base_delay * 2**attempt))
+
+    def next_delay(
+        self,
+        attempt: int,
+        started: float,
+        reason: Union[int, str],
+        retry_after: Optional[float] = None,
+    ) -> Optional[float]:
+        """
+        Get the delay before the next attempt.
+
+        Returns None when the attempts or the deadline are exhausted.
+        """
+        delay = self.backoff(attempt)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        elapsed = time.monotonic() - started
+        if attempt + 1 >= self._max_attempts or elapsed + delay > self._deadline:
+            self._stats.record_exhausted()
+            return None
+        self._stats.record_retry(reason)
+        return delay
+
+    @property
+    def statuses(self) -> frozenset:
+        """Get the status codes that are retried."""
+        return self._statuses
+
+    @property
+    def stats(self) -> RetryStats:
+        """Get the retry counters."""
+        return self._stats
@@ -0,0 +1,74 @@
+"""Define a factory of sessions tuned for the SmartThings hosts."""
+
+from typing import Any, Optional
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+DEFAULT_LIMIT = 100
+DEFAULT_LIMIT_PER_HOST = 50
+DEFAULT_DNS_TTL = 300
+DEFAULT_KEEPALIVE_TIMEOUT = 60.0
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_CONNECT_TIMEOUT = 10.0
+
+
+def create_connector(
+    *,
+    limit: int = DEFAULT_LIMIT,
+    limit_per_host: int = DEFAULT_LIMIT_PER_HOST,
+    use_dns_cache: bool = True,
+    ttl_dns_cache: Optional[int] = DEFAULT_DNS_TTL,
+    keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT
+) -> TCPConnector:
+    """
+    Create a connector tuned for the SmartThings hosts.
+
+    All requests go to the API and auth hosts, so the connections to each
+    are capped with limit_per_host, DNS results are cached for minutes
+    rather than seconds and idle connections are kept alive for reuse. As in
+    aiohttp, a ttl_dns_cache of None caches DNS results forever; disable the
+    cache with use_dns_cache.
+    """
+    return TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        use_dns_cache=use_dns_cache,
+        ttl_dns_cache=ttl_dns_cache,
+        keepalive_timeout=keepalive_timeout,
+    )
+
+
+def create_session(
+    *,
+    limit: int = DEFAULT_LIMIT,
+    limit_per_host: int = DEFAULT_LIMIT_PER_HOST,
+    use_dns_cache: bool = True,
+    ttl_dns_cache: Optional[int] = DEFAULT_DNS_TTL,
+    keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+    timeout: float = DEFAULT_TIMEOUT,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    compress: bool = True,
+    **kwargs: Any
+) -> ClientSession:
+    """
+    Create a session with a connector tuned for the SmartThings hosts.
+
+    compress requests compressed responses; disable it on fast links to
+    save the time spent decompressing. Other keyword arguments are passed
+    to ClientSession. Must be called while an event loop is running.
+    """
+    headers = dict(kwargs.pop("headers", None) or {})
+    if not compress:
+        headers.setdefault("Accept-Encoding", "identity")
+    return ClientSession(
+        connector=create_connector(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            use_dns_cache=use_dns_cache,
+            ttl_dns_cache=ttl_dns_cache,
+            keepalive_timeout=keepalive_timeout,
+        ),
+        timeout=ClientTimeout(total=timeout, connect=connect_timeout),
+        headers=headers,
+        **kwargs,
+    )
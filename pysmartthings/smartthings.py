@@ -1,6 +1,16 @@
 """Define the SmartThings Cloud API."""
 
-from typing import List, Optional, Sequence
+from contextlib import aclosing
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
 
 from aiohttp import ClientSession
 
@@ -15,12 +25,26 @@ from .app import (
     AppSettings,
     AppSettingsEntity,
 )
-from .device import DeviceEntity
+from .bulk import (
+    DEFAULT_CONCURRENCY,
+    CommandReport,
+    RefreshReport,
+    execute_commands,
+    refresh_statuses,
+)
+from .cache import ResponseCache, ValidatorCache
+from .codec import JsonCodec
+from .device import DeviceEntity, DeviceStatus
 from .installedapp import InstalledAppEntity, InstalledAppStatus
 from .location import LocationEntity
-from .oauthtoken import OAuthToken
+from .metrics import RequestMetrics
+from .oauthtoken import DEFAULT_REFRESH_MARGIN, OAuthToken, TokenManager
+from .ratelimit import RateLimiter
+from .registry import DeviceRegistry, InventoryChanges
+from .retry import RetryPolicy
 from .room import Room, RoomEntity
 from .scene import SceneEntity
+from .snapshot import Snapshot, load_snapshot
 from .subscription import Subscription, SubscriptionEntity
 
 
@@ -29,9 +53,43 @@ class SmartThings:
 
     __slots__ = ["_service"]
 
-    def __init__(self, session: ClientSession, token: str):
+    def __init__(
+        self,
+        session: ClientSession,
+        token: str,
+        *,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        coalesce: bool = False,
+        cache: Optional[ResponseCache] = None,
+        validators: Optional[ValidatorCache] = None,
+        codec: Optional[JsonCodec] = None,
+        concurrency: Optional[int] = None,
+        metrics: Optional[RequestMetrics] = None
+    ):
         """Initialize the SmartThingsApi."""
-        self._service = Api(session, token)
+        self._service = Api(
+            session,
+            token,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            coalesce=coalesce,
+            cache=cache,
+            validators=validators,
+            codec=codec,
+            concurrency=concurrency,
+            metrics=metrics,
+        )
+
+    @property
+    def token(self) -> str:
+        """Get the token used when making requests."""
+        return self._service.token
+
+    @token.setter
+    def token(self, value: str):
+        """Set the token to use when making requests."""
+        self._service.token = value
 
     async def locations(self) -> List[LocationEntity]:
         """Retrieve SmartThings locations."""
@@ -77,21 +135,70 @@ class SmartThings:
         device_ids: Optional[Sequence[str]] = None
     ) -> List:
         """Retrieve SmartThings devices."""
-        params = []
-        if location_ids:
-            params.extend([("locationId", lid) for lid in location_ids])
-        if capabilities:
-            params.extend([("capability", cap) for cap in capabilities])
-        if device_ids:
-            params.extend([("deviceId", did) for did in device_ids])
+        params = SmartThings._device_params(location_ids, capabilities, device_ids)
         resp = await self._service.get_devices(params)
         return [DeviceEntity(self._service, entity) for entity in resp]
 
+    async def iter_devices(
+        self,
+        *,
+        location_ids: Optional[Sequence[str]] = None,
+        capabilities: Optional[Sequence[str]] = None,
+        device_ids: Optional[Sequence[str]] = None,
+        prefetch: bool = False
+    ) -> AsyncIterator[DeviceEntity]:
+        """Iterate over SmartThings devices as each page is retrieved."""
+        params = SmartThings._device_params(location_ids, capabilities, device_ids)
+        async with aclosing(
+            self._service.iter_devices(params, prefetch=prefetch)
+        ) as entities:
+            async for entity in entities:
+                yield DeviceEntity(self._service, entity)
+
+    async def sync_devices(
+        self, registry: DeviceRegistry, *, location_ids: Optional[Sequence[str]] = None
+    ) -> InventoryChanges:
+        """Apply a listing of devices to a registry, rebuilding only changes."""
+        params = SmartThings._device_params(location_ids, None, None)
+        resp = await self._service.get_devices(params)
+        return registry.apply_listing(self._service, resp, location_ids=location_ids)
+
+    def load_snapshot(self, path: str) -> Snapshot:
+        """Load a snapshot of locations, rooms and devices saved to disk."""
+        return load_snapshot(self._service, path)
+
     async def device(self, device_id: str) -> DeviceEntity:
         """Retrieve a device with the specified ID."""
         entity = await self._service.get_device(device_id)
         return DeviceEntity(self._service, entity)
 
+    async def execute_commands(
+        self, commands: Iterable[Sequence], *, concurrency: int = DEFAULT_CONCURRENCY
+    ) -> CommandReport:
+        """
+        Execute commands across many devices concurrently.
+
+        Each command is a (device_id, component_id, capability, command, args)
+        sequence. At most concurrency requests are in flight at once and any
+        configured rate limiter still applies to each of them.
+        """
+        return await execute_commands(self._service, commands, concurrency=concurrency)
+
+    async def refresh_statuses(
+        self,
+        devices: Iterable[Union[DeviceEntity, DeviceStatus]],
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY
+    ) -> RefreshReport:
+        """
+        Refresh the status of many devices concurrently.
+
+        Accepts device entities or status objects. Repeated device ids are
+        only requested once and failed refreshes are reported without
+        aborting the rest.
+        """
+        return await refresh_statuses(self._service, devices, concurrency=concurrency)
+
     async def apps(self, *, app_type: Optional[str] = None) -> List[AppEntity]:
         """Retrieve list of apps."""
         params = []
@@ -146,14 +253,25 @@ class SmartThings:
         installed_app_status: Optional[InstalledAppStatus] = None
     ) -> List[InstalledAppEntity]:
         """Get a list of the installed applications."""
-        params = []
-        if location_id:
-            params.append(("locationId", location_id))
-        if installed_app_status:
-            params.append(("installedAppStatus", installed_app_status.value))
+        params = SmartThings._installed_app_params(location_id, installed_app_status)
         resp = await self._service.get_installed_apps(params)
         return [InstalledAppEntity(self._service, entity) for entity in resp]
 
+    async def iter_installed_apps(
+        self,
+        *,
+        location_id: Optional[str] = None,
+        installed_app_status: Optional[InstalledAppStatus] = None,
+        prefetch: bool = False
+    ) -> AsyncIterator[InstalledAppEntity]:
+        """Iterate over the installed applications as each page is retrieved."""
+        params = SmartThings._installed_app_params(location_id, installed_app_status)
+        async with aclosing(
+            self._service.iter_installed_apps(params, prefetch=prefetch)
+        ) as entities:
+            async for entity in entities:
+                yield InstalledAppEntity(self._service, entity)
+
     async def installed_app(self, installed_app_id: str) -> InstalledAppEntity:
         """Get an installedapp with the specified ID."""
         entity = await self._service.get_installed_app(installed_app_id)
@@ -210,3 +328,50 @@ class SmartThings:
             client_id, client_secret, refresh_token
         )
         return OAuthToken(self._service, result)
+
+    def token_manager(
+        self,
+        client_id: str,
+        client_secret: str,
+        refresh_token: str,
+        *,
+        margin: float = DEFAULT_REFRESH_MARGIN,
+        retry_policy: Optional[RetryPolicy] = None,
+        on_refresh: Optional[Callable[[OAuthToken], Any]] = None
+    ) -> TokenManager:
+        """Create a manager that refreshes the token used by this client."""
+        return TokenManager(
+            self._service,
+            OAuthToken(self._service, refresh_token=refresh_token),
+            client_id,
+            client_secret,
+            margin=margin,
+            retry_policy=retry_policy,
+            on_refresh=on_refresh,
+        )
+
+    @staticmethod
+    def _device_params(
+        location_ids: Optional[Sequence[str]],
+        capabilities: Optional[Sequence[str]],
+        device_ids: Optional[Sequence[str]],
+    ) -> list:
+        params = []
+        if location_ids:
+            params.extend([("locationId", lid) for lid in location_ids])
+        if capabilities:
+            params.extend([("capability", cap) for cap in capabilities])
+        if device_ids:
+            params.extend([("deviceId", did) for did in device_ids])
+        return params
+
+    @staticmethod
+    def _installed_app_params(
+        location_id: Optional[str], installed_app_status: Optional[InstalledAppStatus]
+    ) -> list:
+        params = []
+        if location_id:
+            params.append(("locationId", location_id))
+        if installed_app_status:
+            params.append(("installedAppStatus", installed_app_status.value))
+        return params
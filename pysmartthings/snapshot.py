@@ -0,0 +1,219 @@
+"""Define snapshots of locations, rooms and devices saved to disk."""
+
+import gzip
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from .api import Api
+from .codec import JsonCodec, default_codec
+from .device import (
+    DEVICE_TYPE_DTH,
+    Device,
+    DeviceEntity,
+    DeviceStatus,
+    DeviceStatusBase,
+    Status,
+    intern_attribute,
+    intern_unit,
+)
+from .location import Location, LocationEntity
+from .registry import DeviceRegistry
+from .room import Room, RoomEntity
+
+SNAPSHOT_VERSION = 1
+
+
+def location_to_data(location: Location) -> dict:
+    """Get the API representation of a location."""
+    return {
+        "name": location.name,
+        "locationId": location.location_id,
+        "latitude": location.latitude,
+        "longitude": location.longitude,
+        "regionRadius": location.region_radius,
+        "temperatureScale": location.temperature_scale,
+        "locale": location.locale,
+        "countryCode": location.country_code,
+        "timeZoneId": location.timezone_id,
+    }
+
+
+def room_to_data(room: Room) -> dict:
+    """Get the API representation of a room."""
+    return {
+        "roomId": room.room_id,
+        "locationId": room.location_id,
+        **room.to_data(),
+    }
+
+
+def device_to_data(device: Device) -> dict:
+    """Get the API representation of a device."""
+    components = [
+        {"id": "main", "capabilities": [{"id": c} for c in device.capabilities]}
+    ]
+    components.extend(
+        {"id": component_id, "capabilities": [{"id": c} for c in capabilities]}
+        for component_id, capabilities in device.components.items()
+    )
+    data = {
+        "deviceId": device.device_id,
+        "name": device.name,
+        "label": device.label,
+        "locationId": device.location_id,
+        "roomId": device.room_id,
+        "type": device.type,
+        "components": components,
+    }
+    if device.type == DEVICE_TYPE_DTH:
+        data["dth"] = {
+            "deviceTypeId": device.device_type_id,
+            "deviceTypeName": device.device_type_name,
+            "deviceNetworkType": device.device_type_network,
+        }
+    return data
+
+
+def status_to_data(status: DeviceStatus) -> Dict[str, list]:
+    """Get the attributes of each component as [name, value, unit, data] rows."""
+    components = {"main": status, **status.components}
+    return {
+        component_id: [
+            [name, current.value, current.unit, current.data]
+            for name, current in component.attributes.items()
+        ]
+        for component_id, component in components.items()
+    }
+
+
+def apply_status_data(status: DeviceStatus, data: Dict[str, list]):
+    """Restore the attributes of a status saved with status_to_data."""
+    for component_id, rows in data.items():
+        attributes = {
+            intern_attribute(name): Status(value, intern_unit(unit), extra)
+            for name, value, unit, extra in rows
+        }
+        if component_id == "main":
+            status.attributes.update(attributes)
+        else:
+            status.components[component_id] = DeviceStatusBase(component_id, attributes)
+
+
+class Snapshot:
+    """Define the locations, rooms and devices restored from a snapshot."""
+
+    def __init__(
+        self,
+        created: float,
+        locations: List[LocationEntity],
+        rooms: List[RoomEntity],
+        devices: List[DeviceEntity],
+        hashes: Dict[str, int],
+    ):
+        """Create a new instance of the Snapshot class."""
+        self._created = created
+        self._locations = locations
+        self._rooms = rooms
+        self._devices = devices
+        self._hashes = hashes
+
+    def registry(self) -> DeviceRegistry:
+        """Create a registry of the devices that syncs by delta."""
+        return DeviceRegistry(self._devices, hashes=self._hashes)
+
+    @property
+    def created(self) -> float:
+        """Get the time the snapshot was saved, in seconds since the epoch."""
+        return self._created
+
+    @property
+    def age(self) -> float:
+        """Get the seconds elapsed since the snapshot was saved."""
+        return time.time() - self._created
+
+    @property
+    def locations(self) -> List[LocationEntity]:
+        """Get the restored locations."""
+        return self._locations
+
+    @property
+    def rooms(self) -> List[RoomEntity]:
+        """Get the restored rooms."""
+        return self._rooms
+
+    @property
+    def devices(self) -> List[DeviceEntity]:
+        """Get the restored devices, including their status."""
+        return self._devices
+
+
+def save_snapshot(
+    path: str,
+    *,
+    locations: Iterable[Location] = (),
+    rooms: Iterable[Room] = (),
+    devices: Iterable[DeviceEntity] = (),
+    codec: Optional[JsonCodec] = None,
+):
+    """
+    Save locations, rooms and devices with their status to a file.
+
+    The snapshot is gzip-compressed JSON with a version number. It is
+    written to a temporary file first so an existing snapshot is only
+    replaced once the new one is complete. Passing a DeviceRegistry as
+    devices also saves its listing hashes.
+    """
+    codec = codec or default_codec()
+    hashes = {}
+    if isinstance(devices, DeviceRegistry):
+        hashes = devices.hashes
+        devices = devices.devices()
+    document = {
+        "version": SNAPSHOT_VERSION,
+        "created": time.time(),
+        "locations": [location_to_data(location) for location in locations],
+        "rooms": [room_to_data(room) for room in rooms],
+        "devices": [
+            {
+                "data": device_to_data(device),
+                "status": status_to_data(device.status),
+                "hash": hashes.get(device.device_id),
+            }
+            for device in devices
+        ],
+    }
+    encoded = codec.dumps(document)
+    if isinstance(encoded, str):
+        encoded = encoded.encode()
+    temp_path = f"{path}.tmp"
+    with gzip.open(temp_path, "wb", compresslevel=6) as snapshot_file:
+        snapshot_file.write(encoded)
+    os.replace(temp_path, path)
+
+
+def load_snapshot(
+    api: Api, path: str, *, codec: Optional[JsonCodec] = None
+) -> Snapshot:
+    """Load a snapshot saved with save_snapshot, bound to the api."""
+    codec = codec or api.codec
+    with gzip.open(path, "rb") as snapshot_file:
+        document: Dict[str, Any] = codec.loads(snapshot_file.read())
+    version = document.get("version")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {version}")
+    devices = []
+    hashes = {}
+    for item in document["devices"]:
+        device = DeviceEntity(api, item["data"])
+        apply_status_data(device.status, item["status"])
+        devices.append(device)
+        if item["hash"] is not None:
+            hashes[device.device_id] = item["hash"]
+    return Snapshot(
+        document["created"],
+        [LocationEntity(api, data) for data in document["locations"]],
+        [RoomEntity(api, data) for data in document["rooms"]],
+        devices,
+        hashes,
+    )
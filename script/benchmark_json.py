@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Benchmark the installed JSON codecs over the test fixtures, as raw bytes."""
+import argparse
+import glob
+import os
+import sys
+import timeit
+
+sys.path.append(".")
+from pysmartthings.codec import available_codecs  # noqa: E402
+
+
+def load_fixtures(pattern: str, repeat: int) -> dict:
+    """Load the fixtures, wrapping each in a listing of repeat items."""
+    fixtures = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "rb") as json_file:
+            raw = json_file.read()
+        name = os.path.splitext(os.path.basename(path))[0]
+        fixtures[name] = b'{"items": [' + b",".join([raw] * repeat) + b"]}"
+    return fixtures
+
+
+def main():
+    """Run the script."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pattern", default="tests/json/*.json")
+    parser.add_argument(
+        "--repeat", type=int, default=100, help="items per synthetic listing"
+    )
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.pattern, args.repeat)
+    size = sum(len(raw) for raw in fixtures.values())
+    print(f"{len(fixtures)} fixtures, {size / 1024:.0f} KiB per pass")
+    results = []
+    for codec in available_codecs():
+        decoded = [codec.loads(raw) for raw in fixtures.values()]
+        loads = min(
+            timeit.repeat(
+                lambda codec=codec: [codec.loads(raw) for raw in fixtures.values()],
+                number=args.number,
+                repeat=3,
+            )
+        )
+        dumps = min(
+            timeit.repeat(
+                lambda codec=codec, decoded=decoded: [
+                    codec.dumps(data) for data in decoded
+                ],
+                number=args.number,
+                repeat=3,
+            )
+        )
+        results.append((codec.name, loads / args.number, dumps / args.number))
+    # The standard library codec is always last
+    stdlib = results[-1][1] + results[-1][2]
+    for name, loads, dumps in results:
+        print(
+            f"{name:>8}: loads {loads * 1000:7.2f} ms"
+            f"  dumps {dumps * 1000:7.2f} ms"
+            f"  ({stdlib / (loads + dumps):.1f}x json)"
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
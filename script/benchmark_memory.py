@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Measure the memory used per device and its status."""
+import argparse
+import json
+import sys
+import tracemalloc
+
+sys.path.append(".")
+from pysmartthings.device import DeviceEntity  # noqa: E402
+
+
+def main():
+    """Run the script."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=10000)
+    parser.add_argument("--device", default="tests/json/device.json")
+    parser.add_argument("--status", default="tests/json/device_status.json")
+    args = parser.parse_args()
+
+    with open(args.device, "r", encoding="utf-8") as json_file:
+        data = json.load(json_file)
+    with open(args.status, "r", encoding="utf-8") as json_file:
+        raw_status = json_file.read()
+    items = [{**data, "deviceId": str(index)} for index in range(args.devices)]
+
+    devices = []
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for item in items:
+        device = DeviceEntity(None, item)
+        # Decode per device, as each refresh receives its own response body
+        device.status.apply_data(json.loads(raw_status))
+        devices.append(device)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    components = len(devices[0].status.components) + 1
+    print(
+        f"{args.devices} devices with {components} components: "
+        f"{used / 1024 / 1024:.1f} MiB, {used / args.devices:.0f} bytes per device"
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
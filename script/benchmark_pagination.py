@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Benchmark sequential against prefetched device pagination."""
+import argparse
+import asyncio
+import copy
+import json
+import sys
+import time
+
+from aiohttp import ClientSession, web
+
+sys.path.append(".")
+from pysmartthings.smartthings import SmartThings  # noqa: E402
+
+
+def create_app(
+    base: str, pages: int, page_size: int, latency: float
+) -> web.Application:
+    """Create a mock devices endpoint that serves pages after a delay."""
+    with open("tests/json/device.json", "r", encoding="utf-8") as json_file:
+        template = json.load(json_file)
+    app = web.Application()
+    bodies = {}
+
+    def render(page: int) -> str:
+        items = []
+        for index in range(page_size):
+            item = copy.deepcopy(template)
+            item["deviceId"] = f"{page}-{index}"
+            items.append(item)
+        links = {}
+        if page + 1 < pages:
+            links["next"] = {"href": f"{base}devices?page={page + 1}"}
+        return json.dumps({"items": items, "_links": links})
+
+    async def devices(request: web.Request) -> web.Response:
+        page = int(request.query.get("page", 0))
+        await asyncio.sleep(latency)
+        if page not in bodies:
+            bodies[page] = render(page)
+        return web.Response(text=bodies[page], content_type="application/json")
+
+    app.router.add_get("/v1/devices", devices)
+    return app
+
+
+async def consume(smartthings: SmartThings, prefetch: bool, work: float) -> float:
+    """Iterate every device and return the elapsed wall-clock time."""
+    start = time.perf_counter()
+    count = 0
+    async for _ in smartthings.iter_devices(prefetch=prefetch):
+        count += 1
+        if work:
+            await asyncio.sleep(work)
+    return time.perf_counter() - start
+
+
+async def run(args):
+    """Run the benchmark."""
+    base = f"http://127.0.0.1:{args.port}/v1/"
+    runner = web.AppRunner(create_app(base, args.pages, args.page_size, args.latency))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.port).start()
+    try:
+        async with ClientSession() as session:
+            smartthings = SmartThings(session, "token")
+            # pylint: disable=protected-access
+            smartthings._service._api_base = base
+            for prefetch in (False, True):
+                timings = [
+                    await consume(smartthings, prefetch, args.work / args.page_size)
+                    for _ in range(args.rounds)
+                ]
+                print(
+                    f"prefetch={prefetch!s:5} "
+                    f"best={min(timings) * 1000:8.1f}ms "
+                    f"mean={sum(timings) / len(timings) * 1000:8.1f}ms"
+                )
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    """Run the script."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument(
+        "--latency", type=float, default=0.1, help="server delay per page (s)"
+    )
+    parser.add_argument(
+        "--work", type=float, default=0.1, help="processing time per page (s)"
+    )
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8089)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
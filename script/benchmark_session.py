@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Compare the per-request latency of create_session with aiohttp defaults."""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from aiohttp import ClientSession, TCPConnector, web
+
+sys.path.append(".")
+from pysmartthings.session import create_session  # noqa: E402
+from pysmartthings.smartthings import SmartThings  # noqa: E402
+
+
+def create_app() -> web.Application:
+    """Create a mock device endpoint serving the device fixture."""
+    with open("tests/json/device.json", "r", encoding="utf-8") as json_file:
+        body = json_file.read()
+    app = web.Application()
+
+    async def device(request: web.Request) -> web.Response:
+        return web.Response(text=body, content_type="application/json")
+
+    app.router.add_get("/v1/devices/{device_id}", device)
+    return app
+
+
+async def measure(session: ClientSession, base: str, args) -> list:
+    """Get the latency of each request sent by concurrent workers."""
+    smartthings = SmartThings(session, "token")
+    # pylint: disable=protected-access
+    smartthings._service._api_base = base
+    latencies = []
+
+    async def worker():
+        for _ in range(args.requests // args.concurrency):
+            start = time.perf_counter()
+            await smartthings.device("device")
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return latencies
+
+
+async def run(args):
+    """Run the benchmark."""
+    base = f"http://127.0.0.1:{args.port}/v1/"
+    runner = web.AppRunner(create_app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.port).start()
+    # The first session is the baseline the others are compared with
+    sessions = {
+        "aiohttp defaults": ClientSession,
+        "create_session": create_session,
+        "new connection per request": lambda: ClientSession(
+            connector=TCPConnector(force_close=True)
+        ),
+    }
+    baseline = None
+    try:
+        for name, factory in sessions.items():
+            async with factory() as session:
+                # Warm up so the sessions have pooled connections
+                await measure(session, base, args)
+                latencies = await measure(session, base, args)
+            latencies.sort()
+            p50 = statistics.median(latencies)
+            if baseline is None:
+                baseline = p50
+            print(
+                f"{name:>27}: p50 {p50 * 1000:6.2f} ms"
+                f"  p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.2f} ms"
+                f"  p50 vs defaults {(p50 / baseline - 1) * 100:+6.1f}%"
+            )
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    """Run the script."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
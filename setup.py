@@ -25,6 +25,7 @@ setup(
     license="ASL 2.0",
     packages=find_packages(exclude=("tests*",)),
     install_requires=["aiohttp>=3.8.4,<4.0.0"],
+    extras_require={"speedups": ["orjson>=3.0.0"], "fleet": ["numpy>=1.22"]},
     tests_require=[],
     platforms=["any"],
     keywords="smartthings",
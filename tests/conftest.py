@@ -28,6 +28,7 @@ from pysmartthings.api import (
     API_SUBSCRIPTIONS,
     Api,
 )
+from pysmartthings.pool import ClientPool
 from pysmartthings.smartthings import SmartThings
 
 from .utilities import ClientMocker
@@ -44,6 +45,9 @@ REFRESH_TOKEN = "a86a5c8e-0014-44a6-8980-5846633972dd"
 SUBSCRIPTION_ID = "7bdf5909-57c4-41f3-9089-e520513bd92a"
 SCENE_ID = "9b58411f-5d26-418d-b193-3434a77c484a"
 
+ETAG = '"5d8f-1a2b3c"'
+CONDITIONAL_DEVICE_ID = "3c4d5e6f-7a8b-4c9d-8e0f-1a2b3c4d5e6f"
+
 DEVICE_COMMAND_PATTERN = re.compile(r"(device_command_post_[a-z_]+)")
 
 
@@ -60,6 +64,23 @@ def register_device_commands(mocker):
             )
 
 
+def register_conditional(mocker, resource: str, response):
+    """Register a resource that carries an ETag and answers 304 when it matches."""
+    mocker.request(
+        "get",
+        mocker.base_url + resource,
+        headers={**mocker.default_headers, "If-None-Match": ETAG},
+        status=304,
+    )
+    mocker.request(
+        "get",
+        mocker.base_url + resource,
+        headers=mocker.default_headers,
+        response=response,
+        response_headers={"ETag": ETAG},
+    )
+
+
 def register_url_mocks(mocker):
     """Register the URLs we need to mock."""
     mocker.default_headers = {"Authorization": "Bearer " + AUTH_TOKEN}
@@ -200,25 +221,37 @@ def register_url_mocks(mocker):
     )
 
 
+@pytest.fixture(name="mocker")
+def mocker_fixture():
+    """Fixture for the request mocker backing the sessions."""
+    mocker = ClientMocker()
+    register_url_mocks(mocker)
+    return mocker
+
+
 @pytest.fixture
-def smartthings(event_loop):
+def smartthings(event_loop, mocker):
     """Fixture for testing against the SmartThings class."""
     # Python 3.5 doesn't support yield in an async method so we have to
     # run the creation and clean-up of the session in the loop manually.
-    mocker = ClientMocker()
-    register_url_mocks(mocker)
     session = event_loop.run_until_complete(__create_session(event_loop, mocker))
     yield SmartThings(session, AUTH_TOKEN)
     event_loop.run_until_complete(session.close())
 
 
 @pytest.fixture
-def api(event_loop):
+def pool(event_loop, mocker):
+    """Fixture for testing against the ClientPool class."""
+    session = event_loop.run_until_complete(__create_session(event_loop, mocker))
+    yield ClientPool(session, concurrency=2)
+    event_loop.run_until_complete(session.close())
+
+
+@pytest.fixture
+def api(event_loop, mocker):
     """Fixture for testing against the API."""
     # Python 3.5 doesn't support yield in an async method so we have to
     # run the creation and clean-up of the session in the loop manually.
-    mocker = ClientMocker()
-    register_url_mocks(mocker)
     session = event_loop.run_until_complete(__create_session(event_loop, mocker))
     yield Api(session, AUTH_TOKEN)
     event_loop.run_until_complete(session.close())
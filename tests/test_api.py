@@ -0,0 +1,117 @@
+"""Tests for the API module."""
+
+import asyncio
+
+import pytest
+
+from pysmartthings.api import API_DEVICE, Api
+
+from .conftest import AUTH_TOKEN, DEVICE_ID, LOCATION_ID
+
+MISSING_DEVICE_ID = "8f9e0d1c-2b3a-4c5d-9e6f-7a8b9c0d1e2f"
+
+
+class TestCoalescing:
+    """Tests for coalescing identical in-flight GETs."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_get_coalesced(api, mocker):
+        """Tests concurrent GETs of the same resource share one request."""
+        # Arrange
+        coalescing_api = Api(api.session, AUTH_TOKEN, coalesce=True)
+        # Act
+        first, second, third = await asyncio.gather(
+            coalescing_api.get_device(DEVICE_ID),
+            coalescing_api.get_device(DEVICE_ID),
+            coalescing_api.get_device_status(DEVICE_ID),
+        )
+        # Assert
+        assert first is second
+        assert third is not first
+        assert len(mocker.history) == 2
+        assert coalescing_api.coalesced_requests == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_get_items_coalesced(api, mocker):
+        """Tests concurrent listings with the same params share the requests."""
+        # Arrange
+        coalescing_api = Api(api.session, AUTH_TOKEN, coalesce=True)
+        params = [("locationId", LOCATION_ID)]
+        # Act
+        results = await asyncio.gather(
+            coalescing_api.get_installed_apps(),
+            coalescing_api.get_installed_apps(),
+            coalescing_api.get_scenes(params),
+            coalescing_api.get_scenes(list(params)),
+            coalescing_api.get_scenes({"locationId": LOCATION_ID}),
+        )
+        # Assert
+        assert len(results[0]) == 2
+        assert results[0] is results[1]
+        assert results[2] is results[3] is results[4]
+        assert len(mocker.history) == 3
+        assert coalescing_api.coalesced_requests == 3
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_sequential_not_coalesced(api, mocker):
+        """Tests a completed request is not reused by later callers."""
+        # Arrange
+        coalescing_api = Api(api.session, AUTH_TOKEN, coalesce=True)
+        # Act
+        await coalescing_api.get_device(DEVICE_ID)
+        await coalescing_api.get_device(DEVICE_ID)
+        # Assert
+        assert len(mocker.history) == 2
+        assert coalescing_api.coalesced_requests == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_error_shared(api, mocker):
+        """Tests an error is raised to every coalesced caller."""
+        # Arrange
+        mocker.request(
+            "get",
+            mocker.base_url + API_DEVICE.format(device_id=MISSING_DEVICE_ID),
+            headers=mocker.default_headers,
+            status=404,
+        )
+        coalescing_api = Api(api.session, AUTH_TOKEN, coalesce=True)
+        # Act
+        results = await asyncio.gather(
+            coalescing_api.get_device(MISSING_DEVICE_ID),
+            coalescing_api.get_device(MISSING_DEVICE_ID),
+            return_exceptions=True,
+        )
+        # Assert
+        assert all(isinstance(result, Exception) for result in results)
+        assert len(mocker.history) == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_cancelled_caller(api, mocker):
+        """Tests cancelling one caller does not cancel the shared request."""
+        # Arrange
+        coalescing_api = Api(api.session, AUTH_TOKEN, coalesce=True)
+        first = asyncio.ensure_future(coalescing_api.get_device(DEVICE_ID))
+        second = asyncio.ensure_future(coalescing_api.get_device(DEVICE_ID))
+        await asyncio.sleep(0)
+        # Act
+        first.cancel()
+        data = await second
+        # Assert
+        assert first.cancelled()
+        assert data["deviceId"] == DEVICE_ID
+        assert len(mocker.history) == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_not_coalesced_by_default(api, mocker):
+        """Tests requests are not coalesced unless enabled."""
+        # Act
+        await asyncio.gather(api.get_device(DEVICE_ID), api.get_device(DEVICE_ID))
+        # Assert
+        assert len(mocker.history) == 2
+        assert api.coalesced_requests == 0
@@ -0,0 +1,222 @@
+"""Tests for the bulk module."""
+
+import asyncio
+
+import pytest
+
+from pysmartthings.api import API_DEVICE_COMMAND, API_DEVICE_STATUS, Api
+from pysmartthings.bulk import (
+    CommandOutcome,
+    gather_bounded,
+    percentile,
+    refresh_statuses,
+)
+from pysmartthings.cache import ValidatorCache
+from pysmartthings.capability import Attribute
+from pysmartthings.device import DeviceEntity, DeviceStatus, Status
+
+from .conftest import AUTH_TOKEN, CONDITIONAL_DEVICE_ID, DEVICE_ID, register_conditional
+
+FAILING_DEVICE_ID = "0a1b2c3d-4e5f-4a6b-8c7d-9e0f1a2b3c4d"
+
+
+class TestFunctions:
+    """Tests for the module functions."""
+
+    @staticmethod
+    def test_percentile():
+        """Tests the nearest-rank percentile."""
+        # Arrange
+        values = [5.0, 1.0, 4.0, 2.0, 3.0]
+        # Act/Assert
+        assert percentile([], 50) is None
+        assert percentile(values, 50) == 3.0
+        assert percentile(values, 95) == 5.0
+        assert percentile(values, 0) == 1.0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_gather_bounded():
+        """Tests no more than the concurrency limit run at once."""
+        # Arrange
+        running = 0
+        peak = 0
+
+        async def work(item):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0)
+            running -= 1
+            return item * 2
+
+        # Act
+        results = await gather_bounded(range(10), work, 3)
+        # Assert
+        assert results == [item * 2 for item in range(10)]
+        assert peak == 3
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_gather_bounded_invalid():
+        """Tests the concurrency must be positive."""
+        # Act/Assert
+        with pytest.raises(ValueError):
+            await gather_bounded([], None, 0)
+
+
+class TestExecuteCommands:
+    """Tests for executing commands across devices."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_execute_commands(smartthings, mocker):
+        """Tests commands are executed and reported per device."""
+        # Arrange
+        mocker.request(
+            "post",
+            mocker.base_url + API_DEVICE_COMMAND.format(device_id=FAILING_DEVICE_ID),
+            headers=mocker.default_headers,
+            status=422,
+            response={"requestId": "1"},
+        )
+        commands = [
+            (DEVICE_ID, "main", "switch", "on"),
+            (DEVICE_ID, "main", "switchLevel", "setLevel", [75, 2]),
+            (FAILING_DEVICE_ID, "main", "switch", "off", None),
+        ]
+        # Act
+        report = await smartthings.execute_commands(commands, concurrency=2)
+        # Assert
+        assert [outcome.status for outcome in report.outcomes] == [
+            "ACCEPTED",
+            "ACCEPTED",
+            None,
+        ]
+        assert len(report.by_device[DEVICE_ID]) == 2
+        assert report.by_device[DEVICE_ID][1].args == [75, 2]
+        assert len(report.failed) == 1
+        failed = report.failed[0]
+        assert isinstance(failed, CommandOutcome)
+        assert failed.device_id == FAILING_DEVICE_ID
+        assert failed.error.status == 422
+        assert 0 <= report.p50 <= report.p95
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_execute_commands_unexpected_response(smartthings, mocker):
+        """Tests a response without results is reported as not accepted."""
+        # Arrange
+        mocker.post(
+            API_DEVICE_COMMAND.format(device_id=FAILING_DEVICE_ID),
+            response={"results": []},
+        )
+        # Act
+        report = await smartthings.execute_commands(
+            [(FAILING_DEVICE_ID, "main", "switch", "on")]
+        )
+        # Assert
+        assert report.outcomes[0].status is None
+        assert report.outcomes[0].error is None
+        assert report.failed == report.outcomes
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_execute_commands_empty(smartthings):
+        """Tests an empty fan-out reports no latency."""
+        # Act
+        report = await smartthings.execute_commands([])
+        # Assert
+        assert not report.outcomes
+        assert report.p50 is None
+        assert report.p95 is None
+
+
+class TestRefreshStatuses:
+    """Tests for refreshing the status of many devices."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_refresh_statuses(smartthings, mocker):
+        """Tests statuses are refreshed once per device id."""
+        # Arrange
+        mocker.request(
+            "get",
+            mocker.base_url + API_DEVICE_STATUS.format(device_id=FAILING_DEVICE_ID),
+            headers=mocker.default_headers,
+            status=500,
+            response={},
+        )
+        device = DeviceEntity(None, device_id=DEVICE_ID)
+        duplicate = DeviceStatus(None, DEVICE_ID)
+        failing = DeviceStatus(None, FAILING_DEVICE_ID)
+        # Act
+        report = await smartthings.refresh_statuses(
+            [device, duplicate, failing, device.status], concurrency=2
+        )
+        # Assert
+        assert report.refreshed == [DEVICE_ID]
+        assert list(report.failed) == [FAILING_DEVICE_ID]
+        assert report.failed[FAILING_DEVICE_ID].status == 500
+        assert len(mocker.history) == 2
+        assert device.status.level == 100
+        assert duplicate.level == 100
+        assert failing.level == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_refresh_statuses_empty_response(smartthings, mocker):
+        """Tests an empty response leaves the status unchanged."""
+        # Arrange
+        mocker.get(API_DEVICE_STATUS.format(device_id=FAILING_DEVICE_ID), response={})
+        status = DeviceStatus(None, FAILING_DEVICE_ID)
+        # Act
+        report = await smartthings.refresh_statuses([status])
+        # Assert
+        assert report.refreshed == [FAILING_DEVICE_ID]
+        assert not report.failed
+        assert not status.attributes
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_refresh_statuses_apply_error(smartthings, mocker):
+        """Tests a body that cannot be applied fails only its device."""
+        # Arrange
+        mocker.get(
+            API_DEVICE_STATUS.format(device_id=FAILING_DEVICE_ID),
+            response={"deviceId": FAILING_DEVICE_ID},
+        )
+        device = DeviceStatus(None, DEVICE_ID)
+        failing = DeviceStatus(None, FAILING_DEVICE_ID)
+        # Act
+        report = await smartthings.refresh_statuses([failing, device])
+        # Assert
+        assert report.refreshed == [DEVICE_ID]
+        assert isinstance(report.failed[FAILING_DEVICE_ID], KeyError)
+        assert device.level == 100
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_refresh_statuses_not_modified(api, mocker):
+        """Tests unchanged statuses are skipped unless updated locally."""
+        # Arrange
+        register_conditional(
+            mocker,
+            API_DEVICE_STATUS.format(device_id=CONDITIONAL_DEVICE_ID),
+            "device_status",
+        )
+        conditional_api = Api(api.session, AUTH_TOKEN, validators=ValidatorCache())
+        status = DeviceStatus(None, CONDITIONAL_DEVICE_ID)
+        duplicate = DeviceStatus(None, CONDITIONAL_DEVICE_ID)
+        await refresh_statuses(conditional_api, [status, duplicate])
+        duplicate.switch = False
+        # Act
+        await refresh_statuses(conditional_api, [status, duplicate])
+        reset = duplicate.switch
+        status.attributes[Attribute.switch] = Status("off", None, None)
+        await refresh_statuses(conditional_api, [status, duplicate])
+        # Assert
+        assert reset
+        assert status.version is not None
+        assert status.version == duplicate.version
+        assert duplicate.switch
@@ -0,0 +1,253 @@
+"""Tests for the cache module."""
+
+import pytest
+
+from pysmartthings.api import API_DEVICE, API_DEVICES, API_LOCATION, API_ROOM, Api
+from pysmartthings.cache import ResponseCache, ValidatorCache
+
+from .conftest import (
+    AUTH_TOKEN,
+    CONDITIONAL_DEVICE_ID,
+    DEVICE_ID,
+    ETAG,
+    LOCATION_ID,
+    ROOM_ID,
+    register_conditional,
+)
+
+
+class TestResponseCache:
+    """Tests for the ResponseCache class."""
+
+    @staticmethod
+    def test_get_set():
+        """Tests values are returned until they expire."""
+        # Arrange
+        cache = ResponseCache(ttls={API_ROOM: 0.0, API_LOCATION: -1.0})
+        # Act
+        cache.set("location", {"name": "Home"})
+        cache.set("room", {"name": "Kitchen"}, API_ROOM)
+        cache.set("expired", {}, API_LOCATION)
+        # Assert
+        assert cache.get("location") == {"name": "Home"}
+        assert cache.get("room") is None
+        assert cache.get("expired", False) is False
+        assert len(cache) == 1
+        assert cache.hits == 1
+        assert cache.misses == 2
+
+    @staticmethod
+    def test_expired(monkeypatch):
+        """Tests an expired value is dropped on lookup."""
+        # Arrange
+        now = [100.0]
+        monkeypatch.setattr("pysmartthings.cache.time.monotonic", lambda: now[0])
+        cache = ResponseCache(default_ttl=10.0)
+        cache.set("location", {})
+        # Act
+        now[0] += 10.0
+        # Assert
+        assert cache.get("location") is None
+        assert not cache
+
+    @staticmethod
+    def test_lru_eviction():
+        """Tests the least recently used value is evicted when full."""
+        # Arrange
+        cache = ResponseCache(max_entries=2)
+        cache.set("first", 1)
+        cache.set("second", 2)
+        cache.get("first")
+        # Act
+        cache.set("third", 3)
+        # Assert
+        assert cache.get("second") is None
+        assert cache.get("first") == 1
+        assert cache.get("third") == 3
+        assert cache.evictions == 1
+
+    @staticmethod
+    def test_invalidate():
+        """Tests values are removed on invalidation."""
+        # Arrange
+        cache = ResponseCache()
+        cache.set("first", 1)
+        cache.set("second", 2)
+        cache.set("third", 3)
+        # Act
+        cache.invalidate("first", "missing")
+        # Assert
+        assert cache.get("first") is None
+        assert len(cache) == 2
+        cache.clear()
+        assert not cache
+
+    @staticmethod
+    def test_invalid_max_entries():
+        """Tests max_entries must be positive."""
+        # Act/Assert
+        with pytest.raises(ValueError):
+            ResponseCache(max_entries=0)
+
+
+class TestApiCache:
+    """Tests for caching responses in the Api class."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_get_cached(api, mocker):
+        """Tests read-mostly resources are requested once."""
+        # Arrange
+        cache = ResponseCache()
+        cached_api = Api(api.session, AUTH_TOKEN, cache=cache)
+        # Act
+        first = await cached_api.get_location(LOCATION_ID)
+        second = await cached_api.get_location(LOCATION_ID)
+        rooms = await cached_api.get_rooms(LOCATION_ID)
+        await cached_api.get_rooms(LOCATION_ID)
+        # Assert
+        assert first is second
+        assert len(rooms) == 1
+        assert cached_api.cache is cache
+        assert len(mocker.history) == 2
+        assert cache.hits == 2
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_write_invalidates(api, mocker):
+        """Tests writing a resource invalidates the cached reads."""
+        # Arrange
+        cached_api = Api(api.session, AUTH_TOKEN, cache=ResponseCache())
+        await cached_api.get_room(LOCATION_ID, ROOM_ID)
+        await cached_api.get_rooms(LOCATION_ID)
+        # Act
+        await cached_api.delete_room(LOCATION_ID, ROOM_ID)
+        await cached_api.get_room(LOCATION_ID, ROOM_ID)
+        await cached_api.get_rooms(LOCATION_ID)
+        # Assert
+        assert len(mocker.history) == 5
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_not_cached_by_default(api, mocker):
+        """Tests responses are not cached unless a cache is given."""
+        # Act
+        await api.get_device(DEVICE_ID)
+        await api.get_device(DEVICE_ID)
+        # Assert
+        assert api.cache is None
+        assert len(mocker.history) == 2
+
+
+class TestValidatorCache:
+    """Tests for the ValidatorCache class."""
+
+    @staticmethod
+    def test_store():
+        """Tests validators are stored and sent as conditional headers."""
+        # Arrange
+        cache = ValidatorCache()
+        last_modified = "Wed, 21 Oct 2026 07:28:00 GMT"
+        # Act
+        cache.store("devices", {"ETag": ETAG}, {"items": []})
+        cache.store("device", {"Last-Modified": last_modified}, {})
+        cache.store("status", {}, {})
+        # Assert
+        assert len(cache) == 2
+        assert cache.headers("devices") == {"If-None-Match": ETAG}
+        assert cache.headers("device") == {"If-Modified-Since": last_modified}
+        assert not cache.headers("status")
+        assert cache.get("devices").data == {"items": []}
+
+    @staticmethod
+    def test_store_copies():
+        """Tests changes to stored or reused bodies do not reach the cache."""
+        # Arrange
+        cache = ValidatorCache()
+        data = {"components": {"main": {"switch": {"switch": {"value": "on"}}}}}
+        cache.store("status", {"ETag": ETAG}, data)
+        # Act
+        data["components"]["main"]["switch"]["switch"]["value"] = "off"
+        reused = cache.reuse("status")
+        reused["components"].clear()
+        # Assert
+        assert cache.reuse("status") == {
+            "components": {"main": {"switch": {"switch": {"value": "on"}}}}
+        }
+
+    @staticmethod
+    def test_store_without_validators():
+        """Tests a response without validators drops the stored entry."""
+        # Arrange
+        cache = ValidatorCache()
+        cache.store("device", {"ETag": ETAG}, {})
+        # Act
+        cache.store("device", {}, {})
+        # Assert
+        assert cache.get("device") is None
+
+    @staticmethod
+    def test_lru_eviction():
+        """Tests the least recently used entry is evicted when full."""
+        # Arrange
+        cache = ValidatorCache(max_entries=2)
+        cache.store("first", {"ETag": ETAG}, 1)
+        cache.store("second", {"ETag": ETAG}, 2)
+        cache.headers("first")
+        # Act
+        cache.store("third", {"ETag": ETAG}, 3)
+        # Assert
+        assert cache.get("second") is None
+        assert cache.reuse("first") == 1
+        assert cache.not_modified == 1
+        cache.clear()
+        assert not cache
+
+    @staticmethod
+    def test_invalid_max_entries():
+        """Tests max_entries must be positive."""
+        # Act/Assert
+        with pytest.raises(ValueError):
+            ValidatorCache(max_entries=0)
+
+
+class TestApiConditional:
+    """Tests for conditional requests in the Api class."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_not_modified(api, mocker):
+        """Tests a 304 response reuses the body of the last response."""
+        # Arrange
+        register_conditional(
+            mocker, API_DEVICE.format(device_id=CONDITIONAL_DEVICE_ID), "device"
+        )
+        validators = ValidatorCache()
+        conditional_api = Api(api.session, AUTH_TOKEN, validators=validators)
+        # Act
+        first = await conditional_api.get_device(CONDITIONAL_DEVICE_ID)
+        second = await conditional_api.get_device(CONDITIONAL_DEVICE_ID)
+        # Assert
+        assert first == second
+        assert first is not second
+        assert first["deviceId"] == DEVICE_ID
+        assert conditional_api.validators is validators
+        assert validators.not_modified == 1
+        assert len(mocker.history) == 2
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_without_validators(api, mocker):
+        """Tests responses without validators are requested in full."""
+        # Arrange
+        validators = ValidatorCache()
+        conditional_api = Api(api.session, AUTH_TOKEN, validators=validators)
+        # Act
+        first = await conditional_api.get_devices()
+        second = await conditional_api.get_devices()
+        # Assert
+        assert first == second
+        assert first is not second
+        assert not validators
+        assert len(mocker.history) == 2
+        assert mocker.history[0][1].path == "/v1/" + API_DEVICES
@@ -0,0 +1,118 @@
+"""Tests for the codec module."""
+
+import sys
+
+from aiohttp import ContentTypeError
+import pytest
+
+from pysmartthings.api import API_DEVICE_STATUS, Api
+from pysmartthings.codec import (
+    STDLIB_CODEC,
+    JsonCodec,
+    available_codecs,
+    default_codec,
+    orjson_codec,
+    ujson_codec,
+)
+
+from .conftest import AUTH_TOKEN, DEVICE_ID, LOCATION_ID
+from .utilities import get_json
+
+
+def counting_codec(calls: list) -> JsonCodec:
+    """Create a stdlib codec that records each call."""
+
+    def loads(value):
+        calls.append("loads")
+        return STDLIB_CODEC.loads(value)
+
+    def dumps(value):
+        calls.append("dumps")
+        return STDLIB_CODEC.dumps(value)
+
+    return JsonCodec("counting", loads, dumps)
+
+
+class TestJsonCodec:
+    """Tests for the JsonCodec class and module functions."""
+
+    @staticmethod
+    def test_round_trip():
+        """Tests every installed codec decodes what it encodes."""
+        # Arrange
+        data = get_json("device_status.json")
+        # Act/Assert
+        for codec in available_codecs():
+            assert codec.loads(codec.dumps(data)) == data
+
+    @staticmethod
+    def test_available_codecs():
+        """Tests the stdlib codec is always available and tried last."""
+        # Act
+        codecs = available_codecs()
+        # Assert
+        assert codecs[-1] is STDLIB_CODEC
+        assert default_codec().name == codecs[0].name
+        assert repr(STDLIB_CODEC) == "JsonCodec('json')"
+
+    @staticmethod
+    def test_default_codec_prefers_orjson():
+        """Tests orjson is preferred when it is installed."""
+        # Arrange
+        pytest.importorskip("orjson")
+        # Act/Assert
+        assert default_codec().name == "orjson"
+
+    @staticmethod
+    def test_fallback(monkeypatch):
+        """Tests the stdlib codec is used when no faster backend is installed."""
+        # Arrange
+        monkeypatch.setitem(sys.modules, "orjson", None)
+        monkeypatch.setitem(sys.modules, "ujson", None)
+        # Act/Assert
+        assert orjson_codec() is None
+        assert ujson_codec() is None
+        assert default_codec() is STDLIB_CODEC
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_api_uses_codec(api):
+        """Tests the Api encodes requests and decodes responses with the codec."""
+        # Arrange
+        calls = []
+        codec = counting_codec(calls)
+        codec_api = Api(api.session, AUTH_TOKEN, codec=codec)
+        # Act
+        device = await codec_api.get_device(DEVICE_ID)
+        room = await codec_api.create_room(LOCATION_ID, get_json("room_post.json"))
+        # Assert
+        assert codec_api.codec is codec
+        assert device["deviceId"] == DEVICE_ID
+        assert room["name"] == "Theater"
+        assert calls == ["loads", "dumps", "loads"]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_api_decodes_bytes(api, mocker):
+        """Tests response bodies reach the codec as bytes with a JSON mimetype."""
+        # Arrange
+        values = []
+        codec = JsonCodec(
+            "recording",
+            lambda value: values.append(value) or STDLIB_CODEC.loads(value),
+            STDLIB_CODEC.dumps,
+        )
+        codec_api = Api(api.session, AUTH_TOKEN, codec=codec)
+        mocker.request(
+            "get",
+            mocker.base_url + API_DEVICE_STATUS.format(device_id=LOCATION_ID),
+            headers=mocker.default_headers,
+            response={},
+            response_headers={"Content-Type": "text/html"},
+        )
+        # Act
+        await codec_api.get_device_status(DEVICE_ID)
+        # Assert
+        assert [type(value) for value in values] == [bytes]
+        with pytest.raises(ContentTypeError):
+            await codec_api.get_device_status(LOCATION_ID)
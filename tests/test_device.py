@@ -1,20 +1,44 @@
 """Tests for the Device file."""
 
+import asyncio
+import inspect
+import json
+import tracemalloc
+from unittest.mock import AsyncMock, create_autospec
+
 import pytest
 
-from pysmartthings.capability import Attribute, Capability
+from pysmartthings.api import API_DEVICE, API_DEVICE_COMMAND, API_DEVICE_STATUS, Api
+from pysmartthings.cache import ValidatorCache
+from pysmartthings.capability import CAPABILITY_REGISTRY, Attribute, Capability
 from pysmartthings.device import (
     DEVICE_TYPE_DTH,
     DEVICE_TYPE_UNKNOWN,
+    STATUS_NONE,
+    AttributeChange,
+    CommandResult,
     Device,
     DeviceEntity,
     DeviceStatus,
     Status,
+    intern_attribute,
+    intern_unit,
 )
 
-from .conftest import DEVICE_ID, LOCATION_ID, ROOM_ID
+from .conftest import (
+    AUTH_TOKEN,
+    CONDITIONAL_DEVICE_ID,
+    DEVICE_ID,
+    ETAG,
+    LOCATION_ID,
+    ROOM_ID,
+    register_conditional,
+)
 from .utilities import get_json
 
+# Bytes per three-component device with a status decoded for each device
+DEVICE_MEMORY_BUDGET = 3840
+
 
 class TestDevice:
     """Tests for the Device class."""
@@ -62,6 +86,64 @@ class TestDevice:
             "topButton": ["button"],
         }
 
+    @staticmethod
+    def test_capability_index():
+        """Tests capability lookups use the index of the device and components."""
+        # Arrange
+        device = Device()
+        device.apply_data(get_json("device.json"))
+        # Act/Assert
+        assert device.get_capability(Capability.lock, Capability.switch_level) == (
+            Capability.switch_level
+        )
+        assert device.has_capabilities(Capability.switch, Capability.switch_level)
+        assert not device.has_capabilities(Capability.switch, Capability.lock)
+        assert device.has_capabilities()
+        assert device.has_capabilities(Capability.button, component_id="topButton")
+        assert not device.has_capabilities(Capability.switch, component_id="topButton")
+        assert device.capability_index("main") is device.capability_index()
+        assert device.capability_index("topButton") == {Capability.button}
+        assert device.capability_index("missing") == frozenset()
+
+    @staticmethod
+    def test_capability_index_rebuilt():
+        """Tests the index follows changes to the capabilities."""
+        # Arrange
+        device = Device()
+        device.apply_data(get_json("device.json"))
+        assert not device.has_capabilities(Capability.lock)
+        # Act
+        device.capabilities.append(Capability.lock)
+        device.components["topButton"].append(Capability.switch)
+        # Assert
+        assert device.has_capabilities(Capability.lock)
+        assert device.has_capabilities(Capability.switch, component_id="topButton")
+        device.apply_data({"components": []})
+        assert not device.has_capabilities(Capability.switch)
+        assert device.capability_index("topButton") == frozenset()
+
+    @staticmethod
+    def test_capability_index_replaced():
+        """Tests the index and mask follow changes that keep the length."""
+        # Arrange
+        device = Device()
+        device.apply_data(get_json("device.json"))
+        replaced = device.capabilities[0]
+        device.capability_index()
+        device.capability_mask()
+        device.capability_index("topButton")
+        # Act
+        device.capabilities[0] = Capability.lock
+        device.components["topButton"][0] = Capability.switch
+        # Assert
+        assert device.get_capability(Capability.lock) == Capability.lock
+        assert not device.has_capabilities(replaced)
+        assert device.capability_mask() == CAPABILITY_REGISTRY.mask(device.capabilities)
+        assert device.capability_index("topButton") == {Capability.switch}
+        assert device.capability_mask("topButton") == CAPABILITY_REGISTRY.mask(
+            [Capability.switch]
+        )
+
     @staticmethod
     def test_get_capability():
         """Test the capability retrieval method."""
@@ -90,6 +172,26 @@ class TestDeviceEntity:
         # Assert
         assert device.label == "Front Porch Lights"
 
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_refresh_not_modified(api, mocker):
+        """Tests the data is not applied again when the device is unchanged."""
+        # Arrange
+        register_conditional(
+            mocker,
+            API_DEVICE.format(device_id=CONDITIONAL_DEVICE_ID),
+            {**get_json("device.json"), "deviceId": CONDITIONAL_DEVICE_ID},
+        )
+        conditional_api = Api(api.session, AUTH_TOKEN, validators=ValidatorCache())
+        device = DeviceEntity(conditional_api, device_id=CONDITIONAL_DEVICE_ID)
+        await device.refresh()
+        device.capabilities.clear()
+        # Act
+        await device.refresh()
+        # Assert
+        assert not device.capabilities
+        assert len(mocker.history) == 2
+
     @staticmethod
     @pytest.mark.asyncio
     async def test_save(api):
@@ -1280,6 +1382,213 @@ class TestDeviceStatus:
         assert len(status.components["topButton"].attributes) == 3
         assert len(status.components["bottomButton"].attributes) == 3
 
+    @staticmethod
+    def test_apply_data_changes():
+        """Tests apply_data updates in place and returns only the changes."""
+        # Arrange
+        data = get_json("device_status.json")
+        status = DeviceStatus(None, DEVICE_ID, data)
+        top_button = status.components["topButton"]
+        unchanged = status.attributes[Attribute.switch]
+        data["components"]["main"]["switchLevel"]["level"]["value"] = 50
+        data["components"]["topButton"]["button"]["button"]["value"] = "pushed"
+        del data["components"]["main"]["indicator"]
+        del data["components"]["bottomButton"]
+        # Act
+        changes = status.apply_data(data)
+        # Assert
+        assert changes == [
+            AttributeChange(
+                "bottomButton",
+                "numberOfButtons",
+                Status(1, None, None),
+                STATUS_NONE,
+            ),
+            AttributeChange(
+                "topButton",
+                "button",
+                STATUS_NONE,
+                Status("pushed", None, None),
+                Capability.button,
+            ),
+            AttributeChange(
+                "main",
+                "level",
+                Status(100, "%", None),
+                Status(50, "%", None),
+                Capability.switch_level,
+            ),
+            AttributeChange(
+                "main", "indicatorStatus", Status("when off", None, None), STATUS_NONE
+            ),
+        ]
+        assert status.components["topButton"] is top_button
+        assert status.attributes[Attribute.switch] is unchanged
+        assert "bottomButton" not in status.components
+        assert "indicatorStatus" not in status.attributes
+        assert not status.apply_data(data)
+
+    @staticmethod
+    def test_apply_data_duplicate_attributes():
+        """Tests an attribute reported by several capabilities keeps the last."""
+        # Arrange
+        data = {
+            "components": {
+                "main": {
+                    "thermostat": {
+                        "thermostatMode": {"value": "heat"},
+                        "temperature": {"value": 70, "unit": "F"},
+                    },
+                    "thermostatMode": {"thermostatMode": {"value": "cool"}},
+                    "temperatureMeasurement": {
+                        "temperature": {"value": 72, "unit": "F"}
+                    },
+                }
+            }
+        }
+        status = DeviceStatus(None, DEVICE_ID)
+        # Act
+        changes = status.apply_data(data)
+        # Assert
+        assert [(change.attribute, change.capability) for change in changes] == [
+            (Attribute.thermostat_mode, Capability.thermostat_mode),
+            (Attribute.temperature, Capability.temperature_measurement),
+        ]
+        assert status.thermostat_mode == "cool"
+        assert status.temperature == 72
+        assert not status.apply_data(data)
+
+    @staticmethod
+    def test_listeners():
+        """Tests listeners are called for the changes matching their filters."""
+        # Arrange
+        data = get_json("device_status.json")
+        status = DeviceStatus(None, DEVICE_ID)
+        calls = {"all": [], "level": [], "button": [], "removed": []}
+
+        def listener(name):
+            return lambda source, change: calls[name].append((source, change))
+
+        status.add_listener(listener("all"))
+        status.add_listener(listener("level"), attribute=Attribute.level)
+        status.add_listener(
+            listener("button"), component_id="topButton", capability=Capability.button
+        )
+        remove = status.add_listener(listener("removed"))
+        remove()
+        remove()
+        # Act
+        changes = status.apply_data(data)
+        status.apply_attribute_update(
+            "main", Capability.switch_level, Attribute.level, 50, "%"
+        )
+        status.apply_attribute_update(
+            "main", Capability.switch_level, Attribute.level, 50, "%"
+        )
+        # Assert
+        assert [change for _, change in calls["all"]] == changes + [
+            AttributeChange(
+                "main",
+                Attribute.level,
+                Status(100, "%", None),
+                Status(50, "%", None),
+                Capability.switch_level,
+            )
+        ]
+        assert all(source is status for source, _ in calls["all"])
+        assert [change.new.value for _, change in calls["level"]] == [100, 50]
+        assert [change.attribute for _, change in calls["button"]] == [
+            "numberOfButtons"
+        ]
+        assert not calls["removed"]
+
+    @staticmethod
+    def test_listener_shared_attribute():
+        """Tests a capability filter matches every capability reporting the attribute."""
+        # Arrange
+        data = get_json("device_status.json")
+        status = DeviceStatus(None, DEVICE_ID)
+        calls = {Capability.switch: [], "light": []}
+        for capability, changes in calls.items():
+            status.add_listener(
+                lambda source, change, changes=changes: changes.append(change),
+                capability=capability,
+                attribute=Attribute.switch,
+            )
+        # Act
+        status.apply_data(data)
+        main = data["components"]["main"]
+        main[Capability.switch][Attribute.switch]["value"] = "off"
+        main["light"][Attribute.switch]["value"] = "off"
+        status.apply_data(data)
+        # Assert
+        for changes in calls.values():
+            assert [(change.component_id, change.new.value) for change in changes] == [
+                ("main", "on"),
+                ("main", "off"),
+            ]
+
+    @staticmethod
+    def test_listener_error(caplog):
+        """Tests a listener that raises does not stop the others or the update."""
+        # Arrange
+        status = DeviceStatus(None, DEVICE_ID)
+        calls = []
+
+        def failing(source, change):
+            raise RuntimeError("listener failed")
+
+        status.add_listener(failing, attribute=Attribute.switch)
+        status.add_listener(lambda source, change: calls.append(change))
+        # Act
+        change = status.apply_attribute_update(
+            "main", Capability.switch, Attribute.switch, "on"
+        )
+        # Assert
+        assert status.switch
+        assert calls == [change]
+        assert "Error in the listener of switch" in caplog.text
+
+    @staticmethod
+    def test_async_listener_without_loop(caplog):
+        """Tests a coroutine listener called outside of a loop is dropped."""
+        # Arrange
+        status = DeviceStatus(None, DEVICE_ID)
+        calls = []
+
+        async def listener(source, change):
+            calls.append(change)
+
+        status.add_listener(listener)
+        status.add_listener(lambda source, change: calls.append(change))
+        # Act
+        change = status.apply_attribute_update(
+            "main", Capability.switch, Attribute.switch, "on"
+        )
+        # Assert
+        assert calls == [change]
+        assert "Dropped a coroutine listener" in caplog.text
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_async_listener():
+        """Tests coroutine listeners are scheduled on the loop."""
+        # Arrange
+        status = DeviceStatus(None, DEVICE_ID)
+        changes = []
+
+        async def listener(source, change):
+            changes.append(change)
+
+        status.add_listener(listener, attribute="switch")
+        # Act
+        status.apply_attribute_update("main", Capability.switch, "switch", "on")
+        status.apply_attribute_update("main", Capability.switch_level, "level", 1)
+        assert not changes
+        await asyncio.sleep(0)
+        # Assert
+        assert [change.new.value for change in changes] == ["on"]
+
     @staticmethod
     def test_apply_attribute_update():
         """Tests the apply_attribute_update method."""
@@ -1287,7 +1596,7 @@ class TestDeviceStatus:
         data = get_json("device_status.json")
         device = DeviceStatus(None, DEVICE_ID, data)
         # Act
-        device.apply_attribute_update(
+        change = device.apply_attribute_update(
             "main", Capability.switch_level, Attribute.level, 50, "%", {"test": "test"}
         )
         # Assert
@@ -1295,6 +1604,16 @@ class TestDeviceStatus:
         assert status.value == 50
         assert status.unit == "%"
         assert status.data == {"test": "test"}
+        assert change == AttributeChange(
+            "main",
+            Attribute.level,
+            Status(100, "%", None),
+            status,
+            Capability.switch_level,
+        )
+        assert not device.apply_attribute_update(
+            "main", Capability.switch_level, Attribute.level, 50, "%", {"test": "test"}
+        )
 
     @staticmethod
     def test_apply_attribute_update_preserve_unit():
@@ -1384,6 +1703,90 @@ class TestDeviceStatus:
         # Assert
         assert len(status.attributes) == 9
 
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_refresh_not_modified(api, mocker):
+        """Tests the data is not applied again when the status is unchanged."""
+        # Arrange
+        register_conditional(
+            mocker,
+            API_DEVICE_STATUS.format(device_id=CONDITIONAL_DEVICE_ID),
+            "device_status",
+        )
+        validators = ValidatorCache()
+        conditional_api = Api(api.session, AUTH_TOKEN, validators=validators)
+        status = DeviceStatus(conditional_api, device_id=CONDITIONAL_DEVICE_ID)
+        other = DeviceStatus(conditional_api, device_id=CONDITIONAL_DEVICE_ID)
+        await status.refresh()
+        # Not a local update, so it is only kept when the data is not applied
+        status.attributes[Attribute.switch] = Status("off", None, None)
+        # Act
+        await status.refresh()
+        await other.refresh()
+        # Assert
+        assert status.version == (ETAG, None)
+        assert not status.switch
+        assert other.switch
+        assert validators.not_modified == 2
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_refresh_not_modified_local_update(api, mocker):
+        """Tests a status updated locally is reset by an unchanged refresh."""
+        # Arrange
+        register_conditional(
+            mocker,
+            API_DEVICE_STATUS.format(device_id=CONDITIONAL_DEVICE_ID),
+            "device_status",
+        )
+        conditional_api = Api(api.session, AUTH_TOKEN, validators=ValidatorCache())
+        status = DeviceStatus(conditional_api, device_id=CONDITIONAL_DEVICE_ID)
+        await status.refresh()
+        status.switch = False
+        status.apply_attribute_update("sub", Capability.switch, Attribute.switch, "on")
+        local_version = status.version
+        # Act
+        await status.refresh()
+        # Assert
+        assert local_version is None
+        assert status.switch
+        assert status.version == (ETAG, None)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_refresh_not_modified_drlc_override(api, mocker):
+        """Tests a drlc override is reset by an unchanged refresh."""
+        # Arrange
+        register_conditional(
+            mocker,
+            API_DEVICE_STATUS.format(device_id=CONDITIONAL_DEVICE_ID),
+            "device_samsungac_status",
+        )
+        conditional_api = Api(api.session, AUTH_TOKEN, validators=ValidatorCache())
+        device = DeviceEntity(conditional_api, device_id=CONDITIONAL_DEVICE_ID)
+        await device.status.refresh()
+        override = device.status.drlc_status["override"]
+        request = device.batch().override_drlc_action(not override, set_status=True)
+        request.update(device.status)
+        local_version = device.status.version
+        # Act
+        await device.status.refresh()
+        # Assert
+        assert local_version is None
+        assert device.status.drlc_status["override"] is override
+        assert device.status.version == (ETAG, None)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_refresh_unconditional(api):
+        """Tests nothing is kept for the next refresh without validators."""
+        # Arrange
+        status = DeviceStatus(api, device_id=DEVICE_ID)
+        # Act
+        await status.refresh()
+        # Assert
+        assert status.version is None
+
     @staticmethod
     def test_switch():
         """Tests the switch property."""
@@ -1714,3 +2117,341 @@ class TestDeviceStatus:
         for value in values:
             with pytest.raises(ValueError):
                 status.shade_level = value
+
+
+class TestCommandBatch:
+    """Tests for the CommandBatch class."""
+
+    @staticmethod
+    def register_batch(mocker, commands, results):
+        """Register a mock for a batch of commands."""
+        mocker.post(
+            API_DEVICE_COMMAND.format(device_id=DEVICE_ID),
+            request={"commands": commands},
+            response={"results": results},
+        )
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_batch(api, mocker):
+        """Tests commands across components are sent in a single request."""
+        # Arrange
+        TestCommandBatch.register_batch(
+            mocker,
+            [
+                {
+                    "component": "main",
+                    "capability": "colorControl",
+                    "command": "setColor",
+                    "arguments": [{"hex": "#4B6432"}],
+                },
+                {
+                    "component": "main",
+                    "capability": "switchLevel",
+                    "command": "setLevel",
+                    "arguments": [50, 0],
+                },
+                {"component": "topButton", "capability": "switch", "command": "on"},
+            ],
+            [
+                {"id": "1", "status": "ACCEPTED"},
+                {"id": "2", "status": "COMPLETED"},
+                {"id": "3", "status": "ACCEPTED"},
+            ],
+        )
+        device = DeviceEntity(api, device_id=DEVICE_ID)
+        # Act
+        async with device.batch() as batch:
+            batch.set_color(color_hex="#4B6432", set_status=True)
+            batch.set_level(50, set_status=True)
+            batch.switch_on(component_id="topButton")
+        # Assert
+        assert len(mocker.history) == 1
+        assert not batch.commands
+        assert batch.results == [
+            CommandResult(
+                "main", "colorControl", "setColor", [{"hex": "#4B6432"}], "ACCEPTED"
+            ),
+            CommandResult("main", "switchLevel", "setLevel", [50, 0], "COMPLETED"),
+            CommandResult("topButton", "switch", "on", None, "ACCEPTED"),
+        ]
+        assert device.status.color == "#4B6432"
+        assert device.status.level == 50
+        assert device.status.switch
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_execute_partial_failure(api, mocker):
+        """Tests status updates only apply to accepted commands."""
+        # Arrange
+        TestCommandBatch.register_batch(
+            mocker,
+            [
+                {"component": "main", "capability": "lock", "command": "lock"},
+                {
+                    "component": "main",
+                    "capability": "colorTemperature",
+                    "command": "setColorTemperature",
+                    "arguments": [3000],
+                },
+            ],
+            [{"id": "1", "status": "ACCEPTED"}, {"id": "2", "status": "FAILED"}],
+        )
+        device = DeviceEntity(api, device_id=DEVICE_ID)
+        batch = device.batch()
+        batch.lock(set_status=True)
+        batch.set_color_temperature(3000, set_status=True)
+        # Act
+        result = await batch.send()
+        # Assert
+        assert not result
+        assert [r.status for r in batch.results] == ["ACCEPTED", "FAILED"]
+        assert device.status.lock == "locked"
+        assert device.status.color_temperature == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_execute_missing_results(api, mocker):
+        """Tests commands without a matching result are not accepted."""
+        # Arrange
+        TestCommandBatch.register_batch(
+            mocker,
+            [
+                {"component": "main", "capability": "switch", "command": "off"},
+                {
+                    "component": "main",
+                    "capability": "windowShadeLevel",
+                    "command": "setShadeLevel",
+                    "arguments": [20],
+                },
+            ],
+            [{"id": "1", "status": "ACCEPTED"}],
+        )
+        device = DeviceEntity(api, device_id=DEVICE_ID)
+        batch = device.batch()
+        batch.switch_off()
+        batch.set_window_shade_level(20, set_status=True)
+        # Act
+        result = await batch.send()
+        # Assert
+        assert not result
+        assert batch.results[1].status is None
+        assert device.status.shade_level == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_execute_empty(api, mocker):
+        """Tests an empty batch does not send a request."""
+        # Arrange
+        device = DeviceEntity(api, device_id=DEVICE_ID)
+        # Act
+        async with device.batch() as batch:
+            pass
+        # Assert
+        assert await batch.send()
+        assert not mocker.history
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_error_discards(api, mocker):
+        """Tests the batch is not sent when the block raises."""
+        # Arrange
+        device = DeviceEntity(api, device_id=DEVICE_ID)
+        # Act
+        with pytest.raises(ValueError):
+            async with device.batch() as batch:
+                batch.switch_on()
+                batch.set_hue(101)
+        # Assert
+        assert not mocker.history
+        assert len(batch.commands) == 1
+
+    @staticmethod
+    def test_validation(api):
+        """Tests commands are validated when queued."""
+        # Arrange
+        batch = DeviceEntity(api, device_id=DEVICE_ID).batch()
+        # Act/Assert
+        with pytest.raises(ValueError):
+            batch.set_color(color_hex="blue")
+        with pytest.raises(ValueError):
+            batch.set_color(101, 50)
+        with pytest.raises(ValueError):
+            batch.set_color(50, 101)
+        with pytest.raises(ValueError):
+            batch.set_color_temperature(0)
+        with pytest.raises(ValueError):
+            batch.set_saturation(101)
+        with pytest.raises(ValueError):
+            batch.set_level(101)
+        with pytest.raises(ValueError):
+            batch.set_level(50, -1)
+        with pytest.raises(ValueError):
+            batch.set_fan_speed(-1)
+        with pytest.raises(ValueError):
+            batch.set_window_shade_level(101)
+        assert not batch.commands
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_status_updates(api, mocker):
+        """Tests the status updates of the queued commands."""
+        # Arrange
+        device = DeviceEntity(api, device_id=DEVICE_ID)
+        device.apply_data(get_json("device.json"))
+        batch = device.batch()
+        batch.set_color(25, 50, set_status=True)
+        batch.set_hue(30, set_status=True)
+        batch.set_saturation(60, set_status=True)
+        batch.set_fan_speed(2, set_status=True)
+        batch.set_thermostat_mode("heat", set_status=True)
+        batch.set_cooling_setpoint(76, set_status=True)
+        batch.set_heating_setpoint(68, set_status=True)
+        batch.switch_off(set_status=True)
+        batch.unlock(set_status=True)
+        TestCommandBatch.register_batch(
+            mocker,
+            batch.commands,
+            [{"status": "ACCEPTED"}] * len(batch.commands),
+        )
+        # Act
+        result = await batch.send()
+        # Assert
+        assert result
+        assert batch.results[4].command == "setThermostatMode"
+        assert device.status.color == "#4B6432"
+        assert device.status.hue == 30
+        assert device.status.saturation == 60
+        assert device.status.fan_speed == 2
+        assert device.status.thermostat_mode == "heat"
+        assert device.status.cooling_setpoint == 76
+        assert device.status.heating_setpoint == 68
+        assert not device.status.switch
+        assert device.status.lock == "unlocked"
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_entity_commands(api, mocker):
+        """Tests the batch queues the same commands as the entity sends."""
+        # Arrange
+        device = DeviceEntity(api, device_id=DEVICE_ID)
+        device.capabilities.append(Capability.window_shade)
+        batch = device.batch()
+        batch.mute(set_status=True)
+        batch.set_volume(20, set_status=True)
+        batch.play(set_status=True)
+        batch.set_air_conditioner_mode("cool", set_status=True)
+        batch.open(set_status=True)
+        batch.set_tv_channel("5", set_status=True)
+        batch.execute("/OCFResource", {"x.com.samsung.da.power": "On"})
+        TestCommandBatch.register_batch(
+            mocker,
+            batch.commands,
+            [{"status": "ACCEPTED"}] * len(batch.commands),
+        )
+        # Act
+        result = await batch.send()
+        # Assert
+        assert result
+        assert [(r.capability, r.command, r.args) for r in batch.results] == [
+            (Capability.audio_mute, "mute", None),
+            (Capability.audio_volume, "setVolume", [20]),
+            (Capability.media_playback, "play", None),
+            (Capability.air_conditioner_mode, "setAirConditionerMode", ["cool"]),
+            (Capability.window_shade, "open", None),
+            (Capability.tv_channel, "setTvChannel", ["5"]),
+            (
+                Capability.execute,
+                "execute",
+                ["/OCFResource", {"x.com.samsung.da.power": "On"}],
+            ),
+        ]
+        assert device.status.mute
+        assert device.status.volume == 20
+        assert device.status.playback_status == "play"
+        assert device.status.air_conditioner_mode == "cool"
+        assert device.status.window_shade == "opening"
+        assert device.status.tv_channel == "5"
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_entity_commands_async():
+        """Tests the entity commands stay coroutines that validate when awaited."""
+        # Arrange
+        device = DeviceEntity(None, device_id=DEVICE_ID)
+        mock = create_autospec(DeviceEntity, instance=True)
+        # Act
+        pending = device.set_level(101)
+        # Assert
+        assert inspect.iscoroutinefunction(DeviceEntity.switch_on)
+        assert inspect.iscoroutinefunction(DeviceEntity.execute)
+        assert isinstance(mock.switch_on, AsyncMock)
+        with pytest.raises(ValueError):
+            await pending
+
+
+class TestMemory:
+    """Tests guarding the memory used by devices."""
+
+    @staticmethod
+    def test_slots():
+        """Tests devices and statuses do not carry an instance dict."""
+        # Arrange
+        device = DeviceEntity(None, device_id=DEVICE_ID)
+        # Act/Assert
+        for instance in (device, device.status, Device()):
+            assert not hasattr(instance, "__dict__")
+            with pytest.raises(AttributeError):
+                instance.unknown = None
+
+    @staticmethod
+    def test_interned():
+        """Tests attribute names and units are shared across statuses."""
+        # Arrange
+        with open("tests/json/device_status.json", "r", encoding="utf-8") as file:
+            raw = file.read()
+        first = DeviceStatus(None, DEVICE_ID, json.loads(raw))
+        second = DeviceStatus(None, DEVICE_ID, json.loads(raw))
+        # Act
+        first.apply_attribute_update(
+            "main", Capability.switch_level, "".join(["le", "vel"]), 50, "%"
+        )
+        # Assert
+        for name, status in first.attributes.items():
+            shared = next(key for key in second.attributes if key == name)
+            assert shared is name
+            assert second.attributes[name].unit is status.unit
+        level = next(key for key in first.attributes if key == Attribute.level)
+        assert level is Attribute.level
+        assert first.attributes[Attribute.level].unit == "%"
+        assert intern_unit("".join(["k", "Wh"])) is intern_unit("kWh")
+        assert intern_unit(None) is None
+        assert intern_attribute("".join(["custom", "Name"])) is intern_attribute(
+            "customName"
+        )
+
+    @staticmethod
+    def test_bytes_per_device():
+        """Tests a typical three-component device stays within the budget."""
+        # Arrange
+        count = 500
+        data = get_json("device.json")
+        with open("tests/json/device_status.json", "r", encoding="utf-8") as file:
+            status = file.read()
+        items = [{**data, "deviceId": str(index)} for index in range(count)]
+        devices = []
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            # Act
+            for item in items:
+                device = DeviceEntity(None, item)
+                device.status.apply_data(json.loads(status))
+                devices.append(device)
+            used = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        # Assert
+        assert len(devices[0].components) == 2
+        assert len(devices[0].status.components) == 2
+        assert used / count <= DEVICE_MEMORY_BUDGET
@@ -52,3 +52,13 @@ class TestAPIResponseError:
             str(error) == "Unprocessable Entity (422): "
             '{"requestId": "8B66A345-03B0-477F-A8A6-1A1CF0277040"}'
         )
+
+    @staticmethod
+    def test_init_without_data():
+        """Tests an error without a body can be created."""
+        # Arrange/Act
+        error = APIResponseError(None, None, status=502, message="Bad Gateway")
+        # Assert
+        assert error.raw_error_response is None
+        assert error.request_id is None
+        assert error.error.code is None
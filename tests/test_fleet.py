@@ -0,0 +1,360 @@
+"""Tests for the fleet module."""
+
+import math
+
+import pytest
+
+from pysmartthings import fleet
+from pysmartthings.capability import (
+    CAPABILITIES,
+    CAPABILITY_REGISTRY,
+    Attribute,
+    Capability,
+    CapabilityRegistry,
+)
+from pysmartthings.device import Device, DeviceEntity, DeviceStatus
+from pysmartthings.fleet import (
+    EnumColumn,
+    FleetStatusStore,
+    NumericColumn,
+    filter_devices,
+)
+
+from .conftest import DEVICE_ID, LOCATION_ID
+from .utilities import get_json
+
+AC_DEVICE_ID = "2a3b4c5d-6e7f-4a8b-9c0d-1e2f3a4b5c6d"
+OTHER_LOCATION_ID = "6f7a8b9c-0d1e-4f2a-8b3c-4d5e6f7a8b9c"
+
+
+@pytest.fixture(name="backend", params=["numpy", "python"])
+def backend_fixture(request, monkeypatch):
+    """Fixture running the queries with numpy, when installed, and without."""
+    if request.param == "numpy":
+        if fleet.NUMPY is None:
+            pytest.skip("numpy is not installed")
+    else:
+        monkeypatch.setattr(fleet, "NUMPY", None)
+    return request.param
+
+
+def create_store() -> FleetStatusStore:
+    """Create a store holding a dimmer and an air conditioner."""
+    store = FleetStatusStore()
+    device = DeviceEntity(None, get_json("device.json"))
+    device.status.apply_data(get_json("device_status.json"))
+    store.ingest(device)
+    store.ingest(
+        DeviceStatus(None, AC_DEVICE_ID, get_json("device_samsungac_status.json")),
+        OTHER_LOCATION_ID,
+    )
+    return store
+
+
+def create_device(device_id: str, *capabilities: str) -> Device:
+    """Create a device with the capabilities in its main component."""
+    device = Device()
+    device.apply_data(
+        {
+            "deviceId": device_id,
+            "components": [
+                {"id": "main", "capabilities": [{"id": c} for c in capabilities]},
+                {"id": "sub", "capabilities": [{"id": Capability.button}]},
+            ],
+        }
+    )
+    return device
+
+
+class TestCapabilityMasks:
+    """Tests for filtering devices by capability masks."""
+
+    @staticmethod
+    def test_registry():
+        """Tests capabilities are assigned stable bits."""
+        # Arrange
+        registry = CapabilityRegistry(CAPABILITIES)
+        # Act
+        mask = registry.mask([Capability.switch, Capability.lock])
+        custom = registry.index("custom.capability")
+        # Assert
+        assert len(CAPABILITY_REGISTRY) >= len(CAPABILITIES)
+        assert registry.index(CAPABILITIES[0]) == 0
+        assert registry.index(Capability.switch) == CAPABILITY_REGISTRY.index(
+            Capability.switch
+        )
+        assert custom == len(CAPABILITIES)
+        assert registry.index("custom.capability") == custom
+        assert registry.capabilities(mask) == [Capability.lock, Capability.switch]
+        assert registry.mask([]) == 0
+
+    @staticmethod
+    def test_registry_queries_read_only():
+        """Tests queries do not assign bits to unknown capabilities."""
+        # Arrange
+        registry = CapabilityRegistry(CAPABILITIES)
+        # Act
+        mask = registry.mask([Capability.switch, "custom.unknown"])
+        registered = registry.register([Capability.switch, "custom.known"])
+        # Assert
+        assert mask == registry.mask([Capability.switch])
+        assert registry.get("custom.unknown") is None
+        assert registry.get("custom.known") == len(CAPABILITIES)
+        assert registered == mask | 1 << len(CAPABILITIES)
+        assert len(registry) == len(CAPABILITIES) + 1
+
+    @staticmethod
+    def test_device_mask():
+        """Tests devices expose the mask of their capabilities."""
+        # Arrange
+        device = create_device("1", Capability.switch, Capability.switch_level)
+        # Act
+        mask = device.capability_mask()
+        device.capabilities.append(Capability.color_control)
+        # Assert
+        assert mask == CAPABILITY_REGISTRY.mask(
+            [Capability.switch, Capability.switch_level]
+        )
+        assert device.capability_mask("main") == mask | CAPABILITY_REGISTRY.mask(
+            [Capability.color_control]
+        )
+        assert device.capability_mask("sub") == CAPABILITY_REGISTRY.mask(
+            [Capability.button]
+        )
+        assert device.capability_mask("missing") == 0
+
+    @staticmethod
+    def test_filter_devices():
+        """Tests devices are filtered by all, any and none of the capabilities."""
+        # Arrange
+        dimmer = create_device("1", Capability.switch, Capability.switch_level)
+        bulb = create_device(
+            "2", Capability.switch, Capability.switch_level, Capability.color_control
+        )
+        plug = create_device("3", Capability.switch, Capability.power_meter)
+        devices = [dimmer, bulb, plug]
+        # Act/Assert
+        assert filter_devices(
+            devices,
+            all_of=[Capability.switch, Capability.switch_level],
+            none_of=[Capability.color_control],
+        ) == [dimmer]
+        assert filter_devices(
+            devices, any_of=[Capability.color_control, Capability.power_meter]
+        ) == [bulb, plug]
+        assert filter_devices(devices) == devices
+        assert (
+            filter_devices(devices, all_of=[Capability.button], component_id="sub")
+            == devices
+        )
+
+    @staticmethod
+    def test_filter_devices_unknown():
+        """Tests unknown capabilities in a query are not registered."""
+        # Arrange
+        devices = [
+            create_device("1", Capability.switch),
+            create_device("2", Capability.lock),
+        ]
+        count = len(CAPABILITY_REGISTRY)
+        # Act/Assert
+        assert not filter_devices(devices, all_of=[Capability.switch, "query.unknown"])
+        assert not filter_devices(devices, any_of=["query.unknown"])
+        assert filter_devices(devices, any_of=[Capability.lock, "query.unknown"]) == [
+            devices[1]
+        ]
+        assert filter_devices(devices, none_of=["query.unknown"]) == devices
+        assert len(CAPABILITY_REGISTRY) == count
+        assert CAPABILITY_REGISTRY.get("query.unknown") is None
+
+    @staticmethod
+    def test_store_where_capabilities():
+        """Tests the store filters the entities it ingested by capabilities."""
+        # Arrange
+        store = create_store()
+        # Act/Assert
+        assert store.where_capabilities(all_of=[Capability.switch_level]) == [DEVICE_ID]
+        assert not store.where_capabilities(none_of=[Capability.switch])
+
+
+@pytest.mark.usefixtures("backend")
+class TestColumns:
+    """Tests for the column classes."""
+
+    @staticmethod
+    def test_numeric():
+        """Tests numeric values are stored with NaN for missing values."""
+        # Arrange
+        column = NumericColumn(2)
+        # Act
+        column.set(0, 21)
+        column.set(1, "not a number")
+        column.grow(3)
+        # Assert
+        assert column.get(0) == 21.0
+        assert column.get(1) is None
+        assert math.isnan(column.values[2])
+        assert column.rows_between(20, 22) == [0]
+        assert column.rows_between() == [0]
+
+    @staticmethod
+    def test_enum():
+        """Tests values are dictionary encoded."""
+        # Arrange
+        column = EnumColumn(4)
+        # Act
+        column.set(0, "on")
+        column.set(1, "off")
+        column.set(2, "on")
+        column.set(3, ["unhashable"])
+        # Assert
+        assert column.labels == ["on", "off"]
+        assert list(column.codes) == [0, 1, 0, -1]
+        assert column.get(2) == "on"
+        assert column.get(3) is None
+        assert column.rows_equal("on") == [0, 2]
+        assert column.rows_equal("off", "missing") == [1]
+        assert column.rows_equal("missing") == []
+
+    @staticmethod
+    def test_enum_numbers():
+        """Tests numbers in an enum column can be filtered and read as numbers."""
+        # Arrange
+        column = EnumColumn(4)
+        # Act
+        column.set(0, "unknown")
+        column.set(1, 21.5)
+        column.set(3, 30)
+        # Assert
+        assert column.rows_between(0, 25) == [1]
+        assert column.rows_between() == [1, 3]
+        numbers = column.numbers()
+        assert math.isnan(numbers[0]) and math.isnan(numbers[2])
+        assert (numbers[1], numbers[3]) == (21.5, 30.0)
+
+
+@pytest.mark.usefixtures("backend")
+class TestFleetStatusStore:
+    """Tests for the FleetStatusStore class."""
+
+    @staticmethod
+    def test_ingest():
+        """Tests statuses are loaded into rows and columns."""
+        # Act
+        store = create_store()
+        # Assert
+        assert len(store) == 2
+        assert store.device_ids == [DEVICE_ID, AC_DEVICE_ID]
+        assert store.row(AC_DEVICE_ID) == 1
+        assert store.row("missing") is None
+        assert store.get(DEVICE_ID, Attribute.switch) == "on"
+        assert store.get(DEVICE_ID, Attribute.level) == 100
+        assert store.get(DEVICE_ID, "numberOfButtons", "topButton") == 1
+        assert store.get(AC_DEVICE_ID, Attribute.level) is None
+        assert store.get(AC_DEVICE_ID, "powerConsumption.energy") == 500
+        assert store.get("missing", Attribute.switch) is None
+        assert store.get(DEVICE_ID, "missing") is None
+        assert store.locations.labels == [LOCATION_ID, OTHER_LOCATION_ID]
+        assert isinstance(store.column(Attribute.temperature), NumericColumn)
+        assert isinstance(store.column(Attribute.switch), EnumColumn)
+        assert ("main", Attribute.switch) in store.attributes
+
+    @staticmethod
+    def test_ingest_replaces_values():
+        """Tests ingesting a device again clears values it no longer reports."""
+        # Arrange
+        store = create_store()
+        status = DeviceStatus(None, DEVICE_ID)
+        status.apply_attribute_update("main", Capability.switch, "switch", "off")
+        # Act
+        store.ingest(status)
+        # Assert
+        assert len(store) == 2
+        assert store.get(DEVICE_ID, Attribute.switch) == "off"
+        assert store.get(DEVICE_ID, Attribute.level) is None
+
+    @staticmethod
+    def test_apply_attribute_update():
+        """Tests updates are applied to a single value."""
+        # Arrange
+        store = create_store()
+        # Act
+        store.apply_attribute_update(
+            AC_DEVICE_ID, "main", Capability.switch_level, Attribute.level, 40, "%"
+        )
+        store.apply_attribute_update(
+            "new", "main", Capability.switch, Attribute.switch, "on"
+        )
+        # Assert
+        assert store.get(AC_DEVICE_ID, Attribute.level) == 40
+        assert store.get("new", Attribute.switch) == "on"
+        assert store.get("new", Attribute.level) is None
+        assert len(store) == 3
+
+    @staticmethod
+    def test_filters():
+        """Tests devices are filtered by attribute values."""
+        # Arrange
+        store = create_store()
+        store.apply_attribute_update(
+            AC_DEVICE_ID, "main", Capability.switch, Attribute.switch, "off"
+        )
+        # Act/Assert
+        assert store.where_on(Attribute.switch) == [DEVICE_ID]
+        assert store.where_equal(Attribute.switch, "on", "off") == [
+            DEVICE_ID,
+            AC_DEVICE_ID,
+        ]
+        assert store.where_equal(Attribute.level, 100) == []
+        assert store.where_between(Attribute.level, low=50) == [DEVICE_ID]
+        assert store.where_between(Attribute.level, high=50) == []
+        assert store.where_between(Attribute.switch, 0, 1) == []
+        assert store.where_equal("missing", "on") == []
+
+    @staticmethod
+    def test_aggregate():
+        """Tests numeric attributes are aggregated across devices."""
+        # Arrange
+        store = create_store()
+        store.apply_attribute_update(
+            "third", "main", Capability.temperature_measurement, "temperature", 26
+        )
+        # Act/Assert
+        assert store.aggregate(Attribute.temperature) == 24.0
+        assert store.aggregate(Attribute.temperature, "count") == 2
+        assert store.aggregate(Attribute.temperature, "max") == 26
+        assert store.aggregate(Attribute.temperature, by_location=True) == {
+            OTHER_LOCATION_ID: 22.0
+        }
+        assert store.aggregate("powerConsumption.energy", "sum") == 500.0
+        assert store.aggregate("missing") is None
+        assert store.aggregate("missing", "count") == 0
+        assert store.aggregate(Attribute.switch) is None
+        with pytest.raises(KeyError):
+            store.aggregate(Attribute.temperature, "median")
+
+    @staticmethod
+    def test_mixed_values():
+        """Tests a column keeps values of both types in either arrival order."""
+        # Arrange
+        store = FleetStatusStore()
+        # Act
+        for attribute, values in (("first", ("unknown", 21.5)), ("then", (20, "x"))):
+            for device_id, value in zip(("1", "2"), values):
+                store.apply_attribute_update(
+                    device_id,
+                    "main",
+                    Capability.temperature_measurement,
+                    attribute,
+                    value,
+                )
+        # Assert
+        assert store.where_between("first", 0, 100) == ["2"]
+        assert store.where_equal("first", "unknown") == ["1"]
+        assert store.aggregate("first") == 21.5
+        assert store.where_between("then", 0, 100) == ["1"]
+        assert store.where_equal("then", "x") == ["2"]
+        assert store.where_equal("then", 20) == ["1"]
+        assert store.get("then", "1") is None
+        assert store.get("1", "then") == 20
+        assert store.aggregate("then", "count") == 1
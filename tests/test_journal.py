@@ -0,0 +1,207 @@
+"""Tests for the journal module."""
+
+import os
+
+import pytest
+
+from pysmartthings.capability import Attribute, Capability
+from pysmartthings.codec import STDLIB_CODEC
+from pysmartthings.device import DeviceEntity, DeviceStatus
+from pysmartthings.journal import (
+    RECORD_HEADER,
+    JournalWriter,
+    read_segment,
+    replay_journal,
+    segment_paths,
+)
+from pysmartthings.snapshot import load_snapshot
+
+from .conftest import DEVICE_ID
+from .utilities import get_json
+
+OTHER_DEVICE_ID = "0d38d5ca-705f-44f7-89bd-36a8cf73678d"
+
+
+class TestJournal:
+    """Tests for the JournalWriter class and replay_journal."""
+
+    @staticmethod
+    def test_append_replay(tmp_path):
+        """Tests the last update of each attribute is replayed."""
+        # Arrange
+        writer = JournalWriter(str(tmp_path), codec=STDLIB_CODEC)
+        writer.append(DEVICE_ID, "main", Capability.switch, Attribute.switch, "on")
+        writer.append(DEVICE_ID, "main", Capability.switch, Attribute.switch, "off")
+        writer.append(
+            DEVICE_ID, "main", Capability.switch_level, Attribute.level, 50, "%"
+        )
+        writer.append(
+            OTHER_DEVICE_ID,
+            "sub",
+            Capability.power_consumption_report,
+            Attribute.power_consumption,
+            {"energy": 1.5},
+        )
+        writer.close()
+        # Act
+        statuses = replay_journal(str(tmp_path), codec=STDLIB_CODEC)
+        # Assert
+        assert writer.records == 4
+        status = statuses[DEVICE_ID]
+        assert status.device_id == DEVICE_ID
+        assert status.switch is False
+        assert status.attributes[Attribute.level] == (50, "%", None)
+        assert statuses[OTHER_DEVICE_ID].components["sub"].attributes[
+            Attribute.power_consumption
+        ].value == {"energy": 1.5}
+
+    @staticmethod
+    def test_read_segment(tmp_path):
+        """Tests updates are read back in the order written."""
+        # Arrange
+        writer = JournalWriter(str(tmp_path), codec=STDLIB_CODEC)
+        writer.append(DEVICE_ID, "main", None, Attribute.switch, "on", None, {"a": 1})
+        writer.append(DEVICE_ID, "main", None, Attribute.switch, "off")
+        writer.flush()
+        # Act
+        records = list(read_segment(writer.path, STDLIB_CODEC))
+        # Assert
+        assert records == [
+            (DEVICE_ID, "main", None, Attribute.switch, "on", None, {"a": 1}),
+            (DEVICE_ID, "main", None, Attribute.switch, "off", None, None),
+        ]
+        writer.close()
+
+    @staticmethod
+    def test_torn_record(tmp_path):
+        """Tests an unpublished record stops the replay."""
+        # Arrange
+        writer = JournalWriter(str(tmp_path), codec=STDLIB_CODEC)
+        writer.append(DEVICE_ID, "main", None, Attribute.switch, "on")
+        writer.append(DEVICE_ID, "main", None, Attribute.switch, "off")
+        writer.close()
+        with open(writer.path, "r+b") as segment_file:
+            # The last record is the update, clear its kind byte
+            data = segment_file.read()
+            last = data.rindex(b'["off"') - RECORD_HEADER.size
+            segment_file.seek(last)
+            segment_file.write(b"\0")
+        # Act
+        statuses = replay_journal(str(tmp_path), codec=STDLIB_CODEC)
+        # Assert
+        assert statuses[DEVICE_ID].switch is True
+
+    @staticmethod
+    def test_rotation(tmp_path):
+        """Tests full segments are rotated and replayed in order."""
+        # Arrange
+        writer = JournalWriter(str(tmp_path), segment_size=512, codec=STDLIB_CODEC)
+        # Act
+        for level in range(20):
+            writer.append(DEVICE_ID, "main", None, Attribute.level, level)
+        writer.close()
+        statuses = replay_journal(str(tmp_path), codec=STDLIB_CODEC)
+        # Assert
+        assert len(segment_paths(str(tmp_path))) > 1
+        assert statuses[DEVICE_ID].level == 19
+        with pytest.raises(ValueError):
+            JournalWriter(str(tmp_path), segment_size=512).append(
+                DEVICE_ID, "main", None, Attribute.level, "x" * 512
+            )
+
+    @staticmethod
+    def test_replay_removed(tmp_path):
+        """Tests attributes journaled as removed are removed by the replay."""
+        # Arrange
+        data = get_json("device_status.json")
+        status = DeviceStatus(None, DEVICE_ID)
+        status.apply_data(data)
+        writer = JournalWriter(str(tmp_path), codec=STDLIB_CODEC)
+        writer.attach(status)
+        del data["components"]["main"]["switchLevel"]
+        # Act
+        status.apply_data(data)
+        writer.close()
+        statuses = replay_journal(
+            str(tmp_path),
+            {DEVICE_ID: DeviceStatus(None, DEVICE_ID, get_json("device_status.json"))},
+            codec=STDLIB_CODEC,
+        )
+        # Assert
+        assert writer.records == 1
+        assert Attribute.level not in statuses[DEVICE_ID].attributes
+        assert Attribute.switch in statuses[DEVICE_ID].attributes
+
+    @staticmethod
+    def test_rotation_names(tmp_path, monkeypatch):
+        """Tests a segment is rotated before it runs out of name ids."""
+        # Arrange
+        monkeypatch.setattr("pysmartthings.journal.MAX_NAMES", 4)
+        writer = JournalWriter(str(tmp_path), codec=STDLIB_CODEC)
+        # Act
+        for index in range(4):
+            writer.append(DEVICE_ID, "main", None, f"attribute{index}", index)
+        writer.close()
+        statuses = replay_journal(str(tmp_path), codec=STDLIB_CODEC)
+        # Assert
+        assert len(segment_paths(str(tmp_path))) == 2
+        assert [
+            statuses[DEVICE_ID].attributes[f"attribute{index}"].value
+            for index in range(4)
+        ] == [0, 1, 2, 3]
+
+    @staticmethod
+    def test_reopen(tmp_path):
+        """Tests a new writer starts a new segment after the existing ones."""
+        # Arrange
+        first = JournalWriter(str(tmp_path), codec=STDLIB_CODEC)
+        first.append(DEVICE_ID, "main", None, Attribute.switch, "on")
+        first.close()
+        # Act
+        second = JournalWriter(str(tmp_path), codec=STDLIB_CODEC)
+        second.append(DEVICE_ID, "main", None, Attribute.level, 10)
+        second.close()
+        statuses = replay_journal(str(tmp_path), codec=STDLIB_CODEC)
+        # Assert
+        assert segment_paths(str(tmp_path)) == [first.path, second.path]
+        assert statuses[DEVICE_ID].switch is True
+        assert statuses[DEVICE_ID].level == 10
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_attach_compact(api, tmp_path):
+        """Tests attached statuses are journaled and compacted into a snapshot."""
+        # Arrange
+        journal = str(tmp_path / "journal")
+        snapshot = str(tmp_path / "snapshot.json.gz")
+        writer = JournalWriter(journal, codec=STDLIB_CODEC)
+        device = DeviceEntity(api, get_json("device.json"))
+        device.status.apply_data(get_json("device_status.json"))
+        detach = writer.attach(device.status)
+        device.status.apply_attribute_update(
+            "main", Capability.switch_level, Attribute.level, 25
+        )
+        # Act
+        writer.compact(snapshot, devices=[device])
+        device.status.apply_attribute_update(
+            "main", Capability.switch, Attribute.switch, "off"
+        )
+        detach()
+        device.status.apply_attribute_update(
+            "main", Capability.switch, Attribute.switch, "on"
+        )
+        writer.close()
+        restored = load_snapshot(api, snapshot, codec=STDLIB_CODEC)
+        statuses = replay_journal(
+            journal,
+            {device.device_id: device.status for device in restored.devices},
+            codec=STDLIB_CODEC,
+        )
+        # Assert
+        assert segment_paths(journal) == [writer.path]
+        assert os.path.exists(snapshot)
+        status = statuses[DEVICE_ID]
+        assert isinstance(status, DeviceStatus)
+        assert status is restored.devices[0].status
+        assert status.level == 25
+        assert status.switch is False
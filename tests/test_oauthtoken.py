@@ -1,8 +1,17 @@
 """Tests for the OAuth module."""
 
+import asyncio
+from datetime import datetime, timedelta
+
+from aiohttp import ClientConnectionError
 import pytest
+from yarl import URL
 
-from pysmartthings.oauthtoken import OAuthToken
+from pysmartthings import oauthtoken
+from pysmartthings.api import API_OAUTH_TOKEN
+from pysmartthings.errors import APIInvalidGrant
+from pysmartthings.oauthtoken import OAuthToken, TokenManager
+from pysmartthings.retry import RetryPolicy
 
 from .conftest import CLIENT_ID, CLIENT_SECRET, REFRESH_TOKEN
 from .utilities import get_json
@@ -44,3 +53,207 @@ class TestOAuthToken:
         await token.refresh(CLIENT_ID, CLIENT_SECRET)
         # Assert
         assert token.refresh_token == "3d1a8d0a-a312-45c2-a9f5-95e59dc0e879"
+
+
+class FlakyTokenApi:
+    """Define an api whose token endpoint fails before succeeding."""
+
+    def __init__(self, errors):
+        """Create a new instance of the api."""
+        self.errors = list(errors)
+        self.refresh_tokens = []
+        self.token = None
+
+    async def generate_tokens(self, client_id, client_secret, refresh_token):
+        """Fail with the next error, then return the token response."""
+        self.refresh_tokens.append(refresh_token)
+        if self.errors:
+            raise self.errors.pop(0)
+        return get_json("token_response.json")
+
+
+class TestTokenManager:
+    """Tests for the TokenManager class."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_access_token(smartthings):
+        """Tests the token is refreshed when due and set on the api."""
+        # Arrange
+        refreshed = []
+        manager = smartthings.token_manager(
+            CLIENT_ID, CLIENT_SECRET, REFRESH_TOKEN, on_refresh=refreshed.append
+        )
+        # Act
+        access_token = await manager.access_token()
+        again = await manager.access_token()
+        # Assert
+        assert access_token == again == "ad0fbf27-48d4-4ee9-ba47-7f5fedd7be35"
+        assert manager.refreshes == 1
+        assert refreshed == [manager.token]
+        assert manager.token.refresh_token == "3d1a8d0a-a312-45c2-a9f5-95e59dc0e879"
+        assert not manager.needs_refresh
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_single_flight(api, mocker):
+        """Tests concurrent callers share one refresh request."""
+        # Arrange
+        manager = TokenManager(
+            api, OAuthToken(api, refresh_token=REFRESH_TOKEN), CLIENT_ID, CLIENT_SECRET
+        )
+        # Act
+        tokens = await asyncio.gather(*(manager.access_token() for _ in range(5)))
+        # Assert
+        assert len(set(tokens)) == 1
+        assert manager.refreshes == 1
+        assert api.token == tokens[0]
+        assert mocker.history == [("post", URL(API_OAUTH_TOKEN))]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_margin():
+        """Tests the token is refreshed ahead of expiry."""
+        # Arrange
+        api = FlakyTokenApi([])
+        token = OAuthToken(api, get_json("token_response.json"))
+        token._expiration_date = (  # pylint: disable=protected-access
+            datetime.now() + timedelta(seconds=100)
+        )
+        early = TokenManager(api, token, CLIENT_ID, CLIENT_SECRET, margin=120)
+        late = TokenManager(api, token, CLIENT_ID, CLIENT_SECRET, margin=10)
+        # Act/Assert
+        assert early.needs_refresh
+        assert not late.needs_refresh
+        await late.access_token()
+        assert not api.refresh_tokens
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_margin_capped():
+        """Tests a margin past the token lifetime does not refresh back to back."""
+        # Arrange
+        api = FlakyTokenApi([])
+        token = OAuthToken(api, get_json("token_response.json"))
+        manager = TokenManager(api, token, CLIENT_ID, CLIENT_SECRET, margin=300)
+        # Act
+        manager.start()
+        await asyncio.sleep(0.05)
+        await manager.stop()
+        # Assert
+        assert not manager.needs_refresh
+        assert manager.refreshes == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_retry_transient():
+        """Tests transient failures are retried with the same refresh token."""
+        # Arrange
+        api = FlakyTokenApi([ClientConnectionError(), asyncio.TimeoutError()])
+        policy = RetryPolicy(base_delay=0.001, max_delay=0.001)
+        manager = TokenManager(
+            api,
+            OAuthToken(api, refresh_token=REFRESH_TOKEN),
+            CLIENT_ID,
+            CLIENT_SECRET,
+            retry_policy=policy,
+        )
+        # Act
+        await manager.refresh()
+        # Assert
+        assert api.refresh_tokens == [REFRESH_TOKEN] * 3
+        assert api.token == "ad0fbf27-48d4-4ee9-ba47-7f5fedd7be35"
+        assert policy.stats.retries == 2
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_invalid_grant_not_retried():
+        """Tests an invalid grant is raised and keeps the refresh token."""
+        # Arrange
+        api = FlakyTokenApi([APIInvalidGrant("invalid")])
+        token = OAuthToken(api, refresh_token=REFRESH_TOKEN)
+        manager = TokenManager(api, token, CLIENT_ID, CLIENT_SECRET)
+        # Act/Assert
+        with pytest.raises(APIInvalidGrant):
+            await manager.access_token()
+        assert token.refresh_token == REFRESH_TOKEN
+        assert api.refresh_tokens == [REFRESH_TOKEN]
+        assert manager.refreshes == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_background_refresh():
+        """Tests the background task refreshes the token before expiry."""
+        # Arrange
+        api = FlakyTokenApi([])
+        token = OAuthToken(api, get_json("token_response.json"))
+        token._expiration_date = (  # pylint: disable=protected-access
+            datetime.now() + timedelta(seconds=60.01)
+        )
+        manager = TokenManager(api, token, CLIENT_ID, CLIENT_SECRET)
+        # Act
+        manager.start()
+        await asyncio.sleep(0.05)
+        await manager.stop()
+        # Assert
+        assert manager.refreshes == 1
+        assert api.token == token.access_token
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_background_refresh_failure(caplog, monkeypatch):
+        """Tests the background task logs a transient failure and keeps running."""
+        # Arrange
+        monkeypatch.setattr(oauthtoken, "MIN_REFRESH_RETRY_DELAY", 0.001)
+        api = FlakyTokenApi([ClientConnectionError(), asyncio.TimeoutError()])
+        token = OAuthToken(api, refresh_token=REFRESH_TOKEN)
+        policy = RetryPolicy(max_attempts=1, base_delay=0.001, max_delay=0.001)
+        manager = TokenManager(
+            api, token, CLIENT_ID, CLIENT_SECRET, retry_policy=policy
+        )
+        # Act
+        manager.start()
+        await asyncio.sleep(0.05)
+        await manager.stop()
+        # Assert
+        assert api.refresh_tokens == [REFRESH_TOKEN] * 3
+        assert manager.refreshes == 1
+        assert api.token == token.access_token
+        assert caplog.text.count("Failed to refresh the OAuth token") == 2
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_background_refresh_invalid_grant(caplog, monkeypatch):
+        """Tests the background task stops once the refresh token is rejected."""
+        # Arrange
+        monkeypatch.setattr(oauthtoken, "MIN_REFRESH_RETRY_DELAY", 0.001)
+        api = FlakyTokenApi([APIInvalidGrant("invalid")] * 3)
+        token = OAuthToken(api, refresh_token=REFRESH_TOKEN)
+        manager = TokenManager(api, token, CLIENT_ID, CLIENT_SECRET)
+        # Act
+        manager.start()
+        await asyncio.sleep(0.05)
+        await manager.stop()
+        # Assert
+        assert api.refresh_tokens == [REFRESH_TOKEN]
+        assert manager.refreshes == 0
+        assert "Stopped refreshing the OAuth token" in caplog.text
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_background_refresh_delay_floor(monkeypatch):
+        """Tests the wait after a failed refresh is never shorter than the floor."""
+        # Arrange
+        api = FlakyTokenApi([ClientConnectionError(), ClientConnectionError()])
+        token = OAuthToken(api, refresh_token=REFRESH_TOKEN)
+        policy = RetryPolicy(max_attempts=1, base_delay=0.001, max_delay=0.001)
+        monkeypatch.setattr(oauthtoken, "MIN_REFRESH_RETRY_DELAY", 0.2)
+        manager = TokenManager(
+            api, token, CLIENT_ID, CLIENT_SECRET, retry_policy=policy
+        )
+        # Act
+        manager.start()
+        await asyncio.sleep(0.05)
+        await manager.stop()
+        # Assert
+        assert api.refresh_tokens == [REFRESH_TOKEN]
@@ -0,0 +1,129 @@
+"""Tests for the pool module."""
+
+import asyncio
+
+import pytest
+
+from pysmartthings.api import API_DEVICE
+from pysmartthings.pool import ClientPool
+from pysmartthings.ratelimit import EndpointFamily
+from pysmartthings.retry import RetryPolicy
+
+from .conftest import AUTH_TOKEN, DEVICE_ID
+
+CANCELLED_DEVICE_ID = "cancelled"
+OTHER_TENANT_ID = "other"
+TENANT_ID = "tenant"
+
+
+class TestClientPool:
+    """Tests for the ClientPool class."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_add(pool):
+        """Tests tenants share the session but not their limiter or metrics."""
+        # Act
+        client = pool.add(TENANT_ID, AUTH_TOKEN)
+        other = pool.add(OTHER_TENANT_ID, "other-token")
+        # Assert
+        assert len(pool) == 2
+        assert TENANT_ID in pool
+        assert pool.get(TENANT_ID) is client
+        assert pool[OTHER_TENANT_ID] is other
+        assert pool.get("missing") is None
+        with pytest.raises(KeyError):
+            _ = pool["missing"]
+        tenant = pool.tenant(TENANT_ID)
+        other_tenant = pool.tenant(OTHER_TENANT_ID)
+        assert tenant.client is client
+        assert tenant.rate_limiter is not other_tenant.rate_limiter
+        assert tenant.metrics is not other_tenant.metrics
+        assert [item.tenant_id for item in pool] == [TENANT_ID, OTHER_TENANT_ID]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_add_existing_replaces_token(pool):
+        """Tests adding a known tenant keeps its client and updates the token."""
+        # Arrange
+        client = pool.add(TENANT_ID, "expired")
+        # Act
+        again = pool.add(TENANT_ID, AUTH_TOKEN)
+        # Assert
+        assert again is client
+        assert client.token == AUTH_TOKEN
+        assert len(pool) == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_remove(pool):
+        """Tests removing a tenant."""
+        # Arrange
+        client = pool.add(TENANT_ID, AUTH_TOKEN)
+        # Act
+        removed = pool.remove(TENANT_ID)
+        # Assert
+        assert removed is client
+        assert pool.remove(TENANT_ID) is None
+        assert TENANT_ID not in pool
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_metrics(pool):
+        """Tests requests are counted per tenant within the concurrency cap."""
+        # Arrange
+        client = pool.add(TENANT_ID, AUTH_TOKEN)
+        pool.add(OTHER_TENANT_ID, AUTH_TOKEN)
+        # Act
+        await asyncio.gather(*(client.device(DEVICE_ID) for _ in range(6)))
+        # Assert
+        metrics = pool.metrics()
+        assert metrics[TENANT_ID].requests == 6
+        assert metrics[TENANT_ID].statuses[200] == 6
+        assert metrics[TENANT_ID].in_flight == 0
+        assert 1 <= metrics[TENANT_ID].max_in_flight <= 2
+        assert metrics[TENANT_ID].mean_latency >= 0
+        assert metrics[OTHER_TENANT_ID].requests == 0
+        assert metrics[OTHER_TENANT_ID].mean_latency is None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_metrics_cancelled(pool, mocker):
+        """Tests cancelled requests are no longer counted in flight."""
+        # Arrange
+        client = pool.add(TENANT_ID, AUTH_TOKEN)
+        mocker.request(
+            "get",
+            mocker.base_url + API_DEVICE.format(device_id=CANCELLED_DEVICE_ID),
+            headers=mocker.default_headers,
+            exception=asyncio.CancelledError(),
+        )
+        # Act
+        with pytest.raises(asyncio.CancelledError):
+            await client.device(CANCELLED_DEVICE_ID)
+        # Assert
+        metrics = pool.tenant(TENANT_ID).metrics
+        assert metrics.requests == 1
+        assert metrics.in_flight == 0
+        assert metrics.errors == 0
+        assert metrics.mean_latency >= 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_configuration(pool):
+        """Tests the tenant limits and policies come from the pool settings."""
+        # Arrange
+        configured = ClientPool(
+            pool.session,
+            rate_limits={EndpointFamily.DEVICE_COMMANDS: (1.0, 3)},
+            retry_policy_factory=RetryPolicy,
+            conditional=True,
+        )
+        # Act
+        configured.add(TENANT_ID, AUTH_TOKEN)
+        configured.add(OTHER_TENANT_ID, AUTH_TOKEN)
+        # Assert
+        tenant = configured.tenant(TENANT_ID)
+        bucket = tenant.rate_limiter.bucket(EndpointFamily.DEVICE_COMMANDS)
+        assert bucket.state.capacity == 3
+        assert configured.session is pool.session
@@ -0,0 +1,207 @@
+"""Tests for the rate limit module."""
+
+import pytest
+
+from pysmartthings.api import API_DEVICE_STATUS, API_DEVICES, Api
+from pysmartthings.errors import APIResponseError
+from pysmartthings.ratelimit import (
+    EndpointFamily,
+    RateLimiter,
+    TokenBucket,
+    classify,
+    parse_retry_after,
+)
+
+from .conftest import AUTH_TOKEN, DEVICE_ID
+
+THROTTLED_DEVICE_ID = "1c2f3e4d-5b6a-4978-8a9b-0c1d2e3f4a5b"
+
+
+class TestFunctions:
+    """Tests for the module functions."""
+
+    @staticmethod
+    def test_classify():
+        """Tests requests are grouped into endpoint families."""
+        # Arrange
+        base = "https://api.smartthings.com/v1/"
+        # Act/Assert
+        assert (
+            classify("post", base + f"devices/{DEVICE_ID}/commands")
+            is EndpointFamily.DEVICE_COMMANDS
+        )
+        assert (
+            classify("GET", base + f"devices/{DEVICE_ID}/status")
+            is EndpointFamily.DEVICE_STATUS
+        )
+        assert classify("get", base + "devices") is EndpointFamily.LISTINGS
+        assert (
+            classify("get", base + "installedapps?currentOffset=MA")
+            is EndpointFamily.LISTINGS
+        )
+        assert classify("get", base + f"devices/{DEVICE_ID}") is EndpointFamily.DEFAULT
+        assert classify("post", base + "apps") is EndpointFamily.DEFAULT
+
+    @staticmethod
+    def test_parse_retry_after():
+        """Tests the Retry-After header is converted to seconds."""
+        # Act/Assert
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("2") == 2.0
+        assert parse_retry_after("-1") == 0.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after("soon") is None
+
+
+class TestTokenBucket:
+    """Tests for the TokenBucket class."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_acquire():
+        """Tests tokens are consumed and refilled."""
+        # Arrange
+        bucket = TokenBucket(20.0, 2)
+        # Act
+        await bucket.acquire()
+        await bucket.acquire()
+        await bucket.acquire()
+        # Assert
+        assert bucket.state.tokens < 1
+        assert not bucket.is_throttled
+
+    @staticmethod
+    def test_throttled():
+        """Tests the bucket backs off after a 429."""
+        # Arrange
+        bucket = TokenBucket(10.0, 5)
+        # Act
+        bucket.throttled(30)
+        # Assert
+        state = bucket.state
+        assert state.rate == 5.0
+        assert state.throttled_count == 1
+        assert 29 < state.paused_for <= 30
+        assert bucket.is_throttled
+
+    @staticmethod
+    def test_accepted_recovers_rate():
+        """Tests the rate recovers after requests are accepted."""
+        # Arrange
+        bucket = TokenBucket(10.0, 5)
+        bucket.throttled(0)
+        # Act
+        for _ in range(20):
+            bucket.accepted()
+        # Assert
+        assert bucket.state.rate == 10.0
+        assert not bucket.is_throttled
+
+    @staticmethod
+    def test_apply_headers():
+        """Tests the rate limit headers are applied."""
+        # Arrange
+        bucket = TokenBucket(10.0, 5)
+        # Act
+        bucket.apply_headers(
+            {
+                "X-RateLimit-Limit": "250",
+                "X-RateLimit-Remaining": "0",
+                "X-RateLimit-Reset": "5000",
+            }
+        )
+        # Assert
+        state = bucket.state
+        assert state.limit == 250
+        assert state.remaining == 0
+        assert state.tokens < 1
+        assert 4 < state.paused_for <= 5
+
+
+class TestRateLimiter:
+    """Tests for the RateLimiter class."""
+
+    @staticmethod
+    def test_init():
+        """Tests the limiter creates a bucket per family."""
+        # Act
+        limiter = RateLimiter({EndpointFamily.LISTINGS: (1.0, 3)})
+        # Assert
+        assert set(limiter.state) == set(EndpointFamily)
+        assert limiter.state[EndpointFamily.LISTINGS].capacity == 3
+        assert limiter.max_requeues == 5
+        assert not limiter.is_throttled
+
+    @staticmethod
+    def test_update():
+        """Tests only a 429 requests a requeue."""
+        # Arrange
+        limiter = RateLimiter()
+        # Act/Assert
+        assert not limiter.update(EndpointFamily.DEFAULT, 200, {})
+        assert limiter.update(EndpointFamily.DEFAULT, 429, {"Retry-After": "0"})
+        assert limiter.bucket(EndpointFamily.DEFAULT).state.throttled_count == 1
+        assert limiter.is_throttled
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_request_requeued(api, mocker):
+        """Tests a throttled request is requeued instead of failing."""
+        # Arrange
+        mocker.request(
+            "get",
+            mocker.base_url + API_DEVICE_STATUS.format(device_id=THROTTLED_DEVICE_ID),
+            headers=mocker.default_headers,
+            status=429,
+            response_headers={"Retry-After": "0"},
+            times=2,
+        )
+        mocker.get(
+            API_DEVICE_STATUS.format(device_id=THROTTLED_DEVICE_ID),
+            response={},
+        )
+        limiter = RateLimiter()
+        throttled_api = Api(api.session, AUTH_TOKEN, rate_limiter=limiter)
+        # Act
+        data = await throttled_api.get_device_status(THROTTLED_DEVICE_ID)
+        # Assert
+        assert data == {}
+        assert len(mocker.history) == 3
+        state = limiter.state[EndpointFamily.DEVICE_STATUS]
+        assert state.throttled_count == 2
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_request_requeues_exhausted(api, mocker):
+        """Tests the error is raised once the requeues are exhausted."""
+        # Arrange
+        mocker.request(
+            "get",
+            mocker.base_url + API_DEVICE_STATUS.format(device_id=THROTTLED_DEVICE_ID),
+            headers=mocker.default_headers,
+            status=429,
+            response={},
+            response_headers={"Retry-After": "0"},
+        )
+        throttled_api = Api(
+            api.session, AUTH_TOKEN, rate_limiter=RateLimiter(max_requeues=1)
+        )
+        # Act/Assert
+        with pytest.raises(APIResponseError) as error:
+            await throttled_api.get_device_status(THROTTLED_DEVICE_ID)
+        assert error.value.status == 429
+        assert len(mocker.history) == 2
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_request_tracks_headers(api):
+        """Tests successful responses update the bucket."""
+        # Arrange
+        limiter = RateLimiter()
+        limited_api = Api(api.session, AUTH_TOKEN, rate_limiter=limiter)
+        # Act
+        devices = await limited_api.get_items(API_DEVICES)
+        # Assert
+        assert len(devices) == 5
+        assert limited_api.rate_limiter is limiter
+        assert limiter.state[EndpointFamily.LISTINGS].tokens < 10
@@ -0,0 +1,157 @@
+"""Tests for the registry module."""
+
+import pytest
+
+from pysmartthings.api import API_DEVICES
+from pysmartthings.capability import Capability
+from pysmartthings.codec import STDLIB_CODEC
+from pysmartthings.registry import (
+    INDEX_LOCATION,
+    INDEX_NETWORK,
+    DeviceRegistry,
+    InventoryChanges,
+    listing_hash,
+)
+
+from .conftest import DEVICE_ID, LOCATION_ID, ROOM_ID
+from .utilities import get_json
+
+OTHER_LOCATION_ID = "c6358051-231c-49f3-90f0-d09f9cc 884d2"
+DIMMER_ID = "0d38d5ca-705f-44f7-89bd-36a8cf73678d"
+VIPER_ID = "0473c5c0-fdae-4a62-9000-b57af9218a 65"
+
+
+async def create_registry(smartthings) -> DeviceRegistry:
+    """Create a registry loaded from the devices fixture."""
+    registry = DeviceRegistry()
+    await registry.sync(smartthings)
+    return registry
+
+
+class TestDeviceRegistry:
+    """Tests for the DeviceRegistry class."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_sync(smartthings):
+        """Tests the registry is loaded from the device listing."""
+        # Arrange
+        registry = DeviceRegistry()
+        # Act
+        changes = await registry.sync(smartthings)
+        # Assert
+        assert len(changes.added) == 5
+        assert changes.removed == changes.changed == []
+        assert len(registry) == 5
+        assert DEVICE_ID in registry
+        assert registry.get(DEVICE_ID).device_id == DEVICE_ID
+        assert registry.get("missing") is None
+        assert set(registry.keys(INDEX_LOCATION)) == {LOCATION_ID, OTHER_LOCATION_ID}
+        assert registry.keys(INDEX_NETWORK) == ["ZWAVE"]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_sync_changes(smartthings, mocker):
+        """Tests only the devices whose JSON changed are rebuilt."""
+        # Arrange
+        registry = await create_registry(smartthings)
+        device = registry.get(DEVICE_ID)
+        unchanged = await registry.sync(smartthings)
+        data = get_json("devices.json")
+        data["items"][0]["label"] = "Renamed"
+        data["items"][0]["roomId"] = ROOM_ID
+        mocker.get(API_DEVICES, params=[("locationId", LOCATION_ID)], response=data)
+        # Act
+        changes = await registry.sync(smartthings, location_ids=[LOCATION_ID])
+        # Assert
+        assert unchanged == InventoryChanges([], [], [])
+        assert changes == InventoryChanges([], [], [DEVICE_ID])
+        assert registry.get(DEVICE_ID) is device
+        assert device.label == "Renamed"
+        assert registry.devices(room_ids=[ROOM_ID]) == [device]
+
+    @staticmethod
+    def test_listing_hash():
+        """Tests the hash follows the content of the JSON."""
+        # Arrange
+        data = get_json("device.json")
+        renamed = get_json("device.json")
+        renamed["label"] = "Renamed"
+        # Act/Assert
+        assert listing_hash(data, STDLIB_CODEC) == listing_hash(
+            get_json("device.json"), STDLIB_CODEC
+        )
+        assert listing_hash(data, STDLIB_CODEC) != listing_hash(renamed, STDLIB_CODEC)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_devices(smartthings):
+        """Tests devices are queried through the indexes."""
+        # Arrange
+        registry = await create_registry(smartthings)
+        # Act/Assert
+        assert len(registry.devices()) == 5
+        assert len(registry.devices(location_ids=[LOCATION_ID])) == 4
+        assert len(registry.devices(location_ids=[LOCATION_ID, OTHER_LOCATION_ID])) == 5
+        assert [
+            device.device_id
+            for device in registry.devices(
+                capabilities=[Capability.switch, Capability.switch_level],
+                location_ids=[LOCATION_ID],
+            )
+        ] == [DEVICE_ID, DIMMER_ID]
+        assert [device.device_id for device in registry.devices(types=["VIPER"])] == [
+            VIPER_ID
+        ]
+        assert len(registry.devices(networks=["ZWAVE"])) == 4
+        assert len(registry.devices(device_ids=[DEVICE_ID, VIPER_ID, "missing"])) == 2
+        assert not registry.devices(capabilities=["missing"])
+        assert not registry.devices(room_ids=[ROOM_ID])
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_refresh(smartthings):
+        """Tests refreshing a device updates its index entries."""
+        # Arrange
+        registry = await create_registry(smartthings)
+        # Act
+        device = await registry.refresh(DEVICE_ID)
+        # Assert
+        assert device.room_id == ROOM_ID
+        assert registry.devices(room_ids=[ROOM_ID]) == [device]
+        assert len(registry.devices(location_ids=[LOCATION_ID])) == 4
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_remove(smartthings):
+        """Tests removing a device removes its index entries."""
+        # Arrange
+        registry = await create_registry(smartthings)
+        # Act
+        removed = registry.remove(VIPER_ID)
+        # Assert
+        assert removed.device_id == VIPER_ID
+        assert registry.remove(VIPER_ID) is None
+        assert VIPER_ID not in registry
+        assert not registry.devices(types=["VIPER"])
+        assert registry.keys(INDEX_LOCATION) == [LOCATION_ID]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_sync_removes_unlisted(smartthings, mocker):
+        """Tests devices no longer listed in a location are removed."""
+        # Arrange
+        registry = await create_registry(smartthings)
+        data = get_json("devices.json")
+        data["items"] = data["items"][:2]
+        mocker.get(API_DEVICES, params=[("locationId", LOCATION_ID)], response=data)
+        # Act
+        changes = await registry.sync(smartthings, location_ids=[LOCATION_ID])
+        # Assert
+        assert changes.added == changes.changed == []
+        assert changes.removed == [
+            "64e7f664-5b99-4573-b76d-03be3021dc78",
+            "f315789f-bc75-4a54-8ee0-98e2d8f23f93",
+        ]
+        assert registry.device_ids == [DEVICE_ID, DIMMER_ID, VIPER_ID]
+        assert len(registry.devices(location_ids=[LOCATION_ID])) == 2
@@ -0,0 +1,242 @@
+"""Tests for the retry module."""
+
+from aiohttp import ServerDisconnectedError
+import pytest
+
+from pysmartthings.api import API_DEVICE, API_DEVICE_COMMAND, Api
+from pysmartthings.errors import APIResponseError
+from pysmartthings.ratelimit import EndpointFamily, RateLimiter
+from pysmartthings.retry import RetryPolicy, RetryStats
+
+from .conftest import AUTH_TOKEN
+
+FLAKY_DEVICE_ID = "5e6f7a8b-9c0d-4e1f-a2b3-c4d5e6f7a8b9"
+
+
+def register_failures(mocker, method, resource, times, *, status=500, exception=None):
+    """Register failing responses ahead of a successful one."""
+    mocker.request(
+        method,
+        mocker.base_url + resource,
+        headers=mocker.default_headers,
+        status=status,
+        response={},
+        response_headers={"Retry-After": "0"},
+        times=times,
+        exception=exception,
+    )
+    mocker.request(
+        method,
+        mocker.base_url + resource,
+        headers=mocker.default_headers,
+        response={"results": [{"status": "ACCEPTED"}]},
+    )
+
+
+class TestRetryStats:
+    """Tests for the RetryStats class."""
+
+    @staticmethod
+    def test_record():
+        """Tests retries are counted by reason."""
+        # Arrange
+        stats = RetryStats()
+        # Act
+        stats.record_retry(500)
+        stats.record_retry(500)
+        stats.record_retry("ServerDisconnectedError")
+        stats.record_exhausted()
+        # Assert
+        assert stats.retries == 3
+        assert stats.exhausted == 1
+        assert stats.reasons == {500: 2, "ServerDisconnectedError": 1}
+
+
+class TestRetryPolicy:
+    """Tests for the RetryPolicy class."""
+
+    @staticmethod
+    def test_is_retryable():
+        """Tests only idempotent verbs are retried by default."""
+        # Arrange
+        policy = RetryPolicy()
+        opted_in = RetryPolicy(
+            methods=("get", "put", "delete"), retry_device_commands=True
+        )
+        # Act/Assert
+        assert policy.is_retryable("GET", EndpointFamily.DEFAULT)
+        assert not policy.is_retryable("put", EndpointFamily.DEFAULT)
+        assert not policy.is_retryable("post", EndpointFamily.DEFAULT)
+        assert not policy.is_retryable("post", EndpointFamily.DEVICE_COMMANDS)
+        assert opted_in.is_retryable("delete", EndpointFamily.DEFAULT)
+        assert opted_in.is_retryable("post", EndpointFamily.DEVICE_COMMANDS)
+        assert not opted_in.is_retryable("post", EndpointFamily.DEFAULT)
+
+    @staticmethod
+    def test_backoff():
+        """Tests the delay is jittered below the exponential cap."""
+        # Arrange
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+        # Act/Assert
+        for attempt in range(6):
+            assert 0 <= policy.backoff(attempt) <= min(5.0, 2**attempt)
+
+    @staticmethod
+    def test_next_delay_exhausted():
+        """Tests no delay is returned once the attempts are used."""
+        # Arrange
+        policy = RetryPolicy(max_attempts=2, base_delay=0)
+        # Act/Assert
+        assert policy.next_delay(0, float("inf"), 500) == 0
+        assert policy.next_delay(1, float("inf"), 500) is None
+        assert policy.stats.retries == 1
+        assert policy.stats.exhausted == 1
+
+    @staticmethod
+    def test_next_delay_deadline():
+        """Tests no delay is returned past the deadline."""
+        # Arrange
+        policy = RetryPolicy(base_delay=0, deadline=1.0)
+        # Act/Assert
+        assert policy.next_delay(0, float("-inf"), 500) is None
+
+    @staticmethod
+    def test_next_delay_retry_after():
+        """Tests Retry-After sets the minimum delay."""
+        # Arrange
+        policy = RetryPolicy(base_delay=0, deadline=10.0)
+        # Act
+        delay = policy.next_delay(0, float("inf"), 429, retry_after=2.0)
+        # Assert
+        assert delay == 2.0
+        assert policy.stats.reasons == {429: 1}
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_request_retries_status(api, mocker):
+        """Tests a GET is retried after a server error."""
+        # Arrange
+        register_failures(
+            mocker, "get", API_DEVICE.format(device_id=FLAKY_DEVICE_ID), 2
+        )
+        policy = RetryPolicy(base_delay=0)
+        retry_api = Api(api.session, AUTH_TOKEN, retry_policy=policy)
+        # Act
+        data = await retry_api.get_device(FLAKY_DEVICE_ID)
+        # Assert
+        assert data
+        assert retry_api.retry_policy is policy
+        assert policy.stats.retries == 2
+        assert policy.stats.reasons == {500: 2}
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_request_retries_transport_error(api, mocker):
+        """Tests a GET is retried after a connection error."""
+        # Arrange
+        register_failures(
+            mocker,
+            "get",
+            API_DEVICE.format(device_id=FLAKY_DEVICE_ID),
+            1,
+            exception=ServerDisconnectedError(),
+        )
+        policy = RetryPolicy(base_delay=0)
+        retry_api = Api(api.session, AUTH_TOKEN, retry_policy=policy)
+        # Act
+        data = await retry_api.get_device(FLAKY_DEVICE_ID)
+        # Assert
+        assert data
+        assert policy.stats.reasons == {"ServerDisconnectedError": 1}
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_request_exhausted(api, mocker):
+        """Tests the error is raised once the attempts are used."""
+        # Arrange
+        register_failures(
+            mocker, "get", API_DEVICE.format(device_id=FLAKY_DEVICE_ID), 3
+        )
+        policy = RetryPolicy(max_attempts=2, base_delay=0)
+        retry_api = Api(api.session, AUTH_TOKEN, retry_policy=policy)
+        # Act/Assert
+        with pytest.raises(APIResponseError):
+            await retry_api.get_device(FLAKY_DEVICE_ID)
+        assert policy.stats.retries == 1
+        assert policy.stats.exhausted == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_request_transport_error_not_retryable(api, mocker):
+        """Tests transport errors propagate for requests that are not retried."""
+        # Arrange
+        register_failures(
+            mocker,
+            "post",
+            API_DEVICE_COMMAND.format(device_id=FLAKY_DEVICE_ID),
+            1,
+            exception=ServerDisconnectedError(),
+        )
+        policy = RetryPolicy(base_delay=0)
+        retry_api = Api(api.session, AUTH_TOKEN, retry_policy=policy)
+        # Act/Assert
+        with pytest.raises(ServerDisconnectedError):
+            await retry_api.post_device_command(
+                FLAKY_DEVICE_ID, "main", "switch", "on", None
+            )
+        assert policy.stats.retries == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_request_device_command_not_retried(api, mocker):
+        """Tests device commands are not retried without opting in."""
+        # Arrange
+        register_failures(
+            mocker, "post", API_DEVICE_COMMAND.format(device_id=FLAKY_DEVICE_ID), 1
+        )
+        policy = RetryPolicy(base_delay=0)
+        retry_api = Api(api.session, AUTH_TOKEN, retry_policy=policy)
+        # Act/Assert
+        with pytest.raises(APIResponseError):
+            await retry_api.post_device_command(
+                FLAKY_DEVICE_ID, "main", "switch", "on", None
+            )
+        assert len(mocker.history) == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_request_device_command_opt_in(api, mocker):
+        """Tests device commands are retried when opted in."""
+        # Arrange
+        register_failures(
+            mocker, "post", API_DEVICE_COMMAND.format(device_id=FLAKY_DEVICE_ID), 1
+        )
+        policy = RetryPolicy(base_delay=0, retry_device_commands=True)
+        retry_api = Api(api.session, AUTH_TOKEN, retry_policy=policy)
+        # Act
+        result = await retry_api.post_device_command(
+            FLAKY_DEVICE_ID, "main", "switch", "on", None
+        )
+        # Assert
+        assert result == {"results": [{"status": "ACCEPTED"}]}
+        assert policy.stats.retries == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_request_with_rate_limiter(api, mocker):
+        """Tests the rate limiter requeues before the policy retries."""
+        # Arrange
+        register_failures(
+            mocker, "get", API_DEVICE.format(device_id=FLAKY_DEVICE_ID), 2, status=429
+        )
+        policy = RetryPolicy(base_delay=0)
+        limiter = RateLimiter({EndpointFamily.DEFAULT: (1000.0, 10)}, max_requeues=1)
+        retry_api = Api(
+            api.session, AUTH_TOKEN, rate_limiter=limiter, retry_policy=policy
+        )
+        # Act
+        data = await retry_api.get_device(FLAKY_DEVICE_ID)
+        # Assert
+        assert data
+        assert limiter.state[EndpointFamily.DEFAULT].throttled_count == 2
+        assert policy.stats.reasons == {429: 1}
@@ -0,0 +1,55 @@
+"""Tests for the session module."""
+
+import pytest
+
+from pysmartthings.session import (
+    DEFAULT_LIMIT,
+    DEFAULT_LIMIT_PER_HOST,
+    DEFAULT_TIMEOUT,
+    create_session,
+)
+
+
+class TestCreateSession:
+    """Tests for the create_session function."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_defaults():
+        """Tests the session uses the tuned connector and timeout."""
+        # Act
+        async with create_session() as session:
+            # Assert
+            assert session.connector.limit == DEFAULT_LIMIT
+            assert session.connector.limit_per_host == DEFAULT_LIMIT_PER_HOST
+            assert session.connector.use_dns_cache
+            assert session.timeout.total == DEFAULT_TIMEOUT
+            assert "Accept-Encoding" not in session.headers
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_options():
+        """Tests the limits, DNS cache and compression can be changed."""
+        # Act
+        async with create_session(
+            limit=10,
+            limit_per_host=5,
+            use_dns_cache=False,
+            compress=False,
+            headers={"User-Agent": "test"},
+        ) as session:
+            # Assert
+            assert session.connector.limit == 10
+            assert session.connector.limit_per_host == 5
+            assert not session.connector.use_dns_cache
+            assert session.headers["Accept-Encoding"] == "identity"
+            assert session.headers["User-Agent"] == "test"
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_dns_cache_forever():
+        """Tests a ttl_dns_cache of None caches DNS results forever."""
+        # Act
+        async with create_session(ttl_dns_cache=None) as session:
+            # Assert
+            assert session.connector.use_dns_cache
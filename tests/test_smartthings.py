@@ -1,5 +1,7 @@
 """Tests for the SmartThings file."""
 
+import asyncio
+
 import pytest
 
 from pysmartthings.app import App, AppOAuth, AppSettings
@@ -49,6 +51,35 @@ class TestSmartThings:
         # Assert
         assert len(devices) == 2
 
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_iter_devices(smartthings):
+        """Tests devices are yielded as they are retrieved."""
+        # Act
+        devices = [device async for device in smartthings.iter_devices()]
+        # Assert
+        assert len(devices) == 5
+        assert devices[0].device_id == DEVICE_ID
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_iter_devices_with_filter(smartthings):
+        """Tests iterating a filtered view of devices."""
+        # Act
+        devices = [
+            device
+            async for device in smartthings.iter_devices(
+                location_ids=[LOCATION_ID],
+                capabilities=["switch"],
+                device_ids=[
+                    "edd26ac6-d156-4505-9647-3b20118ae4d1",
+                    "be1a61ce-c2a4-4b32-bf8c-31de6d3fa7dd",
+                ],
+            )
+        ]
+        # Assert
+        assert len(devices) == 2
+
     @staticmethod
     @pytest.mark.asyncio
     async def test_device(smartthings):
@@ -250,6 +281,53 @@ class TestSmartThings:
         # Assert
         assert len(apps) == 2
 
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_iter_installed_apps(smartthings):
+        """Tests installed apps are yielded across pages."""
+        # Act
+        apps = [app async for app in smartthings.iter_installed_apps()]
+        # Assert
+        assert len(apps) == 2
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_iter_installed_apps_partial(smartthings):
+        """Tests the next page is not requested until it is needed."""
+        # Act
+        iterator = smartthings.iter_installed_apps()
+        app = await anext(iterator)
+        await iterator.aclose()
+        # Assert
+        assert app.installed_app_id == INSTALLED_APP_ID
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_iter_installed_apps_prefetch(smartthings):
+        """Tests installed apps are yielded across prefetched pages."""
+        # Act
+        apps = [app async for app in smartthings.iter_installed_apps(prefetch=True)]
+        # Assert
+        assert [app.installed_app_id for app in apps] == [
+            INSTALLED_APP_ID,
+            "bceb4d29-ac7d-401d-a111-2bfbd6bebae1",
+        ]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_iter_installed_apps_prefetch_closed(smartthings):
+        """Tests a prefetched page is cancelled when iteration stops early."""
+        # Act
+        iterator = smartthings.iter_installed_apps(prefetch=True)
+        app = await anext(iterator)
+        await iterator.aclose()
+        await asyncio.sleep(0)
+        # Assert
+        assert app.installed_app_id == INSTALLED_APP_ID
+        assert not [
+            task for task in asyncio.all_tasks() if task is not asyncio.current_task()
+        ]
+
     @staticmethod
     @pytest.mark.asyncio
     async def test_installed_app(smartthings):
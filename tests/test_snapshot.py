@@ -0,0 +1,116 @@
+"""Tests for the snapshot module."""
+
+import gzip
+import json
+
+import pytest
+
+from pysmartthings.codec import STDLIB_CODEC
+from pysmartthings.device import Device
+from pysmartthings.registry import DeviceRegistry, InventoryChanges
+from pysmartthings.snapshot import (
+    SNAPSHOT_VERSION,
+    device_to_data,
+    load_snapshot,
+    save_snapshot,
+)
+
+from .conftest import DEVICE_ID, LOCATION_ID
+from .utilities import get_json
+
+
+class TestSnapshot:
+    """Tests for saving and loading snapshots."""
+
+    @staticmethod
+    def test_device_to_data():
+        """Tests the device data round trips through apply_data."""
+        # Arrange
+        device = Device()
+        device.apply_data(get_json("device.json"))
+        restored = Device()
+        # Act
+        restored.apply_data(device_to_data(device))
+        # Assert
+        assert restored.device_id == device.device_id
+        assert restored.label == device.label
+        assert restored.room_id == device.room_id
+        assert restored.capabilities == device.capabilities
+        assert restored.components == device.components
+        assert restored.device_type_network == device.device_type_network
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_save_load(smartthings, tmp_path):
+        """Tests locations, rooms, devices and statuses are restored."""
+        # Arrange
+        path = str(tmp_path / "snapshot.json.gz")
+        locations = await smartthings.locations()
+        rooms = await smartthings.rooms(LOCATION_ID)
+        devices = await smartthings.devices()
+        await devices[0].status.refresh()
+        save_snapshot(path, locations=locations, rooms=rooms, devices=devices)
+        # Act
+        snapshot = smartthings.load_snapshot(path)
+        # Assert
+        assert snapshot.age >= 0
+        assert [location.location_id for location in snapshot.locations] == [
+            location.location_id for location in locations
+        ]
+        assert snapshot.locations[0].name == locations[0].name
+        assert [room.room_id for room in snapshot.rooms] == [
+            room.room_id for room in rooms
+        ]
+        assert snapshot.rooms[0].name == rooms[0].name
+        assert len(snapshot.devices) == len(devices)
+        device = snapshot.devices[0]
+        assert device.device_id == DEVICE_ID
+        assert device.capabilities == devices[0].capabilities
+        assert device.status.device_id == DEVICE_ID
+        assert device.status.values == devices[0].status.values
+        assert device.status.attributes == devices[0].status.attributes
+        assert device.status.switch == devices[0].status.switch
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_registry_hashes(smartthings, tmp_path):
+        """Tests a registry restored from a snapshot syncs by delta."""
+        # Arrange
+        path = str(tmp_path / "snapshot.json.gz")
+        registry = DeviceRegistry()
+        await registry.sync(smartthings)
+        save_snapshot(path, devices=registry, codec=STDLIB_CODEC)
+        # Act
+        restored = smartthings.load_snapshot(path).registry()
+        changes = await restored.sync(smartthings)
+        # Assert
+        assert restored.hashes == registry.hashes
+        assert changes == InventoryChanges([], [], [])
+        assert restored.get(DEVICE_ID).room_id is None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_unsupported_version(api, tmp_path):
+        """Tests snapshots of another version are rejected."""
+        # Arrange
+        path = tmp_path / "snapshot.json.gz"
+        with gzip.open(path, "wt") as snapshot_file:
+            json.dump({"version": SNAPSHOT_VERSION + 1}, snapshot_file)
+        # Act/Assert
+        with pytest.raises(ValueError):
+            load_snapshot(api, str(path))
+
+    @staticmethod
+    def test_replaces_existing(tmp_path):
+        """Tests saving replaces a previous snapshot without a temporary file."""
+        # Arrange
+        path = tmp_path / "snapshot.json.gz"
+        path.write_bytes(b"previous")
+        # Act
+        save_snapshot(str(path))
+        # Assert
+        with gzip.open(path, "rt") as snapshot_file:
+            document = json.load(snapshot_file)
+        assert document["version"] == SNAPSHOT_VERSION
+        assert document["devices"] == []
+        assert [item.name for item in tmp_path.iterdir()] == ["snapshot.json.gz"]
@@ -5,6 +5,7 @@ from urllib.parse import parse_qs
 
 from aiohttp import ClientSession
 from aiohttp.client_exceptions import ClientResponseError
+from multidict import CIMultiDict
 from yarl import URL
 
 BodyFixtureType = Optional[Union[str, list, dict]]
@@ -33,6 +34,7 @@ class ClientMocker:
         self._mocks = []
         self.default_headers = None
         self.base_url = None
+        self.history = []
 
     def get(self, resource: str, *, params=None, response=None):
         """Register a mock get request."""
@@ -86,10 +88,24 @@ class ClientMocker:
         headers=None,
         request=None,
         response=None,
+        response_headers=None,
+        times=None,
+        exception=None,
     ):
         """Register a mock request."""
         self._mocks.append(
-            MockResponse(method, url, params, status, headers, request, response)
+            MockResponse(
+                method,
+                url,
+                params,
+                status,
+                headers,
+                request,
+                response,
+                response_headers,
+                times,
+                exception,
+            )
         )
 
     def create_session(self, loop):
@@ -116,9 +132,15 @@ class ClientMocker:
         url = URL(url)
         if params:
             url = url.with_query(params)
+        if isinstance(data, (str, bytes)):
+            json = _json.loads(data)
+            headers = {k: v for k, v in headers.items() if k != "Content-Type"}
 
+        self.history.append((method.lower(), url))
         for response in self._mocks:
             if response.match_request(method, url, headers or [], json):
+                if response.exception:
+                    raise response.exception
                 return response
 
         assert False, f"No mock registered for {method.upper()} {url} {params}"
@@ -127,7 +149,19 @@ class ClientMocker:
 class MockResponse:
     """Mock Aiohttp client response."""
 
-    def __init__(self, method, url, params, status, headers, request, response):
+    def __init__(
+        self,
+        method,
+        url,
+        params,
+        status,
+        headers,
+        request,
+        response,
+        response_headers=None,
+        times=None,
+        exception=None,
+    ):
         """Initialize a fake response."""
         self.method = method
         url = URL(url)
@@ -138,11 +172,17 @@ class MockResponse:
         self._response = response
         self._request = request
         self._headers = headers or []
+        self._response_headers = CIMultiDict(response_headers or {})
+        self._times = times
+        self.exception = exception
 
     def match_request(
         self, method: str, url: URL, headers: Optional[Sequence], json: BodyFixtureType
     ):
         """Test if response answers request."""
+        # Exhausted
+        if self._times is not None and self._times <= 0:
+            return False
         # Headers
         if self._headers != headers:
             return False
@@ -165,12 +205,29 @@ class MockResponse:
         # Request body
         if self._request and not json == _get_json_fixture(self._request):
             return False
+        if self._times is not None:
+            self._times -= 1
         return True
 
     @property
     def headers(self):
-        """Return content_type."""
-        return self._headers
+        """Return the response headers."""
+        return self._response_headers
+
+    @property
+    def reason(self):
+        """Return the response reason."""
+        return None
+
+    @property
+    def request_info(self):
+        """Return the request info."""
+        return None
+
+    @property
+    def history(self):
+        """Return the response history."""
+        return ()
 
     @property
     def cookies(self):
@@ -187,16 +244,30 @@ class MockResponse:
         """Return content."""
         raise NotImplementedError
 
+    @property
+    def content_type(self):
+        """Return the mimetype of the response."""
+        content_type = self._response_headers.get("Content-Type", "application/json")
+        return content_type.split(";")[0].strip()
+
     async def read(self):
         """Return mock response."""
-        raise NotImplementedError
+        if isinstance(self._response, str):
+            with open("tests/json/" + self._response + ".json", "rb") as json_file:
+                return json_file.read()
+        return _json.dumps(_get_json_fixture(self._response)).encode()
 
     async def text(self, encoding="utf-8"):
         """Return mock response as a string."""
         raise NotImplementedError
 
-    async def json(self, encoding="utf-8"):
+    async def json(self, encoding="utf-8", loads=_json.loads):
         """Return mock response as a json."""
+        if isinstance(self._response, str):
+            with open(
+                "tests/json/" + self._response + ".json", "r", encoding=encoding
+            ) as json_file:
+                return loads(json_file.read())
         return _get_json_fixture(self._response)
 
     def release(self):
@@ -207,7 +278,7 @@ class MockResponse:
         """Raise error if status is 400 or higher."""
         if self.status >= 400:
             raise ClientResponseError(
-                None, None, code=self.status, headers=self.headers
+                None, None, status=self.status, headers=self.headers
             )
 
     def close(self):